@@ -1,4 +1,5 @@
-from langchain_ollama import ChatOllama
+from app.core.llm import get_chat_model
+from app.agents.registry import registered_agent
 from langchain_core.prompts import ChatPromptTemplate
 from app.core.config import settings
 
@@ -44,21 +45,15 @@ decision_prompt = ChatPromptTemplate.from_messages(
 )
 
 
+@registered_agent
 def get_consensus_agent(model_name: str):
     """Factory: creates a consensus chain for a given Ollama model."""
-    llm = ChatOllama(
-        model=model_name,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+    llm = get_chat_model(model_name)
     return proposal_prompt | llm
 
 
+@registered_agent
 def get_manager_decision_agent():
     """Creates the manager decision chain using the main GPT model."""
-    llm = ChatOllama(
-        model=settings.DEEPSEEK_LLM,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+    llm = get_chat_model(settings.DEEPSEEK_LLM)
     return decision_prompt | llm
@@ -1,7 +1,8 @@
 from langchain.agents import create_agent
 from app.tools.mermaid import generate_flow_diagram
 from app.core.config import settings
-from langchain_ollama import ChatOllama
+from app.core.llm import get_chat_model
+from app.agents.registry import registered_agent
 from langchain_core.prompts import ChatPromptTemplate
 
 FLOW_DIAGRAM_TEMPLATE = """
@@ -54,12 +55,9 @@ prompt = ChatPromptTemplate.from_messages(
 )
 
 
+@registered_agent
 def get_flow_diagram_agent():
-    llm = ChatOllama(
-        model=settings.MISTRAL_LLM,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+    llm = get_chat_model(settings.MISTRAL_LLM)
 
     agent = prompt | llm
 
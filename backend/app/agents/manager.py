@@ -1,23 +1,67 @@
-from langgraph.checkpoint.memory import InMemorySaver
-from typing import TypedDict, Literal, Annotated
-
+from typing import TypedDict, Literal, Annotated, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import uuid
+import weakref
+
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END, START
-from rich.console import Console
+from langgraph.types import Command, Send, interrupt
+from pydantic import BaseModel, ValidationError
 from rich.panel import Panel
 from rich.text import Text
 import pyfiglet
 
 from app.tools.mermaid import generate_flow_diagram
-from app.agents.project_lead import get_project_lead_agent
-from app.agents.milestone import get_milestone_agent
-from app.agents.flow_diagram import get_flow_diagram_agent
-from app.tools.save_file import save_file, markdown_to_pdf
-from app.agents.tech_stack_agent import get_tech_stack_agent
-from app.agents.consensus_agent import get_consensus_agent, get_manager_decision_agent
-from app.tools.llm_resources import get_available_llms
-
-console = Console()
+from app.tools.flowchart import repair_flowchart
+from app.tools.srs_patch import SRSPatchError, apply_srs_patch
+from app.agents.project_lead import (
+    get_project_lead_agent,
+    get_srs_revision_agent,
+    get_structured_project_lead_agent,
+    render_srs,
+)
+from app.agents.milestone import (
+    MILESTONE_INLINE_TEMPLATE,
+    MILESTONE_STRUCTURED_TEMPLATE,
+    MILESTONE_TEMPLATE,
+    get_milestone_agent,
+    get_structured_milestone_agent,
+    render_milestones,
+)
+from app.agents.flow_diagram import FLOW_DIAGRAM_TEMPLATE, get_flow_diagram_agent
+from app.tools.save_file import artifact_path, save_file
+from app.tools.pdf_render import get_pdf_renderer, render_pdf, wait_for_pdf
+from app.agents.tech_stack_agent import TECH_STACK_AGENT_PROMPT, get_tech_stack_agent
+from app.agents.consensus_agent import (
+    CONSENSUS_PROMPT,
+    MANAGER_DECISION_PROMPT,
+    get_consensus_agent,
+    get_manager_decision_agent,
+)
+from app.tools.llm_resources import check_llm_names, get_available_llms, get_llm_roster
+from app.memory.artifacts import get_manifest, tracked_artifact
+from app.memory.llm_cache import cache_bypass, get_llm_cache
+from app.memory.proposal_digest import format_proposals
+from app.memory.srs_index import select_srs_context
+from app.core.llm import (
+    close_ollama_clients,
+    get_context_window,
+    get_ollama_pool,
+    get_schedulers,
+    get_single_flight,
+)
+from app.core.config import settings
+from app.core.console import console
+from app.core.preflight import preflight
+from app.core.streaming import node_progress, streaming_mode
+from app.core.tracing import TraceRecorder
+from app.memory.memory import open_checkpointer
+from app.structured_outputs.milestone import MilestoneOutput
+from app.structured_outputs.project_lead import ProjectLeadOutput
 
 
 def extract_text(response) -> str:
@@ -48,61 +92,67 @@ class ManagerState(TypedDict):
     feedback: str
     tech_stack: str
     revision_needed: bool
+    # Parsed milestones (Milestone dicts) when structured outputs are enabled
+    milestone_items: list[dict]
+    milestone_list: list[str]
+    milestone_decisions: Annotated[dict, merge_dicts]
+    project_path: str
+
+
+class MilestoneState(TypedDict):
+    """State of the proposal/consensus stage for a single milestone."""
+
     current_milestone: str
     milestone_folder: str
-    llm_proposals: Annotated[dict, merge_dicts]
+    project_plan: str
+    tech_stack: str
     project_path: str
+    llm_proposals: Annotated[dict, merge_dicts]
+    # Proposers that missed the quorum and were cancelled (or failed)
+    late_proposals: list[str]
     chosen_approach: str
-    memory: InMemorySaver
+    feedback: str
+    revision_needed: bool
 
 
-def call_project_lead(state: ManagerState):
-    """Generates or revises the project plan."""
-    project_lead = get_project_lead_agent(memory=state.get("memory"))
-    user_query = state.get("input")
-    revision_needed = state.get("revision_needed", False)
-    current_plan = state.get("project_plan", "")
-    feedback = state.get("feedback", "")
+# Caps how many milestones run their proposal/consensus stage at the same time.
+# One semaphore per event loop: asyncio primitives cannot move between loops
+_milestone_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
 
-    if revision_needed:
-        console.rule("[bold yellow]Revising SRS[/bold yellow]")
-        with console.status("[bold green]Incorporating feedback...", spinner="dots"):
-            revision_prompt = (
-                f"You previously generated the following SRS document for this request:\n\n"
-                f"--- ORIGINAL USER REQUEST ---\n{user_query}\n\n"
-                f"--- CURRENT SRS DOCUMENT ---\n{current_plan}\n\n"
-                f"--- USER FEEDBACK ---\n{feedback}\n\n"
-                f"Please revise the SRS document to incorporate the user's feedback. "
-                f"Output ONLY the complete revised SRS document."
-            )
-            response = project_lead.invoke(
-                {"messages": [HumanMessage(content=revision_prompt)]}
-            )
-    else:
-        console.rule("[bold cyan]Generating Project Plan[/bold cyan]")
-        with console.status("[bold green]Thinking...", spinner="dots"):
-            response = project_lead.invoke(
-                {"messages": [HumanMessage(content=user_query)]}
-            )
 
-    plan_text = extract_text(response)
+def milestone_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _milestone_slots:
+        _milestone_slots[loop] = asyncio.Semaphore(max(1, settings.MILESTONE_CONCURRENCY))
+    return _milestone_slots[loop]
 
-    project_path = state.get("project_path", "outputs")
-    save_file("project_plan.md", plan_text, base_path=project_path)
-    markdown_to_pdf("project_plan.md", "project_plan.pdf", base_path=project_path)
-    console.print("[bold green]✓ Project plan saved[/bold green]")
 
-    return {"project_plan": plan_text, "revision_needed": False}
 
+def apply_review(answer: dict, subject: str) -> dict:
+    """Turns a review answer ({"action": "approve"|"edit", "feedback": ...}) into state."""
+    if answer.get("action") == "edit" and answer.get("feedback", "").strip():
+        console.print(f"[bold yellow]{subject}: changes requested[/bold yellow]")
+        return {"revision_needed": True, "feedback": answer["feedback"].strip()}
+    console.print(f"[bold green]{subject} approved ✓[/bold green]")
+    return {"revision_needed": False}
 
-def human_review(state: ManagerState):
-    """Asks the user for review and sets the next path."""
-    console.rule("[bold magenta]SRS Review[/bold magenta]")
-    project_path = state.get("project_path", "outputs")
+
+def ask_for_review(request: dict) -> dict:
+    """Prompts on the console for a review interrupt raised by the graph."""
+    console.rule("[bold magenta]Review[/bold magenta]")
+    details = ""
+    if request.get("milestone"):
+        details += f"[bold]Milestone:[/bold] {request['milestone']}\n"
+    details += (
+        f"[bold]Markdown:[/bold] {request['files']['markdown']}\n"
+        f"[bold]PDF:[/bold]      {request['files']['pdf']}"
+    )
     console.print(
         Panel(
-            f"[bold]Markdown:[/bold] {project_path}/project_plan.md\n[bold]PDF:[/bold]      {project_path}/project_plan.pdf",
-            title="[bold blue]Documents Ready for Review[/bold blue]",
+            details,
+            title=f"[bold blue]{request['title']}[/bold blue]",
             border_style="green",
         )
     )
@@ -110,14 +160,13 @@ def human_review(state: ManagerState):
     while True:
         decision = (
             console.input(
-                "[bold yellow]Do you approve this SRS? (approve/edit): [/bold yellow]"
+                f"[bold yellow]{request['question']} (approve/edit): [/bold yellow]"
             )
             .strip()
             .lower()
         )
         if decision == "approve":
-            console.print("[bold green]SRS approved ✓[/bold green]")
-            return {"revision_needed": False}
+            return {"action": "approve"}
         elif decision == "edit":
             feedback = console.input(
                 "[bold cyan]What changes should be made? [/bold cyan]"
@@ -127,170 +176,389 @@ def human_review(state: ManagerState):
                     "[bold red]No feedback provided. Please try again.[/bold red]"
                 )
                 continue
-            return {"revision_needed": True, "feedback": feedback}
+            return {"action": "edit", "feedback": feedback}
         else:
             console.print(
                 "[bold red]Invalid input. Please enter 'approve' or 'edit'.[/bold red]"
             )
 
 
-def call_milestone(state: ManagerState):
-    """Generates milestones based on the plan."""
-    console.rule("[bold cyan]Generating Milestones[/bold cyan]")
-    with console.status("[bold green]Analyzing plan...", spinner="dots"):
-        milestone_agent = get_milestone_agent(memory=state.get("memory"))
-        project_plan = state["project_plan"]
+async def invoke_structured(
+    agent, request: str, schema: type[BaseModel], label: str, status: str
+) -> Optional[BaseModel]:
+    """Runs a schema-constrained agent; None when its output does not validate."""
+    with node_progress(label, status) as callbacks:
+        try:
+            data = await agent.ainvoke({"input": request}, {"callbacks": callbacks})
+            return schema.model_validate(data)
+        except (OutputParserException, ValidationError) as e:
+            console.print(
+                f"[bold yellow]⚠ {label}: structured output did not validate "
+                f"({type(e).__name__}); using the markdown agent[/bold yellow]"
+            )
+            return None
+
+
+async def invoke_roster_agent(
+    make_agent, request: str, label: str, status: str, path: Optional[str] = None
+) -> str:
+    """Runs a markdown agent that assigns work to LLMs.
+
+    With INLINE_LLM_ROSTER the roster is in the prompt; output naming LLMs
+    outside it is regenerated by the agent that calls list_llms.
+    """
+    attempts = [True, False] if settings.INLINE_LLM_ROSTER else [False]
+    for inline_roster in attempts:
+        with node_progress(label, status, path) as callbacks:
+            response = await make_agent(inline_roster=inline_roster).ainvoke(
+                {"messages": [HumanMessage(content=request)]},
+                {"callbacks": callbacks},
+            )
+        text = extract_text(response)
+        problem = check_llm_names(text) if inline_roster else None
+        if problem is None:
+            return text
+        console.print(
+            f"[bold yellow]⚠ {label}: {problem}; asking again with the list_llms tool"
+            f"[/bold yellow]"
+        )
+    return text
+
+
+async def generate_plan(request: str, plan_path: str, status: str) -> str:
+    """The SRS for a user request or revision prompt."""
+    if settings.STRUCTURED_OUTPUTS:
+        output = await invoke_structured(
+            get_structured_project_lead_agent(),
+            request,
+            ProjectLeadOutput,
+            "Project Lead",
+            status,
+        )
+        if output is not None:
+            return render_srs(output)
+
+    return await invoke_roster_agent(
+        get_project_lead_agent, request, "Project Lead", status, plan_path
+    )
 
-        response = milestone_agent.invoke(
+
+async def revise_plan_sections(
+    user_query: str, current_plan: str, feedback: str
+) -> Optional[str]:
+    """Asks for the changed SRS sections only and merges them into the plan.
+
+    Returns None when the revision cannot be merged, so the caller can fall
+    back to regenerating the whole document.
+    """
+    with node_progress(
+        "Project Lead", "[bold green]Revising affected sections..."
+    ) as callbacks:
+        response = await get_srs_revision_agent().ainvoke(
             {
-                "messages": [
-                    HumanMessage(
-                        content=f"Create a milestone table based on this plan:\n\n{project_plan}"
-                    )
-                ],
+                "input": (
+                    f"--- ORIGINAL USER REQUEST ---\n{user_query}\n\n"
+                    f"--- CURRENT SRS DOCUMENT ---\n{current_plan}\n\n"
+                    f"--- REVIEWER FEEDBACK ---\n{feedback}"
+                )
             },
-            {"configurable": {"thread_id": "1"}},
+            {"callbacks": callbacks},
         )
-        milestones = extract_text(response)
 
-        project_path = state.get("project_path", "outputs")
-        save_file("milestone.md", milestones, base_path=project_path)
-        markdown_to_pdf("milestone.md", "milestone.pdf", base_path=project_path)
+    try:
+        plan_text, changes = apply_srs_patch(current_plan, extract_text(response))
+    except SRSPatchError as e:
+        console.print(
+            f"[bold yellow]⚠ Section revision could not be merged ({e}); "
+            f"regenerating the full SRS[/bold yellow]"
+        )
+        return None
+    console.print(f"[dim]SRS sections: {'; '.join(changes)}[/dim]")
+    return plan_text
 
-    console.print("[bold green]✓ Milestones saved[/bold green]")
-    return {"milestones": milestones}
+
+async def call_project_lead(state: ManagerState):
+    """Generates or revises the project plan."""
+    user_query = state.get("input")
+    revision_needed = state.get("revision_needed", False)
+    current_plan = state.get("project_plan", "")
+    feedback = state.get("feedback", "")
+    project_path = state.get("project_path", "outputs")
+    plan_path = artifact_path("project_plan.md", project_path)
+
+    if revision_needed:
+        console.rule("[bold yellow]Revising SRS[/bold yellow]")
+        plan_text = None
+        if current_plan and settings.SRS_REVISION_MODE == "patch":
+            plan_text = await revise_plan_sections(user_query, current_plan, feedback)
+        if plan_text is None:
+            revision_prompt = (
+                f"You previously generated the following SRS document for this request:\n\n"
+                f"--- ORIGINAL USER REQUEST ---\n{user_query}\n\n"
+                f"--- CURRENT SRS DOCUMENT ---\n{current_plan}\n\n"
+                f"--- USER FEEDBACK ---\n{feedback}\n\n"
+                f"Please revise the SRS document to incorporate the user's feedback. "
+                f"Output ONLY the complete revised SRS document."
+            )
+            plan_text = await generate_plan(
+                revision_prompt, plan_path, "[bold green]Incorporating feedback..."
+            )
+    else:
+        console.rule("[bold cyan]Generating Project Plan[/bold cyan]")
+        plan_text = await generate_plan(user_query, plan_path, "[bold green]Thinking...")
+
+    save_file("project_plan.md", plan_text, base_path=project_path)
+    render_pdf(plan_text, "project_plan.pdf", base_path=project_path)
+    console.print("[bold green]✓ Project plan saved[/bold green]")
+
+    return {"project_plan": plan_text, "revision_needed": False}
 
 
-def call_flow_diagram(state: ManagerState):
+async def human_review(state: ManagerState):
+    """Pauses the run until the SRS is approved or edited."""
+    project_path = state.get("project_path", "outputs")
+    await wait_for_pdf("project_plan.pdf", project_path)
+    answer = interrupt(
+        {
+            "review": "srs",
+            "title": "Documents Ready for Review",
+            "question": "Do you approve this SRS?",
+            "files": {
+                "markdown": artifact_path("project_plan.md", project_path),
+                "pdf": artifact_path("project_plan.pdf", project_path),
+            },
+        }
+    )
+    return apply_review(answer, "SRS")
+
+
+@tracked_artifact(
+    "milestones",
+    inputs=lambda state: {
+        "srs": state["project_plan"],
+        "model": settings.GPT_LLM,
+        "prompt": (
+            MILESTONE_STRUCTURED_TEMPLATE
+            if settings.STRUCTURED_OUTPUTS
+            else MILESTONE_INLINE_TEMPLATE
+            if settings.INLINE_LLM_ROSTER
+            else MILESTONE_TEMPLATE
+        ),
+        # The agent assigns milestones to the LLMs on the roster
+        "llms": get_llm_roster(),
+    },
+    files=lambda state: ["milestone.md", "milestone.pdf"],
+)
+async def call_milestone(state: ManagerState):
+    """Generates milestones based on the plan."""
+    console.rule("[bold cyan]Generating Milestones[/bold cyan]")
+    project_path = state.get("project_path", "outputs")
+    project_plan = state["project_plan"]
+
+    output = None
+    if settings.STRUCTURED_OUTPUTS:
+        output = await invoke_structured(
+            get_structured_milestone_agent(),
+            f"Create the milestones for this plan:\n\n{project_plan}",
+            MilestoneOutput,
+            "Milestones",
+            "[bold green]Analyzing plan...",
+        )
+
+    if output is not None:
+        milestones = render_milestones(output)
+        items = [milestone.model_dump() for milestone in output.milestones]
+    else:
+        milestones = await invoke_roster_agent(
+            get_milestone_agent,
+            f"Create a milestone table based on this plan:\n\n{project_plan}",
+            "Milestones",
+            "[bold green]Analyzing plan...",
+            artifact_path("milestone.md", project_path),
+        )
+        items = []
+
+    save_file("milestone.md", milestones, base_path=project_path)
+    render_pdf(milestones, "milestone.pdf", base_path=project_path)
+
+    console.print("[bold green]✓ Milestones saved[/bold green]")
+    return {"milestones": milestones, "milestone_items": items}
+
+
+def validate_flow_diagram(code: str):
+    """Parses the diagram locally, repairing common breakages; returns (code, error)."""
+    code, fixes, error = repair_flowchart(code)
+    if fixes:
+        console.print(f"[dim]Flow diagram auto-fixed: {'; '.join(fixes)}[/dim]")
+    return code, error
+
+
+@tracked_artifact(
+    "flow_diagram",
+    inputs=lambda state: {
+        "srs": state["project_plan"],
+        "model": settings.MISTRAL_LLM,
+        "prompt": FLOW_DIAGRAM_TEMPLATE,
+        "renderer": settings.MERMAID_RENDERER,
+        "formats": settings.MERMAID_FORMATS,
+    },
+    # An invalid diagram is saved without images, so it is retried next run
+    files=lambda state: [
+        "flow_diagram.mmd",
+        *(f"flow_diagram.{fmt}" for fmt in settings.MERMAID_FORMATS),
+    ],
+)
+async def call_flow_diagram(state: ManagerState):
     """Generates a flow diagram based on the plan."""
     console.rule("[bold cyan]Generating Flow Diagram[/bold cyan]")
-    with console.status("[bold green]Designing system flow...", spinner="dots"):
+    with node_progress(
+        "Flow Diagram", "[bold green]Designing system flow..."
+    ) as callbacks:
         flow_diagram_agent = get_flow_diagram_agent()
         project_plan = state["project_plan"]
+        request = f"Create a flow diagram based on this:\n\n{project_plan}"
 
-        response = flow_diagram_agent.invoke(
-            {"input": ("Create a flow diagram based on this:\n\n" f"{project_plan}")}
+        response = await flow_diagram_agent.ainvoke(
+            {"input": request}, {"callbacks": callbacks}
         )
-        flow_diagram_code = extract_text(response)
+        flow_diagram_code, error = validate_flow_diagram(extract_text(response))
 
-        if not flow_diagram_code.strip().startswith("graph"):
+        # Re-prompt only when local repair could not fix the diagram
+        for attempt in range(settings.FLOW_DIAGRAM_MAX_RETRIES):
+            if error is None:
+                break
             console.print(
-                "[bold red]Warning: unexpected Mermaid code format[/bold red]"
+                f"[bold yellow]Flow diagram has a syntax error ({error}); "
+                f"asking for a fix ({attempt + 1}/{settings.FLOW_DIAGRAM_MAX_RETRIES})[/bold yellow]"
+            )
+            response = await flow_diagram_agent.ainvoke(
+                {
+                    "input": (
+                        f"{request}\n\n--- YOUR PREVIOUS DIAGRAM ---\n{flow_diagram_code}\n\n"
+                        f"--- SYNTAX ERROR ---\nLine {error.line}, column {error.column}: "
+                        f"{error.message}\n{error.pointer()}\n\n"
+                        f"Return the corrected mermaid code only."
+                    )
+                },
+                {"callbacks": callbacks},
             )
+            flow_diagram_code, error = validate_flow_diagram(extract_text(response))
 
         project_path = state.get("project_path", "outputs")
-        generate_flow_diagram(flow_diagram_code, project_path)
+        if error is None:
+            await asyncio.to_thread(
+                generate_flow_diagram, flow_diagram_code, project_path
+            )
+        else:
+            save_file("flow_diagram.mmd", flow_diagram_code, base_path=project_path)
+            console.print(
+                f"[bold red]Flow diagram still invalid ({error}); "
+                f"saved the source without rendering[/bold red]"
+            )
 
     console.print("[bold green]✓ Flow diagram generated[/bold green]")
     return {"flow_diagram_code": flow_diagram_code}
 
 
-def call_tech_stack(state: ManagerState):
+@tracked_artifact(
+    "tech_stack",
+    inputs=lambda state: {
+        "srs": state["project_plan"],
+        "model": settings.DEEPSEEK_LLM,
+        "prompt": TECH_STACK_AGENT_PROMPT,
+    },
+    files=lambda state: ["tech_stack.md", "tech_stack.pdf"],
+    # Revisions always run; the approved revision is what later runs reuse
+    always_run=lambda state: state.get("revision_needed", False),
+)
+async def call_tech_stack(state: ManagerState):
     """Generates or revises a tech stack based on the SRS document."""
-    tech_stack_agent = get_tech_stack_agent(memory=state.get("memory"))
+    tech_stack_agent = get_tech_stack_agent()
     project_plan = state["project_plan"]
     revision_needed = state.get("revision_needed", False)
     current_tech_stack = state.get("tech_stack", "")
     feedback = state.get("feedback", "")
+    project_path = state.get("project_path", "outputs")
+    tech_stack_path = artifact_path("tech_stack.md", project_path)
 
     if revision_needed:
         console.rule("[bold yellow]Revising Tech Stack[/bold yellow]")
-        with console.status(
-            "[bold green]Revising based on feedback...", spinner="dots"
-        ):
+        with node_progress(
+            "Tech Stack", "[bold green]Revising based on feedback...", tech_stack_path
+        ) as callbacks:
             prompt = (
                 f"Project Plan:\n\n{project_plan}\n\n"
                 f"--- EXISTING TECH STACK ---\n{current_tech_stack}\n\n"
                 f"--- USER FEEDBACK ---\n{feedback}\n\n"
                 f"Please revise the Tech Stack table based on the feedback. Output ONLY the table."
             )
-            response = tech_stack_agent.invoke(
-                {"messages": [HumanMessage(content=prompt)]}
+            response = await tech_stack_agent.ainvoke(
+                {"messages": [HumanMessage(content=prompt)]},
+                {"callbacks": callbacks},
             )
     else:
         console.rule("[bold cyan]Generating Tech Stack[/bold cyan]")
-        with console.status("[bold green]Designing tech stack...", spinner="dots"):
-            response = tech_stack_agent.invoke(
+        with node_progress(
+            "Tech Stack", "[bold green]Designing tech stack...", tech_stack_path
+        ) as callbacks:
+            response = await tech_stack_agent.ainvoke(
                 {
                     "messages": [
                         HumanMessage(content=f"Project Plan:\n\n{project_plan}")
                     ]
                 },
-                {"configurable": {"thread_id": "1"}},
+                {"callbacks": callbacks},
             )
 
     tech_stack = extract_text(response)
 
-    project_path = state.get("project_path", "outputs")
     save_file("tech_stack.md", tech_stack, base_path=project_path)
-    markdown_to_pdf("tech_stack.md", "tech_stack.pdf", base_path=project_path)
+    render_pdf(tech_stack, "tech_stack.pdf", base_path=project_path)
     console.print("[bold green]✓ Tech stack saved[/bold green]")
 
     return {"tech_stack": tech_stack, "revision_needed": False}
 
 
-def tech_stack_review(state: ManagerState):
-    """Asks the user for review of the tech stack."""
-    console.rule("[bold magenta]Tech Stack Review[/bold magenta]")
+async def tech_stack_review(state: ManagerState):
+    """Pauses the run until the tech stack is approved or edited."""
     project_path = state.get("project_path", "outputs")
-    console.print(
-        Panel(
-            f"[bold]Markdown:[/bold] {project_path}/tech_stack.md\n[bold]PDF:[/bold]      {project_path}/tech_stack.pdf",
-            title="[bold blue]Tech Stack Ready for Review[/bold blue]",
-            border_style="green",
-        )
+    await wait_for_pdf("tech_stack.pdf", project_path)
+    answer = interrupt(
+        {
+            "review": "tech_stack",
+            "title": "Tech Stack Ready for Review",
+            "question": "Do you approve this Tech Stack?",
+            "files": {
+                "markdown": artifact_path("tech_stack.md", project_path),
+                "pdf": artifact_path("tech_stack.pdf", project_path),
+            },
+        }
     )
+    return apply_review(answer, "Tech Stack")
 
-    while True:
-        decision = (
-            console.input(
-                "[bold yellow]Do you approve this Tech Stack? (approve/edit): [/bold yellow]"
-            )
-            .strip()
-            .lower()
-        )
-        if decision == "approve":
-            console.print("[bold green]Tech Stack approved ✓[/bold green]")
-            return {"revision_needed": False}
-        elif decision == "edit":
-            feedback = console.input(
-                "[bold cyan]What changes should be made? [/bold cyan]"
-            ).strip()
-            if not feedback:
-                console.print(
-                    "[bold red]No feedback provided. Please try again.[/bold red]"
-                )
-                continue
-            return {"revision_needed": True, "feedback": feedback}
-        else:
-            console.print(
-                "[bold red]Invalid input. Please enter 'approve' or 'edit'.[/bold red]"
-            )
+
+# Artifacts that only depend on the approved SRS; generated as parallel branches.
+PLAN_ARTIFACT_NODES = ["call_milestone", "call_flow_diagram", "call_tech_stack"]
 
 
-def check_review(state: ManagerState) -> Literal["call_project_lead", "call_milestone"]:
+def check_review(state: ManagerState) -> str | list[str]:
     if state.get("revision_needed"):
         return "call_project_lead"
-    return "call_milestone"
+    return PLAN_ARTIFACT_NODES
 
 
 def check_tech_stack_review(
     state: ManagerState,
-) -> Literal["call_tech_stack", "pick_milestone"]:
+) -> Literal["revise_tech_stack", "pick_milestone"]:
     if state.get("revision_needed"):
-        return "call_tech_stack"
+        return "revise_tech_stack"
     return "pick_milestone"
 
 
-def pick_milestone(state: ManagerState):
-    """Extracts the first milestone from the milestone table."""
-    console.rule("[bold cyan]Picking First Milestone[/bold cyan]")
-    milestones_text = state.get("milestones", "")
-
-    # Parse the markdown table to get the first milestone description
-    lines = milestones_text.strip().split("\n")
-    first_milestone = ""
-    for line in lines:
+def parse_milestones(milestones_text: str) -> list[str]:
+    """Extracts the milestone descriptions from the milestone table."""
+    milestones = []
+    for line in milestones_text.strip().split("\n"):
         # Skip header rows and separator rows
         if (
             line.startswith("|")
@@ -300,49 +568,111 @@ def pick_milestone(state: ManagerState):
         ):
             cols = [col.strip() for col in line.split("|") if col.strip()]
             if len(cols) >= 2:
-                first_milestone = cols[1]
-                break
+                milestones.append(cols[1])
+    return milestones
 
-    if not first_milestone:
-        first_milestone = "First milestone from the project plan"
 
-    console.print(f"[bold]Selected Milestone:[/bold] {first_milestone}")
-    return {
-        "current_milestone": first_milestone,
-        "milestone_folder": "milestone_1",
-        "llm_proposals": {},
-    }
+def milestone_brief(item: dict) -> str:
+    """One structured milestone as the text proposers are given."""
+    brief = f"{item['name']}: {item['description']}"
+    if item.get("tasks"):
+        brief += f" (tasks: {'; '.join(item['tasks'])})"
+    return brief
+
+
+def pick_milestone(state: ManagerState):
+    """Selects the milestones to run through the proposal/consensus stage."""
+    milestone_list = [
+        milestone_brief(item) for item in state.get("milestone_items") or []
+    ] or parse_milestones(state.get("milestones", ""))
+
+    if not milestone_list:
+        milestone_list = ["First milestone from the project plan"]
+
+    if settings.MILESTONE_MODE == "all":
+        console.rule(f"[bold cyan]Picking All {len(milestone_list)} Milestones[/bold cyan]")
+    else:
+        console.rule("[bold cyan]Picking First Milestone[/bold cyan]")
+        milestone_list = milestone_list[:1]
+
+    for milestone in milestone_list:
+        console.print(f"[bold]Selected Milestone:[/bold] {milestone}")
+    return {"milestone_list": milestone_list, "milestone_decisions": {}}
+
+
+def dispatch_milestones(state: ManagerState) -> list[Send]:
+    """Fans out one process_milestone task per selected milestone."""
+    return [
+        Send(
+            "process_milestone",
+            {
+                "current_milestone": milestone,
+                "milestone_folder": f"milestone_{index}",
+                "project_plan": state.get("project_plan", ""),
+                "tech_stack": state.get("tech_stack", ""),
+                "project_path": state.get("project_path", "outputs"),
+                "llm_proposals": {},
+            },
+        )
+        for index, milestone in enumerate(state.get("milestone_list", []), start=1)
+    ]
+
+
+def make_milestone_node(milestone_app):
+    """Factory: returns a node that runs the milestone subgraph for one milestone."""
+
+    async def process_milestone(state: MilestoneState):
+        folder = state["milestone_folder"]
+        async with milestone_slots():
+            console.rule(f"[bold cyan]Milestone: {folder}[/bold cyan]")
+            result = await milestone_app.ainvoke(state)
+        return {"milestone_decisions": {folder: result.get("chosen_approach", "")}}
+
+    return process_milestone
+
+
+def proposal_file(state: MilestoneState, llm_name: str) -> str:
+    folder = state.get("milestone_folder", "milestone_1")
+    return f"{folder}/proposal_{llm_name.lower().replace(' ', '_')}.md"
 
 
 def make_proposal_node(llm_name: str, model_name: str):
     """Factory: returns a node function that generates a proposal for the given LLM."""
 
-    def propose(state: ManagerState):
+    async def propose(state: MilestoneState):
         console.print(
             f"[bold blue]  ➤ {llm_name} ({model_name}) proposing...[/bold blue]"
         )
         agent = get_consensus_agent(model_name)
         milestone = state["current_milestone"]
-        project_plan = state.get("project_plan", "")
         tech_stack = state.get("tech_stack", "")
+        # Only the SRS sections relevant to this milestone, within the token budget
+        srs_context = select_srs_context(state.get("project_plan", ""), milestone)
 
         input_text = (
             f"## Milestone\n{milestone}\n\n"
-            f"## Project Plan (SRS)\n{project_plan}\n\n"
+            f"## Project Plan (SRS)\n{srs_context}\n\n"
             f"## Tech Stack\n{tech_stack}"
         )
 
-        with console.status(f"[bold green]{llm_name} thinking...", spinner="dots"):
-            response = agent.invoke({"input": input_text})
+        folder = state.get("milestone_folder", "milestone_1")
+        file_path = proposal_file(state, llm_name)
+        project_path = state.get("project_path", "outputs")
+
+        with node_progress(
+            f"{llm_name} ({folder})",
+            f"[bold green]{llm_name} thinking...",
+            artifact_path(file_path, project_path),
+            header=f"# Proposal from {llm_name}\n\n",
+        ) as callbacks:
+            response = await agent.ainvoke(
+                {"input": input_text}, {"callbacks": callbacks}
+            )
 
         proposal = response.content if hasattr(response, "content") else str(response)
         console.print(f"[bold green]  ✓ {llm_name} done[/bold green]")
 
         # Save individual proposal
-        folder = state.get("milestone_folder", "milestone_1")
-        safe_name = llm_name.lower().replace(" ", "_")
-        file_path = f"{folder}/proposal_{safe_name}.md"
-        project_path = state.get("project_path", "outputs")
         save_file(
             file_path,
             f"# Proposal from {llm_name}\n\n{proposal}",
@@ -355,21 +685,127 @@ def make_proposal_node(llm_name: str, model_name: str):
         updated = {**existing, llm_name: proposal}
         return {"llm_proposals": updated}
 
-    return propose
+    # A proposal only sees its milestone, the SRS sections selected for it and
+    # the tech stack, so unrelated SRS edits do not invalidate it
+    return tracked_artifact(
+        lambda state: proposal_file(state, llm_name).removesuffix(".md"),
+        inputs=lambda state: {
+            "milestone": state["current_milestone"],
+            "srs": select_srs_context(
+                state.get("project_plan", ""), state["current_milestone"]
+            ),
+            "tech_stack": state.get("tech_stack", ""),
+            "model": model_name,
+            "prompt": CONSENSUS_PROMPT,
+        },
+        files=lambda state: [proposal_file(state, llm_name)],
+    )(propose)
+
+
+def make_collect_proposals_node(proposers: dict):
+    """Factory: returns a node that runs every proposer and stops at the quorum.
+
+    The decision goes ahead once PROPOSAL_QUORUM proposals have arrived, or
+    PROPOSAL_DEADLINE seconds after the proposers started with whatever has
+    arrived by then (at least one). Proposers still running are cancelled,
+    which frees their GPU slot, and are listed in late_proposals.
+    """
+
+    async def collect_proposals(state: MilestoneState):
+        folder = state.get("milestone_folder", "milestone_1")
+        quorum = min(settings.PROPOSAL_QUORUM or len(proposers), len(proposers))
+        loop = asyncio.get_running_loop()
+        deadline = (
+            loop.time() + settings.PROPOSAL_DEADLINE if settings.PROPOSAL_DEADLINE > 0 else None
+        )
 
+        tasks = {
+            asyncio.ensure_future(propose(state)): llm_name
+            for llm_name, propose in proposers.items()
+        }
+        pending = set(tasks)
+        proposals: dict[str, str] = {}
+        failed: list[str] = []
+        errors: list[BaseException] = []
+        try:
+            while pending and len(proposals) < quorum:
+                # The deadline only applies once there is a proposal to decide on
+                timeout = (
+                    max(deadline - loop.time(), 0)
+                    if deadline is not None and proposals
+                    else None
+                )
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    llm_name = tasks[task]
+                    try:
+                        proposals[llm_name] = task.result()["llm_proposals"][llm_name]
+                    except Exception as e:
+                        console.print(f"[bold red]  ✗ {llm_name} failed: {e}[/bold red]")
+                        failed.append(llm_name)
+                        errors.append(e)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if not proposals:
+            if errors:
+                raise errors[0]
+            raise RuntimeError(
+                f"No proposals were produced for {folder}: no proposal LLMs are "
+                "configured (set at least one *_LLM variable)"
+            )
 
-def manager_decision(state: ManagerState):
+        late = [tasks[task] for task in pending]
+        project_path = state.get("project_path", "outputs")
+        for llm_name in late:
+            # A streamed proposal may have been written in part
+            partial_path = artifact_path(proposal_file(state, llm_name), project_path)
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        if late or failed:
+            console.print(
+                f"[bold yellow]  Deciding with {len(proposals)}/{len(proposers)} proposals "
+                f"({folder}); not waiting for {', '.join(late + failed)}[/bold yellow]"
+            )
+        # Keep the proposer order, so the decision prompt does not depend on timing
+        ordered = {name: proposals[name] for name in proposers if name in proposals}
+        return {"llm_proposals": ordered, "late_proposals": late + failed}
+
+    return collect_proposals
+
+
+@tracked_artifact(
+    lambda state: f"{state.get('milestone_folder', 'milestone_1')}/consensus_decision",
+    inputs=lambda state: {
+        "milestone": state.get("current_milestone", ""),
+        "proposals": state.get("llm_proposals", {}),
+        "digest": (settings.PROPOSAL_BUDGET_TOKENS, settings.PROPOSAL_DEDUP_THRESHOLD),
+        "model": settings.DEEPSEEK_LLM,
+        "prompt": MANAGER_DECISION_PROMPT,
+    },
+    files=lambda state: [
+        f"{state.get('milestone_folder', 'milestone_1')}/consensus_decision.md",
+        f"{state.get('milestone_folder', 'milestone_1')}/consensus_decision.pdf",
+    ],
+    always_run=lambda state: state.get("revision_needed", False),
+)
+async def manager_decision(state: MilestoneState):
     """The manager evaluates all LLM proposals and picks the best one."""
-    console.rule("[bold cyan]Manager Decision[/bold cyan]")
+    folder = state.get("milestone_folder", "milestone_1")
+    console.rule(f"[bold cyan]Manager Decision ({folder})[/bold cyan]")
     proposals = state.get("llm_proposals", {})
     milestone = state.get("current_milestone", "")
     revision_needed = state.get("revision_needed", False)
     feedback = state.get("feedback", "")
 
-    # Build a summary of all proposals
-    proposals_text = ""
-    for llm_name, proposal in proposals.items():
-        proposals_text += f"\n### Proposal from {llm_name}\n{proposal}\n"
+    # Near-duplicates merged and trimmed to the proposal token budget
+    proposals_text = format_proposals(proposals)
 
     if revision_needed and feedback:
         input_text = (
@@ -383,80 +819,144 @@ def manager_decision(state: ManagerState):
         input_text = f"## Milestone\n{milestone}\n\n" f"## Proposals\n{proposals_text}"
 
     manager_agent = get_manager_decision_agent()
+    project_path = state.get("project_path", "outputs")
 
-    with console.status("[bold green]Manager evaluating proposals...", spinner="dots"):
-        response = manager_agent.invoke({"input": input_text})
+    with node_progress(
+        f"Manager Decision ({folder})",
+        "[bold green]Manager evaluating proposals...",
+        artifact_path(f"{folder}/consensus_decision.md", project_path),
+        header="# Consensus Decision\n\n",
+    ) as callbacks:
+        response = await manager_agent.ainvoke(
+            {"input": input_text}, {"callbacks": callbacks}
+        )
 
     chosen = response.content if hasattr(response, "content") else str(response)
 
     # Wrap with heading to satisfy markdown-pdf hierarchy requirement
-    folder = state.get("milestone_folder", "milestone_1")
     md_content = f"# Consensus Decision\n\n{chosen}"
-    project_path = state.get("project_path", "outputs")
     save_file(f"{folder}/consensus_decision.md", md_content, base_path=project_path)
-    try:
-        markdown_to_pdf(
-            f"{folder}/consensus_decision.md",
-            f"{folder}/consensus_decision.pdf",
-            base_path=project_path,
-        )
-    except Exception as e:
-        console.print(f"[bold yellow]⚠ PDF generation skipped: {e}[/bold yellow]")
+    render_pdf(md_content, f"{folder}/consensus_decision.pdf", base_path=project_path)
     console.print("[bold green]✓ Manager decision saved[/bold green]")
 
     return {"chosen_approach": chosen, "revision_needed": False}
 
 
-def consensus_review(state: ManagerState):
-    """HITL review for the manager's consensus decision."""
-    console.rule("[bold magenta]Consensus Review[/bold magenta]")
+async def consensus_review(state: MilestoneState):
+    """Pauses the milestone until the consensus decision is approved or edited."""
     folder = state.get("milestone_folder", "milestone_1")
     project_path = state.get("project_path", "outputs")
-    console.print(
-        Panel(
-            f"[bold]Markdown:[/bold] {project_path}/{folder}/consensus_decision.md\n[bold]PDF:[/bold]      {project_path}/{folder}/consensus_decision.pdf",
-            title="[bold blue]Consensus Decision Ready for Review[/bold blue]",
-            border_style="green",
-        )
+    await wait_for_pdf(f"{folder}/consensus_decision.pdf", project_path)
+    answer = interrupt(
+        {
+            "review": "consensus",
+            "title": "Consensus Decision Ready for Review",
+            "question": "Do you approve this decision?",
+            "milestone": state.get("current_milestone", ""),
+            "milestone_folder": folder,
+            "files": {
+                "markdown": artifact_path(f"{folder}/consensus_decision.md", project_path),
+                "pdf": artifact_path(f"{folder}/consensus_decision.pdf", project_path),
+            },
+        }
     )
-
-    while True:
-        decision = (
-            console.input(
-                "[bold yellow]Do you approve this decision? (approve/edit): [/bold yellow]"
-            )
-            .strip()
-            .lower()
-        )
-        if decision == "approve":
-            console.print("[bold green]Consensus decision approved ✓[/bold green]")
-            return {"revision_needed": False}
-        elif decision == "edit":
-            feedback = console.input(
-                "[bold cyan]What changes should be made? [/bold cyan]"
-            ).strip()
-            if not feedback:
-                console.print(
-                    "[bold red]No feedback provided. Please try again.[/bold red]"
-                )
-                continue
-            return {"revision_needed": True, "feedback": feedback}
-        else:
-            console.print(
-                "[bold red]Invalid input. Please enter 'approve' or 'edit'.[/bold red]"
-            )
+    return apply_review(answer, f"Consensus decision ({folder})")
 
 
 def check_consensus_review(
-    state: ManagerState,
+    state: MilestoneState,
 ) -> Literal["manager_decision", "__end__"]:
     if state.get("revision_needed"):
         return "manager_decision"
     return END
 
 
+def build_milestone_graph():
+    """Builds the proposal fan-out and consensus loop run for each milestone."""
+    workflow = StateGraph(MilestoneState)
+
+    workflow.add_node("manager_decision", manager_decision)
+    workflow.add_node("consensus_review", consensus_review)
+
+    available_llms = get_available_llms(unique_models=settings.DEDUPE_PROPOSAL_MODELS)
+    if settings.PROPOSAL_QUORUM > 0 or settings.PROPOSAL_DEADLINE > 0:
+        # One node, so the decision does not wait for the slowest proposer
+        workflow.add_node(
+            "collect_proposals",
+            make_collect_proposals_node(
+                {
+                    llm_info["name"]: make_proposal_node(llm_info["name"], llm_info["model"])
+                    for llm_info in available_llms
+                }
+            ),
+        )
+        workflow.add_edge(START, "collect_proposals")
+        workflow.add_edge("collect_proposals", "manager_decision")
+    else:
+        proposal_node_names = []
+        for llm_info in available_llms:
+            node_name = f"propose_{llm_info['name']}"
+            proposal_node_names.append(node_name)
+            workflow.add_node(
+                node_name, make_proposal_node(llm_info["name"], llm_info["model"])
+            )
+
+        for node_name in proposal_node_names:
+            workflow.add_edge(START, node_name)
+
+        for node_name in proposal_node_names:
+            workflow.add_edge(node_name, "manager_decision")
+
+    workflow.add_edge("manager_decision", "consensus_review")
+    workflow.add_conditional_edges("consensus_review", check_consensus_review)
+
+    return workflow.compile()
+
+
+def upcoming_models() -> dict[str, set[str]]:
+    """For each node that calls an LLM, the models the graph may call right after it.
+
+    Used to keep those models loaded and let the others unload.
+    """
+    proposal_models = {
+        llm["model"]
+        for llm in get_available_llms(unique_models=settings.DEDUPE_PROPOSAL_MODELS)
+    }
+    after_plan_artifacts = proposal_models | {settings.DEEPSEEK_LLM}
+    # A milestone's proposers run alongside each other, then the manager decides
+    after_proposal = proposal_models | {settings.DEEPSEEK_LLM}
+    after_decision = {settings.DEEPSEEK_LLM}
+    if settings.MILESTONE_MODE == "all":
+        after_decision |= proposal_models
+
+    plan = {
+        # The SRS review may send it back for revision, else the three branches start
+        "call_project_lead": {
+            settings.GPT_LLM,
+            settings.MISTRAL_LLM,
+            settings.DEEPSEEK_LLM,
+        },
+        "call_milestone": after_plan_artifacts,
+        "call_flow_diagram": after_plan_artifacts,
+        "call_tech_stack": after_plan_artifacts,
+        "revise_tech_stack": after_plan_artifacts,
+        "manager_decision": after_decision,
+    }
+    for llm in get_available_llms(unique_models=settings.DEDUPE_PROPOSAL_MODELS):
+        plan[f"propose_{llm['name']}"] = after_proposal
+    plan["collect_proposals"] = after_proposal
+    return plan
+
+
+def startup_models() -> list[str]:
+    """Every model the graph may call, in the order a run first needs them."""
+    models = [settings.GPT_LLM, settings.MISTRAL_LLM, settings.DEEPSEEK_LLM]
+    models += [model for _, model in get_llm_roster()]
+    return list(dict.fromkeys(models))
+
+
 class ManagerAgent:
-    def __init__(self):
+    def __init__(self, checkpointer: BaseCheckpointSaver):
         workflow = StateGraph(ManagerState)
 
         workflow.add_node("call_project_lead", call_project_lead)
@@ -464,55 +964,262 @@ class ManagerAgent:
         workflow.add_node("call_milestone", call_milestone)
         workflow.add_node("call_flow_diagram", call_flow_diagram)
         workflow.add_node("call_tech_stack", call_tech_stack)
+        # Tech stack revisions run alone, outside the fan-in of the first pass
+        workflow.add_node("revise_tech_stack", call_tech_stack)
         workflow.add_node("tech_stack_review", tech_stack_review)
 
         workflow.add_node("pick_milestone", pick_milestone)
-        workflow.add_node("manager_decision", manager_decision)
-        workflow.add_node("consensus_review", consensus_review)
-
-        available_llms = get_available_llms()
-        proposal_node_names = []
-        for llm_info in available_llms:
-            node_name = f"propose_{llm_info['name']}"
-            proposal_node_names.append(node_name)
-            workflow.add_node(
-                node_name, make_proposal_node(llm_info["name"], llm_info["model"])
-            )
+        workflow.add_node(
+            "process_milestone", make_milestone_node(build_milestone_graph())
+        )
 
         workflow.add_edge(START, "call_project_lead")
         workflow.add_edge("call_project_lead", "human_review")
-        workflow.add_conditional_edges("human_review", check_review)
+        workflow.add_conditional_edges(
+            "human_review", check_review, ["call_project_lead", *PLAN_ARTIFACT_NODES]
+        )
 
-        workflow.add_edge("call_milestone", "call_flow_diagram")
-        workflow.add_edge("call_flow_diagram", "call_tech_stack")
-        workflow.add_edge("call_tech_stack", "tech_stack_review")
+        # Fan-out: milestones, flow diagram and tech stack only read the SRS.
+        # Fan-in: the tech stack review waits for all three branches.
+        workflow.add_edge(PLAN_ARTIFACT_NODES, "tech_stack_review")
+        workflow.add_edge("revise_tech_stack", "tech_stack_review")
         workflow.add_conditional_edges("tech_stack_review", check_tech_stack_review)
 
-        for node_name in proposal_node_names:
-            workflow.add_edge("pick_milestone", node_name)
-
-        for node_name in proposal_node_names:
-            workflow.add_edge(node_name, "manager_decision")
-
-        workflow.add_edge("manager_decision", "consensus_review")
-        workflow.add_conditional_edges("consensus_review", check_consensus_review)
-
-        self.app = workflow.compile()
+        # One process_milestone task per milestone, bounded by milestone_slots
+        workflow.add_conditional_edges(
+            "pick_milestone", dispatch_milestones, ["process_milestone"]
+        )
+        workflow.add_edge("process_milestone", END)
+
+        context_window = get_context_window()
+        if context_window is not None:
+            context_window.set_upcoming_models(upcoming_models())
+        # Read the roster once; the agents inline it into their prompts
+        get_llm_roster()
+
+        # Review nodes interrupt the run; the checkpointer persists it meanwhile,
+        # so a paused, failed or killed run can be resumed by its run ID
+        self.app = workflow.compile(checkpointer=checkpointer)
+
+    @staticmethod
+    def run_config(run_id: str, recorder: Optional[TraceRecorder] = None) -> dict:
+        config = {"configurable": {"thread_id": run_id}}
+        if recorder is not None:
+            config["callbacks"] = [recorder]
+        return config
+
+    @staticmethod
+    def trace_recorder(run_id: str) -> Optional[TraceRecorder]:
+        return TraceRecorder(run_id) if settings.TRACE_ENABLED else None
+
+    async def save_trace(self, recorder: Optional[TraceRecorder]) -> Optional[str]:
+        """Writes (or extends) the run's trace in the project folder."""
+        if recorder is None or not recorder.spans:
+            return None
+        snapshot = await self.app.aget_state(self.run_config(recorder.run_id))
+        project_path = snapshot.values.get("project_path", "outputs")
+        path = artifact_path(f"traces/{recorder.run_id}.json", project_path)
+        return await asyncio.to_thread(recorder.write, path)
+
+    async def aprocess_request(
+        self,
+        user_query: str,
+        project_path: str,
+        use_cache: bool = True,
+        stream: bool = settings.STREAM_TOKENS,
+    ):
+        run_id = uuid.uuid4().hex
+        self.print_banner(run_id, user_query, project_path, use_cache)
+        graph_input = {"input": user_query, "project_path": project_path}
+        await self.drive(run_id, graph_input, use_cache, stream)
+
+    async def aresume_request(
+        self,
+        run_id: str,
+        use_cache: bool = True,
+        stream: bool = settings.STREAM_TOKENS,
+    ):
+        """Continues a run from its last checkpoint, re-asking any pending review."""
+        snapshot = await self.app.aget_state(self.run_config(run_id))
+        if not snapshot.values:
+            raise ValueError(f"Unknown run {run_id}")
+        if not snapshot.next:
+            console.print(f"[bold green]Run {run_id} has already completed[/bold green]")
+            return
+
+        self.print_banner(
+            run_id,
+            snapshot.values.get("input", ""),
+            snapshot.values.get("project_path", "outputs"),
+            use_cache,
+        )
+        console.print(
+            f"[bold]Resuming at:[/bold] {', '.join(sorted(set(snapshot.next)))}"
+        )
+        # A None input continues from the last checkpoint: finished nodes are
+        # not re-run, and interrupted reviews are raised again
+        await self.drive(run_id, None, use_cache, stream)
 
-    def process_request(self, user_query: str, project_path: str):
+    @staticmethod
+    def print_banner(run_id: str, user_query: str, project_path: str, use_cache: bool):
         title = pyfiglet.figlet_format("dev-council", font="slant")
         console.print(Text(title, style="bold magenta"))
 
         console.rule("[bold blue]New Request[/bold blue]")
         console.print(f"[bold]Requests:[/bold] {user_query}")
         console.print(f"[bold]Project Path:[/bold] {project_path}")
-
-        initial_state = {"input": user_query, "project_path": project_path}
-
-        self.app.invoke(initial_state)
+        console.print(f"[bold]Run ID:[/bold] {run_id}")
+        if not use_cache:
+            console.print("[bold]LLM Cache:[/bold] bypassed for this run")
+
+    async def drive(self, run_id: str, graph_input, use_cache: bool, stream: bool):
+        """Runs the graph until it completes, answering reviews on the console."""
+        recorder = self.trace_recorder(run_id)
+        config = self.run_config(run_id, recorder)
+        snapshot = await self.app.aget_state(self.run_config(run_id))
+        values = snapshot.values or (graph_input if isinstance(graph_input, dict) else {})
+        project_path = values.get("project_path", "outputs")
+        before = usage_counters(project_path)
+
+        try:
+            with cache_bypass(not use_cache), streaming_mode(stream):
+                while True:
+                    result = await self.app.ainvoke(graph_input, config)
+                    reviews = result.get("__interrupt__", [])
+                    if not reviews:
+                        break
+                    # Answer every pending review, then resume them together
+                    graph_input = Command(
+                        resume={
+                            review.id: ask_for_review(review.value) for review in reviews
+                        }
+                    )
+        except BaseException:
+            console.print(
+                f"[bold yellow]Run {run_id} stopped. Resume it with: "
+                f"python main.py resume {run_id}[/bold yellow]"
+            )
+            raise
+        finally:
+            trace_path = await self.save_trace(recorder)
 
         console.rule("[bold green]Process Completed Successfully[/bold green]")
+        # The counters are shared by the whole process, so report this run's share
+        after = usage_counters(project_path)
+        used = {key: value - before.get(key, 0) for key, value in after.items()}
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            stats = llm_cache.stats()
+            console.print(
+                f"[dim]LLM cache: {used['cache_hits']} hits, {used['cache_misses']} misses, "
+                f"{stats['entries']} entries ({stats['size_bytes'] / 1024:.0f} KiB)[/dim]"
+            )
+        if used["coalesced"]:
+            console.print(f"[dim]Coalesced {used['coalesced']} duplicate LLM requests[/dim]")
+        if get_schedulers():
+            console.print(f"[dim]Model scheduler: {used['model_loads']} model loads[/dim]")
+        pool = get_ollama_pool()
+        if pool is not None:
+            hosts = ", ".join(
+                f"{host['url']} {used['requests:' + host['url']]}"
+                + ("" if host["healthy"] else " (down)")
+                for host in pool.stats()["hosts"]
+            )
+            console.print(
+                f"[dim]Ollama hosts (requests): {hosts}; {used['failovers']} failovers[/dim]"
+            )
+        if used["truncations"]:
+            console.print(
+                f"[dim]{used['truncations']} prompts exceeded their context window[/dim]"
+            )
+        console.print(
+            f"[dim]PDFs: {used['pdfs_rendered']} rendered, {used['pdfs_skipped']} unchanged[/dim]"
+        )
+        if used["reused"]:
+            console.print(
+                f"[dim]Artifacts: {used['reused']} reused with unchanged inputs[/dim]"
+            )
+        if trace_path:
+            trace = recorder.summary()
+            console.print(
+                f"[dim]LLM: {trace['llm_calls']} calls ({trace['cached']} cached), "
+                f"{trace['prompt_tokens']} prompt / {trace['eval_tokens']} generated tokens, "
+                f"{trace['load_seconds']:.1f}s loading models, "
+                f"{trace['io_seconds']:.1f}s file I/O[/dim]"
+            )
+            console.print(
+                f"[dim]Trace: {trace_path} (open in https://ui.perfetto.dev)[/dim]"
+            )
 
 
-def get_manager():
-    return ManagerAgent()
+def usage_counters(project_path: str) -> dict[str, int]:
+    """The process-wide, cumulative counters behind a run's summary."""
+    counters = {
+        "coalesced": get_single_flight().stats()["coalesced"],
+        "model_loads": sum(
+            scheduler.stats()["model_loads"] for scheduler in get_schedulers()
+        ),
+        "reused": get_manifest(project_path).reused,
+    }
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        stats = llm_cache.stats()
+        counters["cache_hits"] = stats["hits"]
+        counters["cache_misses"] = stats["misses"]
+    pool = get_ollama_pool()
+    if pool is not None:
+        stats = pool.stats()
+        counters["failovers"] = stats["failovers"]
+        for host in stats["hosts"]:
+            counters["requests:" + host["url"]] = host["requests"]
+    context_window = get_context_window()
+    counters["truncations"] = (
+        len(context_window.truncations) if context_window is not None else 0
+    )
+    pdfs = get_pdf_renderer().stats()
+    counters["pdfs_rendered"] = pdfs["rendered"]
+    counters["pdfs_skipped"] = pdfs["skipped"]
+    return counters
+
+
+@asynccontextmanager
+async def open_manager():
+    """Yields a ManagerAgent backed by the durable checkpointer.
+
+    Both the checkpointer and the pooled Ollama clients are bound to the
+    running event loop, so they are opened and closed together here. The
+    configured models are checked before the manager is yielded.
+    """
+    async with open_checkpointer() as checkpointer:
+        warm_up = None
+        try:
+            manager = ManagerAgent(checkpointer)
+            # A missing model fails here, before any run starts
+            warm_up = await preflight(startup_models())
+            yield manager
+        finally:
+            if warm_up is not None:
+                warm_up.cancel()
+                await asyncio.gather(warm_up, return_exceptions=True)
+            await close_ollama_clients()
+            # Let PDFs nobody waited on (e.g. milestone.pdf) finish rendering
+            await asyncio.to_thread(get_pdf_renderer().shutdown)
+
+
+def process_request(
+    user_query: str,
+    project_path: str,
+    use_cache: bool = True,
+    stream: bool = settings.STREAM_TOKENS,
+):
+    """Synchronous entry point: runs the request on a fresh event loop.
+
+    The checkpointer and pooled clients are bound to that loop, so each call
+    opens its own manager.
+    """
+
+    async def run():
+        async with open_manager() as manager:
+            await manager.aprocess_request(user_query, project_path, use_cache, stream)
+
+    asyncio.run(run())
@@ -1,10 +1,12 @@
-from langgraph.checkpoint.memory import InMemorySaver
 from app.structured_outputs.milestone import MilestoneOutput
 from app.tools.save_file import save_file
 from langchain.agents import create_agent
-from langchain_ollama import ChatOllama
+from app.core.llm import get_chat_model
+from app.agents.registry import registered_agent
 from app.core.config import settings
-from app.tools.llm_resources import list_llms
+from app.tools.llm_resources import format_llm_roster, get_llm_roster, list_llms
+from app.structured_outputs.schema import json_schema_with_llms
+from langchain_core.prompts import ChatPromptTemplate
 
 
 MILESTONE_TEMPLATE = """You are the **Milestone Manager AI**.
@@ -68,18 +70,145 @@ Begin.
 """
 
 
-def get_milestone_agent(memory: InMemorySaver):
-    llm = ChatOllama(
-        model=settings.GPT_LLM,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+MILESTONE_INLINE_TEMPLATE = """You are the **Milestone Manager AI**.
+
+Your responsibility is to convert the provided project plan
+(from the Project Lead) into a **milestone planning document**.
+
+You are a **planning agent**.
+
+---
+
+## AVAILABLE LLMS
+
+{llms}
+
+---
+
+## INPUT
+You will receive a project plan containing:
+- Requirements
+- Subtasks
+
+You must extract coding milestones from this input.
+
+---
+
+## REQUIRED OUTPUT FORMAT (CRITICAL)
+
+Your FINAL output MUST be a **Markdown file** with:
+
+- One Markdown table
+- Each row represents ONE milestone
+- Each milestone MUST include:
+  - A checkbox
+  - A concise task description
+  - One assigned LLM
+
+### TABLE FORMAT (EXACT)
+
+| Milestone | Description | LLM |
+|-----------|------------|-----|
+| [ ] | Short description of the milestone | LLM name |
+
+---
+
+## STRICT RULES
+
+- Output **ONLY** the milestone plan (no explanations, no commentary).
+- **DO NOT** use fenced code blocks for the table.
+- **DO NOT** add extra headings, notes, or text.
+- **DO NOT** invent LLM names — use a name from AVAILABLE LLMS, verbatim
+  (e.g. `GPT_LLM`, without the model in parentheses).
+- Combine related subtasks into logical coding milestones.
+- Keep milestone descriptions short and action-oriented.
+- Planning only — no execution steps.
+
+---
+
+Begin.
+
+"""
+
+
+@registered_agent
+def get_milestone_agent(inline_roster: bool = settings.INLINE_LLM_ROSTER):
+    """With inline_roster the LLMs are listed in the prompt; otherwise the
+    agent has to call list_llms first, which costs an extra model turn."""
+    llm = get_chat_model(settings.GPT_LLM)
+    if inline_roster:
+        return create_agent(
+            model=llm,
+            tools=[],
+            system_prompt=MILESTONE_INLINE_TEMPLATE.format(llms=format_llm_roster()),
+        )
+
     tools = [list_llms]
     agent = create_agent(
         model=llm,
         tools=tools,
         system_prompt=MILESTONE_TEMPLATE,
-        checkpointer=memory,
     )
 
     return agent
+
+
+MILESTONE_STRUCTURED_TEMPLATE = """You are the **Milestone Manager AI**.
+
+Convert the provided project plan (from the Project Lead) into coding milestones.
+
+## OUTPUT
+JSON matching the given schema, one entry per milestone:
+- `name`: a short, action-oriented title
+- `description`: one sentence on what the milestone delivers
+- `tasks`: 2-5 short coding tasks
+- `llm`: the ONE available LLM best suited to the milestone
+
+## RULES
+- Combine related subtasks into logical coding milestones.
+- Planning only — no execution steps.
+
+## AVAILABLE LLMS
+{llms}
+"""
+
+structured_prompt = ChatPromptTemplate.from_messages(
+    [("system", MILESTONE_STRUCTURED_TEMPLATE), ("human", "{input}")]
+)
+
+
+@registered_agent
+def get_structured_milestone_agent():
+    """Milestones decoded against the MilestoneOutput schema; returns a dict."""
+    llm_names = [name for name, _ in get_llm_roster()]
+    llm = get_chat_model(settings.GPT_LLM)
+    schema = json_schema_with_llms(MilestoneOutput, llm_names)
+    return structured_prompt.partial(llms=format_llm_roster()) | llm.with_structured_output(
+        schema, method="json_schema"
+    )
+
+
+def _cell(text: str) -> str:
+    return " ".join(str(text).split()).replace("|", "\\|")
+
+
+def render_milestones(output: MilestoneOutput) -> str:
+    """The milestone table (and task lists) as markdown."""
+    lines = [
+        "# Milestones",
+        "",
+        "| Milestone | Description | LLM |",
+        "|-----------|-------------|-----|",
+    ]
+    for milestone in output.milestones:
+        checkbox = "[x]" if milestone.isCompleted else "[ ]"
+        lines.append(
+            f"| {checkbox} {_cell(milestone.name)} | {_cell(milestone.description)} "
+            f"| {_cell(milestone.llm)} |"
+        )
+
+    lines += ["", "## Tasks"]
+    for milestone in output.milestones:
+        lines += ["", f"### {milestone.name}", ""]
+        lines += [f"- [ ] {task}" for task in milestone.tasks]
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,11 @@
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain.agents import create_agent
-from langchain_ollama import ChatOllama
+from langchain_core.prompts import ChatPromptTemplate
+from app.core.llm import get_chat_model
+from app.agents.registry import registered_agent
 from app.core.config import settings
-from app.tools.llm_resources import list_llms
+from app.tools.llm_resources import format_llm_roster, get_llm_roster, list_llms
+from app.structured_outputs.project_lead import ProjectLeadOutput
+from app.structured_outputs.schema import json_schema_with_llms
 
 PROJECT_LEAD_TEMPLATE = """You are the **Project Lead & Senior Developer AI**.
 
@@ -54,12 +57,62 @@ Begin
 """
 
 
-def get_project_lead_agent(memory: InMemorySaver):
-    llm = ChatOllama(
-        model=settings.GPT_LLM,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+PROJECT_LEAD_INLINE_TEMPLATE = """You are the **Project Lead & Senior Developer AI**.
+
+Your task is to produce a **Software Requirements Specification (SRS)** document
+that follows **IEEE 830 / ISO/IEC/IEEE 29148** structure.
+
+---
+
+## REQUIRED OUTPUT FORMAT (CRITICAL)
+
+Your FINAL output **MUST be a Markdown document** with the standard SRS sections
+and headings
+
+---
+
+## AVAILABLE LLMS
+
+{llms}
+
+---
+
+## MANDATORY WORKFLOW (STRICT)
+
+1. **Requirement Analysis**
+   - Analyze the user request, constraints, and expected output.
+
+2. **Task Breakdown**
+   - Decompose the work into a MINIMUM of **five subtasks**.
+
+3. **Task Assignment**
+   - Assign exactly ONE LLM per subtask.
+   - The LLM name MUST match **verbatim** one listed under AVAILABLE LLMS
+     (e.g. `GPT_LLM`, without the model in parentheses).
+---
+
+## STRICT RULES
+
+- Output **ONLY** the SRS document (no explanations, no commentary).
+- NEVER reference LLMs not listed under AVAILABLE LLMS.
+- The document MUST be valid SRS format and human-readable.
+---
+
+Begin
+"""
+
+
+@registered_agent
+def get_project_lead_agent(inline_roster: bool = settings.INLINE_LLM_ROSTER):
+    """With inline_roster the LLMs are listed in the prompt; otherwise the
+    agent has to call list_llms first, which costs an extra model turn."""
+    llm = get_chat_model(settings.GPT_LLM)
+    if inline_roster:
+        return create_agent(
+            model=llm,
+            tools=[],
+            system_prompt=PROJECT_LEAD_INLINE_TEMPLATE.format(llms=format_llm_roster()),
+        )
 
     tools = [list_llms]
 
@@ -67,7 +120,104 @@ def get_project_lead_agent(memory: InMemorySaver):
         model=llm,
         tools=tools,
         system_prompt=PROJECT_LEAD_TEMPLATE,
-        checkpointer=memory,
     )
 
     return agent
+
+
+PROJECT_LEAD_STRUCTURED_TEMPLATE = """You are the **Project Lead & Senior Developer AI**.
+
+Analyze the user's request and write the content of a **Software Requirements
+Specification (SRS)**, following the IEEE 830 / ISO/IEC/IEEE 29148 structure.
+
+## OUTPUT
+JSON matching the given schema:
+- `project_overview`: purpose, scope and main features (Markdown, no headings)
+- `user_requirements`: functional and non-functional requirements as a Markdown list
+- `subtasks`: a MINIMUM of five subtasks, each assigned to exactly ONE available LLM
+- `technology_stack`: the technologies the project should use
+
+## RULES
+- Be specific and concise; no commentary outside the JSON fields.
+
+## AVAILABLE LLMS
+{llms}
+"""
+
+project_lead_prompt = ChatPromptTemplate.from_messages(
+    [("system", PROJECT_LEAD_STRUCTURED_TEMPLATE), ("human", "{input}")]
+)
+
+
+@registered_agent
+def get_structured_project_lead_agent():
+    """SRS content decoded against the ProjectLeadOutput schema; returns a dict."""
+    llm_names = [name for name, _ in get_llm_roster()]
+    llm = get_chat_model(settings.GPT_LLM)
+    schema = json_schema_with_llms(ProjectLeadOutput, llm_names)
+    return project_lead_prompt.partial(llms=format_llm_roster()) | llm.with_structured_output(
+        schema, method="json_schema"
+    )
+
+
+def render_srs(output: ProjectLeadOutput) -> str:
+    """The SRS document as markdown, one section per schema field."""
+    lines = [
+        "# Software Requirements Specification",
+        "",
+        "## 1. Project Overview",
+        "",
+        output.project_overview.strip(),
+        "",
+        "## 2. User Requirements",
+        "",
+        output.user_requirements.strip(),
+        "",
+        "## 3. Subtasks",
+    ]
+    for number, subtask in enumerate(output.subtasks, start=1):
+        lines += [
+            "",
+            f"### 3.{number} {subtask.task}",
+            "",
+            subtask.brief.strip(),
+            "",
+            f"- **Assigned LLM**: {subtask.llm}",
+            f"- **Output**: {subtask.output}",
+            f"- **Reason**: {subtask.reason}",
+        ]
+    lines += ["", "## 4. Technology Stack", ""]
+    lines += [f"- {technology}" for technology in output.technology_stack]
+    return "\n".join(lines) + "\n"
+
+
+SRS_REVISION_TEMPLATE = """You are the **Project Lead & Senior Developer AI**.
+
+You will receive an SRS document and reviewer feedback on it.
+Apply the feedback by returning ONLY the sections that change.
+
+## OUTPUT FORMAT (STRICT)
+- Start every section with its markdown heading, copied **verbatim** from the
+  SRS when you change an existing section.
+- Write the **complete new text** of each changed section (not a diff).
+- To add a section, give it a new heading. It is inserted after the section
+  before it in your output, so to place it, first repeat the heading of the
+  section it should follow with the body `(unchanged)`.
+- To delete a section, give its heading with the body `(removed)`; its
+  subsections are deleted with it.
+
+## RULES
+- Do NOT repeat sections that stay the same.
+- Output ONLY the changed sections (no explanations, no commentary).
+"""
+
+srs_revision_prompt = ChatPromptTemplate.from_messages(
+    [("system", SRS_REVISION_TEMPLATE), ("human", "{input}")]
+)
+
+
+@registered_agent
+def get_srs_revision_agent():
+    """Section-level SRS reviser, merged locally by app.tools.srs_patch."""
+    llm = get_chat_model(settings.GPT_LLM)
+    return srs_revision_prompt | llm
@@ -0,0 +1,33 @@
+import functools
+import inspect
+import threading
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_agents: dict[tuple, Any] = {}
+_agents_lock = threading.Lock()
+
+
+def registered_agent(factory: F) -> F:
+    """Builds the agent once per process for each set of arguments.
+
+    Agents only hold their prompt, chat model and tools, so every node and
+    every concurrent run can share one instance instead of rebuilding it.
+    """
+    signature = inspect.signature(factory)
+
+    @functools.wraps(factory)
+    def get(*args, **kwargs):
+        # get_milestone_agent() and get_milestone_agent(inline_roster=True)
+        # are the same agent
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (factory.__module__, factory.__qualname__, tuple(bound.arguments.items()))
+        with _agents_lock:
+            if key not in _agents:
+                _agents[key] = factory(*args, **kwargs)
+            return _agents[key]
+
+    return get
+
@@ -1,6 +1,6 @@
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain.agents import create_agent
-from langchain_ollama import ChatOllama
+from app.core.llm import get_chat_model
+from app.agents.registry import registered_agent
 from app.core.config import settings
 
 TECH_STACK_AGENT_PROMPT = """
@@ -33,15 +33,10 @@ Just the raw markdown table.
 """
 
 
-def get_tech_stack_agent(memory: InMemorySaver):
-    llm = ChatOllama(
-        model=settings.DEEPSEEK_LLM,
-        base_url=settings.OLLAMA_URL,
-        temperature=settings.OLLAMA_TEMPERATURE,
-    )
+@registered_agent
+def get_tech_stack_agent():
+    llm = get_chat_model(settings.DEEPSEEK_LLM)
 
-    agent = create_agent(
-        model=llm, system_prompt=TECH_STACK_AGENT_PROMPT, checkpointer=memory
-    )
+    agent = create_agent(model=llm, system_prompt=TECH_STACK_AGENT_PROMPT)
 
     return agent
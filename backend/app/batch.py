@@ -0,0 +1,365 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langgraph.types import Command
+from rich.console import Console
+from rich.table import Table
+
+from app.agents.manager import ManagerAgent
+from app.core.console import console
+from app.core.streaming import streaming_mode
+from app.memory.llm_cache import cache_bypass
+
+# The app's console is silenced during a batch unless --verbose; progress
+# lines go through their own console
+progress_console = Console()
+
+
+@dataclass
+class BatchItem:
+    id: str
+    input: str
+    project_path: str
+    reviews: dict[str, list] = field(default_factory=dict)
+
+
+def load_items(path: str, output_dir: str) -> list[BatchItem]:
+    """Parses the batch file. Raises ValueError on a malformed or duplicate item."""
+    items: list[BatchItem] = []
+    seen: set[str] = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON ({e})") from e
+            if isinstance(data, str):
+                data = {"input": data}
+            if not isinstance(data, dict) or not str(data.get("input", "")).strip():
+                raise ValueError(f"{path}:{number}: an item needs an \"input\"")
+
+            item_id = str(data.get("id") or f"item-{number}")
+            if item_id in seen:
+                raise ValueError(f"{path}:{number}: duplicate id {item_id!r}")
+            seen.add(item_id)
+
+            reviews = data.get("reviews") or {}
+            if not isinstance(reviews, dict):
+                raise ValueError(f"{path}:{number}: \"reviews\" must be an object")
+            items.append(
+                BatchItem(
+                    id=item_id,
+                    input=data["input"].strip(),
+                    project_path=data.get("project_path")
+                    or os.path.join(output_dir, item_id),
+                    reviews={
+                        key: value if isinstance(value, list) else [value]
+                        for key, value in reviews.items()
+                    },
+                )
+            )
+    return items
+
+
+def scripted_answer(value: Any) -> dict:
+    """Normalizes a scripted review: "approve", feedback text, or an answer dict."""
+    if isinstance(value, dict):
+        if value.get("action") == "approve" or not str(value.get("feedback", "")).strip():
+            return {"action": "approve"}
+        return {"action": "edit", "feedback": str(value["feedback"]).strip()}
+    text = str(value or "").strip()
+    if not text or text.lower() == "approve":
+        return {"action": "approve"}
+    return {"action": "edit", "feedback": text}
+
+
+class BatchProgress:
+    """The append-only progress file; the last record per item wins."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.batch_id: Optional[str] = None
+        self.records: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "batch_id" in record:
+                        self.batch_id = record["batch_id"]
+                    else:
+                        self.records[record["id"]] = record
+        if self.batch_id is None:
+            self.batch_id = uuid.uuid4().hex
+            self._append({"batch_id": self.batch_id})
+
+    def _append(self, record: dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def run_id(self, item: BatchItem) -> str:
+        return uuid.uuid5(uuid.UUID(self.batch_id), item.id).hex
+
+    def update(self, item_id: str, **fields) -> dict:
+        record = {**self.records.get(item_id, {"id": item_id}), **fields}
+        self.records[item_id] = record
+        self._append(record)
+        return record
+
+
+class BatchRunner:
+    """Runs batch items on one ManagerAgent, at most `workers` at a time."""
+
+    def __init__(
+        self,
+        manager: ManagerAgent,
+        progress: BatchProgress,
+        workers: int = 2,
+        use_cache: bool = True,
+    ):
+        self.manager = manager
+        self.progress = progress
+        self.workers = max(1, workers)
+        self.use_cache = use_cache
+
+    def answer(
+        self, item: BatchItem, review: dict, answered: dict[str, int]
+    ) -> tuple[dict, Optional[str]]:
+        """The next scripted answer for a review and its script key, or an approval."""
+        kind = review.get("review", "")
+        keys = [kind]
+        if review.get("milestone"):
+            keys.insert(0, f"{kind}:{review['milestone']}")
+        for key in keys:
+            script = item.reviews.get(key, [])
+            if answered.get(key, 0) < len(script):
+                answered[key] = answered.get(key, 0) + 1
+                return scripted_answer(script[answered[key] - 1]), key
+        return {"action": "approve"}, None
+
+    async def applied_answers(
+        self, config: dict, answered: dict[str, int], resumed: dict[str, str]
+    ) -> dict[str, int]:
+        """answered plus the resumed answers whose interrupts are no longer pending.
+
+        A node after the answered reviews can fail in the same invoke; the
+        answers were checkpointed by then and must not be applied again.
+        """
+        try:
+            snapshot = await self.manager.app.aget_state(config)
+        except Exception:
+            return answered
+        pending = {
+            interrupt.id for task in snapshot.tasks for interrupt in task.interrupts
+        }
+        answered = dict(answered)
+        for interrupt_id, key in resumed.items():
+            if interrupt_id not in pending:
+                answered[key] = answered.get(key, 0) + 1
+        return answered
+
+    async def run_item(self, item: BatchItem) -> dict:
+        record = self.progress.records.get(item.id, {})
+        run_id = self.progress.run_id(item)
+        config = self.manager.run_config(run_id)
+        snapshot = await self.manager.app.aget_state(config)
+        if snapshot.values and not snapshot.next:
+            return self.progress.update(item.id, status="completed", run_id=run_id)
+
+        # A None input continues an unfinished run from its last checkpoint
+        graph_input = (
+            None
+            if snapshot.values
+            else {"input": item.input, "project_path": item.project_path}
+        )
+        answered = dict(record.get("answered", {}))
+        self.progress.update(item.id, status="running", run_id=run_id, answered=answered)
+
+        recorder = self.manager.trace_recorder(run_id)
+        config = self.manager.run_config(run_id, recorder)
+        start = time.perf_counter()
+        reviews = 0
+        # Interrupt id -> script key of each scripted answer being resumed
+        resumed: dict[str, str] = {}
+        try:
+            while True:
+                result = await self.manager.app.ainvoke(graph_input, config)
+                if isinstance(graph_input, Command):
+                    # The answers are applied and checkpointed only now; saved
+                    # earlier, a crash would skip reviews that never resumed.
+                    # Scripted answers are consumed once, even across restarts
+                    answered = taken
+                    resumed = {}
+                    self.progress.update(item.id, answered=answered)
+                pending = result.get("__interrupt__", [])
+                if not pending:
+                    break
+                reviews += len(pending)
+                taken = dict(answered)
+                answers = {}
+                for review in pending:
+                    answers[review.id], key = self.answer(item, review.value, taken)
+                    if key is not None:
+                        resumed[review.id] = key
+                graph_input = Command(resume=answers)
+        except Exception as e:
+            if resumed:
+                answered = await self.applied_answers(config, answered, resumed)
+            return self.progress.update(
+                item.id,
+                status="failed",
+                error=str(e) or type(e).__name__,
+                answered=answered,
+                seconds=round(time.perf_counter() - start, 3),
+                reviews=reviews,
+            )
+        finally:
+            await self.manager.save_trace(recorder)
+
+        stats = {}
+        if recorder is not None:
+            trace = recorder.summary()
+            stats = {
+                "llm_calls": trace["llm_calls"],
+                "cached": trace["cached"],
+                "prompt_tokens": trace["prompt_tokens"],
+                "eval_tokens": trace["eval_tokens"],
+            }
+        return self.progress.update(
+            item.id,
+            status="completed",
+            error=None,
+            seconds=round(time.perf_counter() - start, 3),
+            reviews=reviews,
+            project_path=item.project_path,
+            **stats,
+        )
+
+    async def run(self, items: list[BatchItem]) -> dict:
+        """Runs every unfinished item; returns the batch report."""
+        pending = [
+            item
+            for item in items
+            if self.progress.records.get(item.id, {}).get("status") != "completed"
+        ]
+        skipped = len(items) - len(pending)
+        if skipped:
+            progress_console.print(f"[dim]Skipping {skipped} completed items[/dim]")
+
+        queue: asyncio.Queue[BatchItem] = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+        done = 0
+
+        async def worker():
+            nonlocal done
+            while not queue.empty():
+                item = queue.get_nowait()
+                record = await self.run_item(item)
+                done += 1
+                colour = "green" if record["status"] == "completed" else "red"
+                detail = record.get("error") or f"{record.get('seconds', 0):.1f}s"
+                progress_console.print(
+                    f"[{colour}]{done}/{len(pending)} {item.id}: "
+                    f"{record['status']}[/{colour}] [dim]{detail}[/dim]"
+                )
+
+        start = time.perf_counter()
+        with cache_bypass(not self.use_cache), streaming_mode(False):
+            await asyncio.gather(*(worker() for _ in range(min(self.workers, len(pending)))))
+        wall = time.perf_counter() - start
+
+        records = [self.progress.records.get(item.id, {"id": item.id}) for item in items]
+        finished = [
+            r["seconds"]
+            for r in records
+            if r.get("status") == "completed" and r.get("seconds") is not None
+        ]
+        completed_now = sum(
+            1
+            for item in pending
+            if self.progress.records.get(item.id, {}).get("status") == "completed"
+        )
+        return {
+            "batch_id": self.progress.batch_id,
+            "items": len(items),
+            "completed": sum(1 for r in records if r.get("status") == "completed"),
+            "failed": sum(1 for r in records if r.get("status") == "failed"),
+            "skipped": skipped,
+            "workers": self.workers,
+            "wall_seconds": round(wall, 3),
+            "items_per_hour": round(completed_now / wall * 3600, 1) if wall else 0.0,
+            "median_item_seconds": round(statistics.median(finished), 3) if finished else None,
+            "max_item_seconds": round(max(finished), 3) if finished else None,
+            "results": records,
+        }
+
+
+def print_report(report: dict) -> None:
+    table = Table(title=f"Batch {report['batch_id'][:8]}")
+    table.add_column("Item")
+    table.add_column("Status")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Reviews", justify="right")
+    table.add_column("LLM calls", justify="right")
+    for record in report["results"]:
+        seconds = record.get("seconds")
+        table.add_row(
+            record["id"],
+            record.get("status", "pending"),
+            "" if seconds is None else f"{seconds:.1f}",
+            str(record.get("reviews", "")),
+            str(record.get("llm_calls", "")),
+        )
+    progress_console.print(table)
+    progress_console.print(
+        f"[bold]{report['completed']}/{report['items']} completed, "
+        f"{report['failed']} failed[/bold] in {report['wall_seconds']:.1f}s "
+        f"({report['items_per_hour']} items/hour with {report['workers']} workers)"
+    )
+
+
+async def run_batch(
+    manager: ManagerAgent,
+    input_path: str,
+    output_dir: str = "outputs/batch",
+    workers: int = 2,
+    progress_path: Optional[str] = None,
+    report_path: Optional[str] = None,
+    use_cache: bool = True,
+    verbose: bool = False,
+) -> dict:
+    """Runs a batch file and writes its report; returns the report."""
+    stem = os.path.splitext(input_path)[0]
+    progress_path = progress_path or f"{stem}.progress.jsonl"
+    report_path = report_path or f"{stem}.report.json"
+
+    items = load_items(input_path, output_dir)
+    progress = BatchProgress(progress_path)
+    runner = BatchRunner(manager, progress, workers, use_cache)
+    progress_console.print(
+        f"[bold]Batch:[/bold] {len(items)} items from {input_path}, "
+        f"{runner.workers} workers (progress: {progress_path})"
+    )
+
+    console.quiet = not verbose
+    try:
+        report = await runner.run(items)
+    finally:
+        console.quiet = False
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    progress_console.print(f"[dim]Report: {report_path}[/dim]")
+    return report
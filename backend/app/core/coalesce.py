@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _Stream:
+    def __init__(self, iterator: AsyncIterator):
+        self.items: list = []
+        self.updated = asyncio.get_running_loop().create_future()
+        self.task = asyncio.ensure_future(self._pump(iterator))
+        self.waiters = 0
+
+    async def _pump(self, iterator: AsyncIterator) -> None:
+        async for item in iterator:
+            self.items.append(item)
+            updated, self.updated = self.updated, asyncio.get_running_loop().create_future()
+            updated.set_result(None)
+
+
+class SingleFlight:
+    """Shares one in-flight call among every caller asking for the same key.
+
+    The call runs as its own task, so one waiter being cancelled does not
+    cancel it for the others; it is only cancelled once nobody waits on it.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _Call] = {}
+        self._streams: dict[str, _Stream] = {}
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    async def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """Like run, for a streamed call: every caller receives all items,
+        including those produced before it joined."""
+        call = self._streams.get(key)
+        if call is None:
+            call = _Stream(factory())
+            self._streams[key] = call
+            call.task.add_done_callback(lambda _: self._forget_stream(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            index = 0
+            while True:
+                while index < len(call.items):
+                    yield call.items[index]
+                    index += 1
+                if call.task.done():
+                    call.task.result()
+                    return
+                # Neither is cancelled if this waiter is
+                await asyncio.wait(
+                    (call.updated, call.task), return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def stream_in_flight(self, key: str) -> bool:
+        return key in self._streams
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _forget_stream(self, key: str, call: _Stream) -> None:
+        if self._streams.get(key) is call:
+            del self._streams[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "coalesced": self.coalesced,
+        }
@@ -13,9 +13,122 @@ class Settings:
     QWEN_LLM = os.getenv("QWEN_LLM", "qwen2.5:1.5b")
     DEEPSEEK_LLM = os.getenv("DEEPSEEK_LLM", "deepseek-r1:14b")
     OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    # Ollama hosts (comma-separated) that requests are spread over, with
+    # failover between them; defaults to OLLAMA_URL alone
+    OLLAMA_URLS = [
+        url.strip() for url in os.getenv("OLLAMA_URLS", "").split(",") if url.strip()
+    ] or [OLLAMA_URL]
+    OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", 15))
     OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", 0))
     MISTRAL_LLM = os.getenv("MISTRAL_LLM", "mistral-small:24b")
+    # Shared keep-alive connection pool to OLLAMA_URL
+    OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", 16))
+    OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", 60))
+
+    # Groups requests by model so a single-GPU host is not thrashed by model swaps
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    MAX_RESIDENT_MODELS = int(os.getenv("MAX_RESIDENT_MODELS", 1))
+    OLLAMA_VRAM_BUDGET_GB = float(os.getenv("OLLAMA_VRAM_BUDGET_GB", 0))
+    SCHEDULER_MAX_PARALLEL_PER_MODEL = int(
+        os.getenv("SCHEDULER_MAX_PARALLEL_PER_MODEL", 4)
+    )
     FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
+    CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    # Finished server runs are forgotten after SERVER_RUN_TTL seconds, and only
+    # the newest SERVER_MAX_RUNS are kept; their checkpoints can still be resumed
+    SERVER_RUN_TTL = float(os.getenv("SERVER_RUN_TTL", 3600))
+    SERVER_MAX_RUNS = int(os.getenv("SERVER_MAX_RUNS", 100))
+    # Server runs write under this folder; a run's project_path is relative to it
+    SERVER_OUTPUT_ROOT = os.getenv("SERVER_OUTPUT_ROOT", "outputs")
+
+    # "first" runs the proposal/consensus stage for milestone 1 only, "all" for every milestone
+    MILESTONE_MODE = os.getenv("MILESTONE_MODE", "first").lower()
+    MILESTONE_CONCURRENCY = int(os.getenv("MILESTONE_CONCURRENCY", 2))
+    # Projects run at the same time by `main.py batch`
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 2))
+
+    # The consensus decision waits for the first PROPOSAL_QUORUM proposals
+    # (0 = all), or whatever arrived within PROPOSAL_DEADLINE seconds (0 = no
+    # deadline); proposers still running are cancelled
+    PROPOSAL_QUORUM = int(os.getenv("PROPOSAL_QUORUM", 0))
+    PROPOSAL_DEADLINE = float(os.getenv("PROPOSAL_DEADLINE", 0))
+    if PROPOSAL_QUORUM < 0:
+        raise ValueError(f"PROPOSAL_QUORUM must be 0 (all) or more, got {PROPOSAL_QUORUM}")
+
+    # Share one generation among identical requests that are in flight together
+    LLM_COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "true").lower() == "true"
+    # Keep one proposer per distinct model (e.g. GPT_LLM and QWEN_LLM both on qwen2.5)
+    DEDUPE_PROPOSAL_MODELS = (
+        os.getenv("DEDUPE_PROPOSAL_MODELS", "false").lower() == "true"
+    )
+
+    # Render tokens live and flush them to the artifact files while generating
+    STREAM_TOKENS = os.getenv("STREAM_TOKENS", "false").lower() == "true"
+
+    # On-disk cache of LLM responses, keyed on model, endpoint, params and prompt
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+    LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 512))
+    LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", 30))
+
+    # "local" renders flowcharts offline; "mermaid_ink" uses the remote service
+    MERMAID_RENDERER = os.getenv("MERMAID_RENDERER", "local")
+    MERMAID_FORMATS = os.getenv("MERMAID_FORMATS", "svg,png").split(",")
+
+    # Token budget for the SRS sections sent with each proposal prompt; 0 sends all
+    SRS_CONTEXT_TOKENS = int(os.getenv("SRS_CONTEXT_TOKENS", 1500))
+
+    # Token budget for all proposals in the manager decision prompt; similar
+    # proposals are merged (with a vote count) and each kept one is cut to its
+    # key steps. 0 sends every proposal in full
+    PROPOSAL_BUDGET_TOKENS = int(os.getenv("PROPOSAL_BUDGET_TOKENS", 800))
+    # Cosine similarity (TF-IDF of words and word pairs) at which proposals merge
+    PROPOSAL_DEDUP_THRESHOLD = float(os.getenv("PROPOSAL_DEDUP_THRESHOLD", 0.4))
+
+    # The SRS and milestone agents get the LLM roster in their prompt instead
+    # of calling the list_llms tool first (one model turn less); output naming
+    # unknown LLMs is regenerated with the tool
+    INLINE_LLM_ROSTER = os.getenv("INLINE_LLM_ROSTER", "true").lower() == "true"
+
+    # Milestones and the SRS are decoded against their JSON schemas and the
+    # markdown is rendered locally; false uses the free-form markdown agents
+    STRUCTURED_OUTPUTS = os.getenv("STRUCTURED_OUTPUTS", "true").lower() == "true"
+
+    # "patch" asks for the changed SRS sections only and merges them locally;
+    # "full" regenerates the whole document for every review edit
+    SRS_REVISION_MODE = os.getenv("SRS_REVISION_MODE", "patch")
+
+    # Re-prompts for a flow diagram that local repair cannot fix
+    FLOW_DIAGRAM_MAX_RETRIES = int(os.getenv("FLOW_DIAGRAM_MAX_RETRIES", 2))
+
+    # Worker processes rendering artifact PDFs off the critical path
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
+
+    # Per-request num_ctx: the smallest bucket that fits the prompt plus a reply
+    CONTEXT_SIZING_ENABLED = (
+        os.getenv("CONTEXT_SIZING_ENABLED", "true").lower() == "true"
+    )
+    NUM_CTX_BUCKETS = [
+        int(size)
+        for size in os.getenv("NUM_CTX_BUCKETS", "2048,4096,8192,16384,32768").split(",")
+    ]
+    NUM_CTX_RESERVE = int(os.getenv("NUM_CTX_RESERVE", 1024))
+    # Keep-alive for models the graph calls next, and for models it is done with
+    KEEP_ALIVE_NEXT = os.getenv("KEEP_ALIVE_NEXT", "10m")
+    KEEP_ALIVE_IDLE = os.getenv("KEEP_ALIVE_IDLE", "30s")
+
+    # At startup, check that every configured model is pulled (failing in
+    # seconds if one is not) and load the first models a run needs
+    PREFLIGHT_ENABLED = os.getenv("PREFLIGHT_ENABLED", "true").lower() == "true"
+    WARMUP_MODELS = os.getenv("WARMUP_MODELS", "true").lower() == "true"
+    # num_ctx bucket models are loaded with, so first requests that fit it do not reload them
+    WARMUP_NUM_CTX = int(os.getenv("WARMUP_NUM_CTX", 8192))
+
+    # Durable graph checkpoints; every run can be resumed from its last step
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite3")
+
+    # Per-run timeline of node, LLM and file spans in {project}/project/traces/
+    TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
 
 
 settings = Settings()
@@ -0,0 +1,5 @@
+from rich.console import Console
+
+# Shared by every module that prints, so live displays and prints never fight
+# over the terminal.
+console = Console()
@@ -0,0 +1,146 @@
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.messages import BaseMessage
+
+from app.core.console import console
+
+# Characters per token for the prompt estimate; errs towards larger buckets
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_prompt_tokens(messages: list[BaseMessage]) -> int:
+    chars = sum(len(str(message.content)) for message in messages)
+    # Chat templates add a few tokens per message
+    return int(chars / CHARS_PER_TOKEN) + 8 * len(messages)
+
+
+class ContextWindowManager:
+    """Sizes num_ctx per request and chooses keep-alive from the upcoming nodes.
+
+    Ollama reloads a model whenever num_ctx changes, so a model keeps the
+    largest bucket it has used until the keep-alive policy lets it unload.
+    """
+
+    def __init__(
+        self,
+        buckets: list[int],
+        reserve_tokens: int,
+        keep_alive_next: str,
+        keep_alive_idle: str,
+        context_loader: Optional[Callable[[str], Awaitable[Optional[int]]]] = None,
+    ):
+        self.buckets = sorted(buckets)
+        self.reserve_tokens = reserve_tokens
+        self.keep_alive_next = keep_alive_next
+        self.keep_alive_idle = keep_alive_idle
+        self._context_loader = context_loader
+        self._model_context: dict[str, Optional[int]] = {}
+        self._sticky: dict[str, int] = {}
+        self._upcoming: dict[str, set[str]] = {}
+        # One lock per event loop: the manager outlives the loops of separate
+        # asyncio.run() calls (pre-flight, CLI runs, the server)
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.truncations: list[dict] = []
+
+    def set_upcoming_models(self, plan: dict[str, set[str]]) -> None:
+        """plan maps a graph node to the models the graph calls after it."""
+        self._upcoming = plan
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if loop not in self._locks:
+            self._locks[loop] = asyncio.Lock()
+        return self._locks[loop]
+
+    async def _max_context(self, model: str) -> Optional[int]:
+        if model not in self._model_context:
+            async with self._lock():
+                if model not in self._model_context:
+                    try:
+                        self._model_context[model] = (
+                            await self._context_loader(model)
+                            if self._context_loader
+                            else None
+                        )
+                    except Exception:
+                        self._model_context[model] = None
+        return self._model_context[model]
+
+    async def _bucket_for(self, model: str, needed: int) -> int:
+        """The smallest bucket within the model's context length that fits needed."""
+        limit = await self._max_context(model)
+        buckets = [b for b in self.buckets if limit is None or b <= limit] or [
+            limit or self.buckets[-1]
+        ]
+        return next((b for b in buckets if b >= needed), buckets[-1])
+
+    def node_for(self, checkpoint_ns: str) -> Optional[str]:
+        """The innermost graph node in a checkpoint namespace that has a plan.
+
+        Agents built with create_agent run their own "model" node, so the
+        council node is found by walking the namespace outwards.
+        """
+        for segment in reversed(checkpoint_ns.split("|")):
+            node = segment.split(":", 1)[0]
+            if node in self._upcoming:
+                return node
+        return None
+
+    async def request_options(
+        self, model: str, messages: list[BaseMessage], checkpoint_ns: str = ""
+    ) -> dict:
+        """num_ctx and keep_alive for one request to model."""
+        prompt_tokens = estimate_prompt_tokens(messages)
+        needed = prompt_tokens + self.reserve_tokens
+        num_ctx = await self._bucket_for(model, needed)
+        if needed > num_ctx:
+            self.log_truncation(model, prompt_tokens, num_ctx, "estimated")
+        num_ctx = max(num_ctx, self._sticky.get(model, 0))
+
+        options = {"num_ctx": num_ctx}
+        node = self.node_for(checkpoint_ns)
+        if node is not None:
+            if model in self._upcoming[node]:
+                options["keep_alive"] = self.keep_alive_next
+                self._sticky[model] = num_ctx
+            else:
+                # The model is about to unload, so its next load may shrink
+                options["keep_alive"] = self.keep_alive_idle
+                self._sticky.pop(model, None)
+        else:
+            self._sticky[model] = num_ctx
+        return options
+
+    async def warm_up_options(self, model: str, num_ctx: int) -> dict:
+        """num_ctx and keep_alive for loading model before its first request.
+
+        The model keeps that bucket afterwards, so requests that fit in it
+        do not reload the model.
+        """
+        bucket = max(await self._bucket_for(model, num_ctx), self._sticky.get(model, 0))
+        self._sticky[model] = bucket
+        return {"num_ctx": bucket, "keep_alive": self.keep_alive_next}
+
+    def check_response(
+        self, model: str, num_ctx: int, generation_info: Optional[dict]
+    ) -> None:
+        """Logs a truncation when Ollama evaluated a full context window."""
+        prompt_eval_count = (generation_info or {}).get("prompt_eval_count")
+        if prompt_eval_count and prompt_eval_count >= num_ctx - 1:
+            self.log_truncation(model, prompt_eval_count, num_ctx, "reported")
+
+    def log_truncation(self, model: str, tokens: int, num_ctx: int, source: str):
+        self.truncations.append(
+            {"model": model, "tokens": tokens, "num_ctx": num_ctx, "source": source}
+        )
+        console.print(
+            f"[bold yellow]⚠ Prompt for {model} (~{tokens} tokens, {source}) "
+            f"exceeds num_ctx {num_ctx}; Ollama will truncate it[/bold yellow]"
+        )
+
+    def stats(self) -> dict:
+        return {"truncations": len(self.truncations), "num_ctx": dict(self._sticky)}
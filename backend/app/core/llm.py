@@ -0,0 +1,348 @@
+import hashlib
+import threading
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, AsyncIterator, Mapping, Optional
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.load import dumps
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_ollama import ChatOllama
+from ollama import AsyncClient, Client
+from pydantic import model_validator
+from typing_extensions import Self
+
+from app.core.config import settings
+from app.core.coalesce import SingleFlight
+from app.core.context_window import ContextWindowManager
+from app.core.ollama_pool import OllamaPool
+from app.core.scheduler import ModelScheduler
+from app.memory.llm_cache import get_llm_cache
+
+_clients: dict[str, tuple[Client, AsyncClient]] = {}
+_clients_lock = threading.Lock()
+_schedulers: dict[str, ModelScheduler] = {}
+_single_flight = SingleFlight()
+_context_window: Optional[ContextWindowManager] = None
+_ollama_pool: Optional[OllamaPool] = None
+
+
+def get_ollama_clients(base_url: str) -> tuple[Client, AsyncClient]:
+    """Returns the process-wide sync and async clients for an Ollama host.
+
+    Every chat model talking to the same host shares these, so requests reuse
+    one keep-alive connection pool instead of opening a client per agent.
+    """
+    with _clients_lock:
+        if base_url not in _clients:
+            limits = httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY,
+            )
+            _clients[base_url] = (
+                Client(host=base_url, limits=limits),
+                AsyncClient(host=base_url, limits=limits),
+            )
+        return _clients[base_url]
+
+
+async def close_ollama_clients() -> None:
+    """Closes the shared clients; the next request opens a fresh pool."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client, async_client in clients:
+        client._client.close()
+        await async_client._client.aclose()
+
+
+def get_ollama_pool() -> Optional[OllamaPool]:
+    """Returns the process-wide host pool, or None with a single Ollama host."""
+    global _ollama_pool
+
+    if len(settings.OLLAMA_URLS) < 2:
+        return None
+    if _ollama_pool is None:
+        _ollama_pool = OllamaPool(
+            settings.OLLAMA_URLS,
+            client_factory=lambda url: get_ollama_clients(url)[1],
+            health_interval=settings.OLLAMA_HEALTH_INTERVAL,
+        )
+    return _ollama_pool
+
+
+async def _load_model_sizes(base_url: str) -> dict[str, int]:
+    _, async_client = get_ollama_clients(base_url)
+    response = await async_client.list()
+    return {model.model: model.size or 0 for model in response.models}
+
+
+def get_scheduler(base_url: Optional[str] = None) -> Optional[ModelScheduler]:
+    """Returns the model scheduler of an Ollama host (default OLLAMA_URL),
+    or None when scheduling is disabled."""
+    if not settings.SCHEDULER_ENABLED:
+        return None
+    base_url = base_url or settings.OLLAMA_URL
+    if base_url not in _schedulers:
+        # Every host has its own GPU, so each gets its own residency limits
+        _schedulers[base_url] = ModelScheduler(
+            max_resident_models=settings.MAX_RESIDENT_MODELS,
+            max_parallel_per_model=settings.SCHEDULER_MAX_PARALLEL_PER_MODEL,
+            vram_budget_bytes=int(settings.OLLAMA_VRAM_BUDGET_GB * 1024**3),
+            size_loader=partial(_load_model_sizes, base_url),
+        )
+    return _schedulers[base_url]
+
+
+def get_schedulers() -> list[ModelScheduler]:
+    """Every host's scheduler created so far."""
+    return list(_schedulers.values())
+
+
+def _scheduler_slot(model: str, base_url: str):
+    scheduler = get_scheduler(base_url)
+    return scheduler.slot(model) if scheduler is not None else nullcontext()
+
+
+async def _load_context_length(model: str) -> Optional[int]:
+    base_url = settings.OLLAMA_URL
+    pool = get_ollama_pool()
+    if pool is not None:
+        await pool.refresh()
+        base_url = pool.host_for(model)
+    _, async_client = get_ollama_clients(base_url)
+    response = await async_client.show(model)
+    for key, value in (response.modelinfo or {}).items():
+        if key.endswith(".context_length"):
+            return int(value)
+    return None
+
+
+def get_context_window() -> Optional[ContextWindowManager]:
+    """Returns the process-wide num_ctx/keep-alive manager, or None when disabled."""
+    global _context_window
+
+    if not settings.CONTEXT_SIZING_ENABLED:
+        return None
+    if _context_window is None:
+        _context_window = ContextWindowManager(
+            buckets=settings.NUM_CTX_BUCKETS,
+            reserve_tokens=settings.NUM_CTX_RESERVE,
+            keep_alive_next=settings.KEEP_ALIVE_NEXT,
+            keep_alive_idle=settings.KEEP_ALIVE_IDLE,
+            context_loader=_load_context_length,
+        )
+    return _context_window
+
+
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide registry of in-flight LLM requests."""
+    return _single_flight
+
+
+class CouncilChatOllama(ChatOllama):
+    """ChatOllama used by every agent in the council."""
+
+    @model_validator(mode="after")
+    def _set_clients(self) -> Self:
+        # Overrides ChatOllama._set_clients, which builds new httpx clients
+        # for every instance.
+        self._client, self._async_client = get_ollama_clients(self.base_url)
+        return self
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        # ChatOllama is not serializable, so without this the LLM cache key
+        # would not distinguish between models, hosts or sampling settings.
+        return {
+            "model": self.model,
+            "base_url": self.base_url,
+            "temperature": self.temperature,
+            "num_predict": self.num_predict,
+            "format": self.format,
+            "reasoning": self.reasoning,
+        }
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        async def generate() -> ChatResult:
+            options = await self._request_options(messages, run_manager)
+
+            async def on_host(base_url: str) -> ChatResult:
+                async with _scheduler_slot(self.model, base_url):
+                    return await super(CouncilChatOllama, self._on_host(base_url))._agenerate(
+                        messages, stop, run_manager, **kwargs, **options
+                    )
+
+            pool = get_ollama_pool()
+            if pool is None:
+                result = await on_host(self.base_url)
+            else:
+                # Moves to another host if this one fails mid-request
+                result = await pool.run(self.model, on_host)
+            if options and result.generations:
+                get_context_window().check_response(
+                    self.model, options["num_ctx"], result.generations[0].generation_info
+                )
+            return result
+
+        if not settings.LLM_COALESCE_ENABLED:
+            return await generate()
+
+        # Identical (model, params, prompt) requests already in flight share
+        # one generation; each caller gets its own copy of the result.
+        key = self._coalesce_key(messages, stop, **kwargs)
+        coalesced = _single_flight.in_flight(key)
+        result = (await _single_flight.run(key, generate)).model_copy(deep=True)
+        if coalesced:
+            for generation in result.generations:
+                generation.generation_info = {
+                    **(generation.generation_info or {}),
+                    "coalesced": True,
+                }
+        return result
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if not settings.LLM_COALESCE_ENABLED:
+            async for chunk in self._astream_on_hosts(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+
+        # Identical streams already in flight share one generation: every
+        # caller gets a copy of each chunk (callers mutate them) and its own
+        # token callbacks
+        key = self._coalesce_key(messages, stop, **kwargs)
+        coalesced = _single_flight.stream_in_flight(key)
+        chunks = _single_flight.stream(
+            key,
+            lambda: self._astream_on_hosts(
+                messages, stop, run_manager, token_callbacks=False, **kwargs
+            ),
+        )
+        async for chunk in chunks:
+            chunk = chunk.model_copy(deep=True)
+            if coalesced and chunk.generation_info is not None:
+                chunk.generation_info = {**chunk.generation_info, "coalesced": True}
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, verbose=self.verbose)
+            yield chunk
+
+    async def _astream_on_hosts(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        token_callbacks: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Streams from a host of the pool, failing over before the first chunk."""
+        options = await self._request_options(messages, run_manager)
+        last_chunk = None
+        pool = get_ollama_pool()
+        tried: set[str] = set()
+        while True:
+            host = await pool.acquire(self.model, tried) if pool is not None else None
+            base_url = host.url if host is not None else self.base_url
+            try:
+                async with _scheduler_slot(self.model, base_url):
+                    async for chunk in super(CouncilChatOllama, self._on_host(base_url))._astream(
+                        messages,
+                        stop,
+                        run_manager if token_callbacks else None,
+                        **kwargs,
+                        **options,
+                    ):
+                        last_chunk = chunk
+                        yield chunk
+            except BaseException as e:
+                if host is None:
+                    raise
+                tried.add(base_url)
+                # Tokens already streamed cannot be taken back
+                if (
+                    not pool.release(host, self.model, e)
+                    or last_chunk is not None
+                    or not pool.can_fail_over(self.model, tried)
+                ):
+                    raise
+                continue
+            if host is not None:
+                pool.release(host, self.model)
+            break
+        if options and last_chunk is not None:
+            # The final chunk carries Ollama's prompt_eval_count
+            get_context_window().check_response(
+                self.model, options["num_ctx"], last_chunk.generation_info
+            )
+
+    def _coalesce_key(
+        self, messages: list[BaseMessage], stop: Optional[list[str]], **kwargs: Any
+    ) -> str:
+        return hashlib.sha256(
+            f"{self._get_llm_string(stop=stop, **kwargs)}\x00{dumps(messages)}".encode(
+                "utf-8"
+            )
+        ).hexdigest()
+
+    def _on_host(self, base_url: str) -> Self:
+        """This model bound to a host of the pool and its current clients."""
+        clients = get_ollama_clients(base_url)
+        if base_url == self.base_url:
+            # Agents are built once per process and outlive
+            # close_ollama_clients(), so pick up the host's fresh clients
+            self._client, self._async_client = clients
+            return self
+        model = self.model_copy(update={"base_url": base_url})
+        model._client, model._async_client = clients
+        return model
+
+    async def _request_options(
+        self,
+        messages: list[BaseMessage],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+    ) -> dict:
+        context_window = get_context_window()
+        if context_window is None or self.num_ctx is not None:
+            return {}
+        metadata = run_manager.metadata if run_manager is not None else {}
+        return await context_window.request_options(
+            self.model, messages, metadata.get("langgraph_checkpoint_ns", "")
+        )
+
+    def _chat_params(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        # num_ctx is sized per request; ChatOllama only reads it from the model
+        num_ctx = kwargs.pop("num_ctx", None)
+        params = super()._chat_params(messages, stop, **kwargs)
+        if num_ctx is not None:
+            params["options"]["num_ctx"] = num_ctx
+        return params
+
+
+def get_chat_model(model_name: str) -> ChatOllama:
+    """Creates a chat model for the given Ollama model with the shared settings."""
+    cache = get_llm_cache()
+    return CouncilChatOllama(
+        model=model_name,
+        base_url=settings.OLLAMA_URL,
+        temperature=settings.OLLAMA_TEMPERATURE,
+        cache=cache if cache is not None else False,
+    )
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from ollama import AsyncClient, ResponseError
+
+from app.core.coalesce import SingleFlight
+from app.core.console import console
+
+T = TypeVar("T")
+
+# Seconds a health check (/api/tags and /api/ps) may take before the host is down
+HEALTH_CHECK_TIMEOUT = 5.0
+
+
+class NoOllamaHostError(ConnectionError):
+    """No healthy Ollama host is left to serve a request."""
+
+
+@dataclass
+class OllamaHost:
+    url: str
+    healthy: bool = True
+    # Pulled models from /api/tags; None until the first health check
+    models: Optional[set[str]] = None
+    # Models in memory, from /api/ps and the requests served since
+    loaded: set[str] = field(default_factory=set)
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    checked_at: float = float("-inf")
+
+
+class OllamaPool:
+    """Routes each request to one of several Ollama hosts, with failover.
+
+    A request goes to a healthy host that has the model pulled, preferring
+    hosts where it is already loaded, then the host with the fewest
+    outstanding requests. A host that fails (connection error or 5xx) is
+    marked down and the request is retried on the next host; the host comes
+    back after a successful health check. Health checks run in the
+    background every ``health_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        client_factory: Callable[[str], AsyncClient],
+        health_interval: float = 15.0,
+    ):
+        self.hosts = [OllamaHost(url) for url in dict.fromkeys(urls)]
+        self.client_factory = client_factory
+        self.health_interval = health_interval
+        self.failovers = 0
+        self._checks = SingleFlight()
+        self._background: set[asyncio.Task] = set()
+
+    async def check(self, host: OllamaHost) -> None:
+        """Refreshes a host's health, inventory and loaded models."""
+        client = self.client_factory(host.url)
+        try:
+            tags, running = await asyncio.wait_for(
+                asyncio.gather(client.list(), client.ps()), HEALTH_CHECK_TIMEOUT
+            )
+        except Exception as e:
+            if host.healthy:
+                console.print(f"[bold yellow]Ollama host {host.url} is down: {e!r}[/bold yellow]")
+            host.healthy = False
+        else:
+            if not host.healthy:
+                console.print(f"[bold green]Ollama host {host.url} is back[/bold green]")
+            host.healthy = True
+            host.models = {model.model for model in tags.models}
+            host.loaded = {model.model for model in running.models}
+        host.checked_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        """Starts health checks for stale hosts.
+
+        Waits for them only while no healthy host with a known inventory
+        exists, e.g. on the first request.
+        """
+        now = time.monotonic()
+        stale = [h for h in self.hosts if now - h.checked_at >= self.health_interval]
+        if not stale:
+            return
+        checks = []
+        for host in stale:
+            task = asyncio.ensure_future(self._checks.run(host.url, partial(self.check, host)))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            checks.append(task)
+        if not any(h.healthy and h.models is not None for h in self.hosts):
+            await asyncio.gather(*checks)
+
+    def candidates(self, model: str, exclude=frozenset()) -> list[OllamaHost]:
+        """Hosts that can serve model, best first."""
+        healthy = [h for h in self.hosts if h.healthy and h.url not in exclude]
+        having = [h for h in healthy if h.models is None or model in h.models]
+        # No inventory lists the model (e.g. it is named without its tag):
+        # let any healthy host try
+        hosts = having or healthy
+        return sorted(
+            hosts,
+            key=lambda h: (model not in h.loaded, h.outstanding, self.hosts.index(h)),
+        )
+
+    async def acquire(self, model: str, exclude=frozenset()) -> OllamaHost:
+        """Picks a host for one request; pair with release()."""
+        await self.refresh()
+        hosts = self.candidates(model, exclude)
+        if not hosts:
+            raise NoOllamaHostError(f"No healthy Ollama host can serve {model}")
+        host = hosts[0]
+        host.outstanding += 1
+        host.requests += 1
+        return host
+
+    def release(
+        self, host: OllamaHost, model: str, error: Optional[BaseException] = None
+    ) -> bool:
+        """Ends a request; returns True when error means it should move host."""
+        host.outstanding -= 1
+        if error is None:
+            host.loaded.add(model)
+            return False
+        if isinstance(error, ResponseError) and error.status_code == 404:
+            # The host does not have the model after all
+            if host.models is not None:
+                host.models.discard(model)
+            return True
+        if isinstance(error, (ConnectionError, httpx.TransportError)) or (
+            isinstance(error, ResponseError) and error.status_code >= 500
+        ):
+            host.failures += 1
+            if host.healthy:
+                console.print(
+                    f"[bold yellow]Ollama host {host.url} failed: {error!r}[/bold yellow]"
+                )
+            host.healthy = False
+            host.checked_at = time.monotonic()
+            return True
+        return False
+
+    def can_fail_over(self, model: str, tried: set[str]) -> bool:
+        if not self.candidates(model, tried):
+            return False
+        self.failovers += 1
+        console.print(f"[dim]  ↪ Retrying {model} on another Ollama host[/dim]")
+        return True
+
+    async def run(self, model: str, request: Callable[[str], Awaitable[T]]) -> T:
+        """Runs request(base_url) on the best host, moving on when a host fails."""
+        tried: set[str] = set()
+        while True:
+            host = await self.acquire(model, tried)
+            try:
+                result = await request(host.url)
+            except BaseException as e:
+                tried.add(host.url)
+                if not self.release(host, model, e) or not self.can_fail_over(model, tried):
+                    raise
+                continue
+            self.release(host, model)
+            return result
+
+    def host_for(self, model: str) -> str:
+        """The URL of the best host for model, for metadata lookups."""
+        hosts = self.candidates(model)
+        return hosts[0].url if hosts else self.hosts[0].url
+
+    def stats(self) -> dict:
+        return {
+            "failovers": self.failovers,
+            "hosts": [
+                {
+                    "url": h.url,
+                    "healthy": h.healthy,
+                    "requests": h.requests,
+                    "failures": h.failures,
+                }
+                for h in self.hosts
+            ],
+        }
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import Optional
+
+from app.core.config import settings
+from app.core.console import console
+from app.core.llm import (
+    get_context_window,
+    get_ollama_clients,
+    get_ollama_pool,
+    get_scheduler,
+)
+from app.core.ollama_pool import HEALTH_CHECK_TIMEOUT
+
+
+class PreflightError(RuntimeError):
+    """A configured model cannot be served by any Ollama host."""
+
+
+def model_tag(model: str) -> str:
+    """Ollama's name for model: "llama3" is listed as "llama3:latest"."""
+    return model if ":" in model else f"{model}:latest"
+
+
+async def list_host_models() -> dict[str, set[str]]:
+    """The pulled models of every reachable Ollama host, checked in parallel.
+
+    With several hosts the pool's own health checks are used, so the first
+    request does not wait for them again.
+    """
+    pool = get_ollama_pool()
+    if pool is not None:
+        await asyncio.gather(*(pool.check(host) for host in pool.hosts))
+        return {host.url: host.models for host in pool.hosts if host.healthy}
+
+    _, async_client = get_ollama_clients(settings.OLLAMA_URL)
+    try:
+        response = await asyncio.wait_for(async_client.list(), HEALTH_CHECK_TIMEOUT)
+    except Exception as e:
+        console.print(
+            f"[bold yellow]Ollama at {settings.OLLAMA_URL} is not reachable: {e!r}[/bold yellow]"
+        )
+        return {}
+    return {settings.OLLAMA_URL: {model.model for model in response.models}}
+
+
+async def check_models(models: list[str]) -> dict[str, set[str]]:
+    """Raises PreflightError unless every model is pulled on a reachable host.
+
+    Returns the hosts' inventories.
+    """
+    inventory = await list_host_models()
+    if not inventory:
+        raise PreflightError(
+            f"No Ollama host is reachable ({', '.join(settings.OLLAMA_URLS)})"
+        )
+    missing = [
+        model
+        for model in models
+        if not any(model_tag(model) in pulled for pulled in inventory.values())
+    ]
+    if missing:
+        raise PreflightError(
+            f"Models not pulled on any Ollama host ({', '.join(inventory)}): "
+            f"{', '.join(missing)}. Pull them with: "
+            + "; ".join(f"ollama pull {model}" for model in missing)
+        )
+    return inventory
+
+
+async def warm_up(base_url: str, model: str) -> None:
+    """Loads model on a host with an empty prompt, holding a scheduler slot
+    so the scheduler counts it as resident."""
+    _, async_client = get_ollama_clients(base_url)
+    context_window = get_context_window()
+    options = (
+        await context_window.warm_up_options(model, settings.WARMUP_NUM_CTX)
+        if context_window is not None
+        else {}
+    )
+    scheduler = get_scheduler(base_url)
+    start = time.perf_counter()
+    async with scheduler.slot(model) if scheduler is not None else nullcontext():
+        await async_client.generate(
+            model=model,
+            prompt="",
+            keep_alive=options.get("keep_alive"),
+            options={"num_ctx": options["num_ctx"]} if options else None,
+        )
+    console.print(
+        f"[dim]Warmed up {model} on {base_url} in {time.perf_counter() - start:.1f}s[/dim]"
+    )
+
+
+async def warm_up_models(models: list[str]) -> None:
+    """Loads the models the first nodes need, in the order they need them.
+
+    Only as many as a host keeps resident are loaded, so warming up never
+    evicts a model that the first nodes need. Ollama loads one model at a
+    time, so they are loaded one after another and the first node's model
+    is ready first.
+    """
+    pool = get_ollama_pool()
+    for model in models[: settings.MAX_RESIDENT_MODELS]:
+        host = None
+        if pool is not None:
+            hosts = pool.candidates(model)
+            if not hosts:
+                continue
+            host = hosts[0]
+            # Requests arriving meanwhile go to this host and join the load
+            host.loaded.add(model)
+        try:
+            await warm_up(host.url if host is not None else settings.OLLAMA_URL, model)
+        except Exception as e:
+            if host is not None:
+                host.loaded.discard(model)
+            console.print(f"[bold yellow]Warm-up of {model} failed: {e!r}[/bold yellow]")
+
+
+async def preflight(models: list[str]) -> Optional[asyncio.Task]:
+    """Checks that every model is pulled, failing in seconds if one is not,
+    then starts warming up the first ones in the background.
+
+    models is ordered by first use. Returns the warm-up task, if any.
+    """
+    if not settings.PREFLIGHT_ENABLED:
+        return None
+    models = list(dict.fromkeys(models))
+    start = time.perf_counter()
+    inventory = await check_models(models)
+    console.print(
+        f"[dim]Pre-flight: {len(models)} models available on "
+        f"{len(inventory)} Ollama hosts ({time.perf_counter() - start:.1f}s)[/dim]"
+    )
+    if not settings.WARMUP_MODELS:
+        return None
+    return asyncio.create_task(warm_up_models(models))
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from app.core.console import console
+
+
+class ModelScheduler:
+    """Orders Ollama requests so the GPU drains one model's queue before swapping.
+
+    Requests for a resident model are admitted right away (up to
+    ``max_parallel_per_model``). A request for any other model waits until a
+    resident model has gone idle, then the model with the most pending
+    requests is loaded in its place. When every resident model is still busy,
+    the least demanded one is marked as draining: it finishes the requests
+    already queued for it but admits no new ones, so swaps cannot starve.
+    """
+
+    def __init__(
+        self,
+        max_resident_models: int = 1,
+        max_parallel_per_model: int = 4,
+        vram_budget_bytes: int = 0,
+        size_loader: Optional[Callable[[], Awaitable[dict[str, int]]]] = None,
+    ):
+        self.max_resident_models = max(1, max_resident_models)
+        self.max_parallel_per_model = max(1, max_parallel_per_model)
+        self.vram_budget_bytes = vram_budget_bytes
+        self.size_loader = size_loader
+        self.model_sizes: Optional[dict[str, int]] = None
+
+        self.resident: dict[str, float] = {}
+        self.active: dict[str, int] = defaultdict(int)
+        self.waiting: dict[str, deque[asyncio.Future]] = defaultdict(deque)
+        self.draining: dict[str, int] = {}
+        self.load_events: list[dict] = []
+
+    @asynccontextmanager
+    async def slot(self, model: str):
+        """Holds a scheduling slot for one request to ``model``."""
+        await self._acquire(model)
+        try:
+            yield
+        finally:
+            self._release(model)
+
+    async def _acquire(self, model: str) -> None:
+        if self.vram_budget_bytes and self.model_sizes is None:
+            self.model_sizes = await self.size_loader() if self.size_loader else {}
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[model].append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in self.waiting[model]:
+                self.waiting[model].remove(future)
+                self._dispatch()
+            elif not future.cancelled():
+                # Granted and cancelled in the same tick
+                self._release(model)
+            raise
+
+    def _release(self, model: str) -> None:
+        self.active[model] -= 1
+        if model in self.resident:
+            self.resident[model] = time.monotonic()
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Serve every resident model first
+        for model in list(self.resident):
+            queue = self.waiting[model]
+            while (
+                queue
+                and self.active[model] < self.max_parallel_per_model
+                and self.draining.get(model, 1) > 0
+            ):
+                future = queue.popleft()
+                if future.done():
+                    continue
+                self.active[model] += 1
+                if model in self.draining:
+                    self.draining[model] -= 1
+                future.set_result(None)
+
+        pending = [m for m, q in self.waiting.items() if q and m not in self.resident]
+        if not pending:
+            return
+
+        # Swap in the model with the largest backlog
+        model = max(pending, key=lambda m: len(self.waiting[m]))
+        evicted = []
+        while not self._has_room(model):
+            victim = self._idle_victim()
+            if victim is None:
+                self._start_draining()
+                return
+            del self.resident[victim]
+            self.draining.pop(victim, None)
+            evicted.append(victim)
+
+        self._load(model, evicted)
+        self._dispatch()
+
+    def _has_room(self, model: str) -> bool:
+        if not self.resident:
+            return True
+        if len(self.resident) >= self.max_resident_models:
+            return False
+        if self.vram_budget_bytes and self.model_sizes:
+            used = sum(self.model_sizes.get(m, 0) for m in self.resident)
+            return used + self.model_sizes.get(model, 0) <= self.vram_budget_bytes
+        return True
+
+    def _idle_victim(self) -> Optional[str]:
+        idle = [
+            m
+            for m in self.resident
+            if self.active[m] == 0
+            and (not self.waiting[m] or self.draining.get(m, 1) <= 0)
+        ]
+        return min(idle, key=lambda m: self.resident[m]) if idle else None
+
+    def _start_draining(self) -> None:
+        if self.draining:
+            return
+        victim = min(
+            self.resident,
+            key=lambda m: (len(self.waiting[m]), self.resident[m]),
+        )
+        self.draining[victim] = len(self.waiting[victim])
+
+    def _load(self, model: str, evicted: list[str]) -> None:
+        self.resident[model] = time.monotonic()
+        event = {"model": model, "evicted": evicted, "at": time.time()}
+        self.load_events.append(event)
+        if evicted:
+            console.print(
+                f"[dim]  ⇄ Loading {model} (swapping out {', '.join(evicted)})[/dim]"
+            )
+        else:
+            console.print(f"[dim]  ⇄ Loading {model}[/dim]")
+
+    def stats(self) -> dict:
+        return {
+            "model_loads": len(self.load_events),
+            "resident": list(self.resident),
+        }
@@ -0,0 +1,143 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import ensure_config, merge_configs
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+from app.core.console import console
+
+_streaming: ContextVar[bool] = ContextVar("stream_tokens", default=False)
+
+TAIL_LINES = 8
+
+
+@contextmanager
+def streaming_mode(enabled: bool = True):
+    """Renders generated tokens live for every node run inside the block."""
+    token = _streaming.set(enabled)
+    try:
+        yield
+    finally:
+        _streaming.reset(token)
+
+
+class TokenStreamHandler(AsyncCallbackHandler):
+    """Collects streamed tokens for one node.
+
+    Tokens are appended (and flushed) to ``artifact_path`` as they arrive, so
+    partial output survives a crash; the node still saves the final text when
+    generation completes. Each model turn (e.g. after a tool call) restarts
+    the artifact, since only the last turn is the answer.
+    """
+
+    def __init__(self, label: str, artifact_path: Optional[str] = None, header: str = ""):
+        self.label = label
+        self.artifact_path = artifact_path
+        self.header = header
+        self.text = ""
+        self.tokens = 0
+        self.eval_count = 0
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._file = None
+
+    async def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        self.text = ""
+        self._close()
+        if self.artifact_path:
+            os.makedirs(os.path.dirname(self.artifact_path), exist_ok=True)
+            self._file = open(self.artifact_path, "w", encoding="utf-8")
+            self._file.write(self.header)
+            self._file.flush()
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if not token:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+        self.text += token
+        if self._file:
+            self._file.write(token)
+            self._file.flush()
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.finished_at = time.perf_counter()
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                self.eval_count += info.get("eval_count") or 0
+        self._close()
+
+    async def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        self._close()
+
+    def _close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __rich__(self):
+        tail = "\n".join(self.text.splitlines()[-TAIL_LINES:])
+        return Panel(
+            Text(tail or "waiting for first token...", style="dim"),
+            title=f"[bold blue]{self.label}[/bold blue]",
+            subtitle=f"{self.tokens} tokens",
+            border_style="blue",
+        )
+
+    def report(self) -> None:
+        """Prints time to first token and generation speed."""
+        if self.first_token_at is None or self.started_at is None:
+            console.print(f"[dim]  ⏱ {self.label}: no tokens streamed (cached or shared)[/dim]")
+            return
+        ttft = self.first_token_at - self.started_at
+        elapsed = max((self.finished_at or time.perf_counter()) - self.first_token_at, 1e-6)
+        tokens = self.eval_count or self.tokens
+        console.print(
+            f"[dim]  ⏱ {self.label}: first token {ttft:.1f}s, "
+            f"{tokens / elapsed:.1f} tok/s ({tokens} tokens)[/dim]"
+        )
+
+
+def _with_parent_callbacks(handlers: list):
+    """handlers added to the callbacks of the running graph node.
+
+    Nodes pass these in their own config, which would otherwise replace the
+    graph's callbacks (run tracing, token streaming to server clients).
+    """
+    return merge_configs(ensure_config(), {"callbacks": handlers})["callbacks"]
+
+
+@contextmanager
+def node_progress(
+    label: str,
+    status: str,
+    artifact_path: Optional[str] = None,
+    header: str = "",
+):
+    """Shows progress for one node and yields the callbacks for its LLM calls.
+
+    Without streaming mode this is the usual spinner. In streaming mode the
+    tail of the generation is rendered live, tokens are flushed to
+    ``artifact_path`` and timing stats are printed once the block exits.
+    """
+    if not _streaming.get():
+        with console.status(status, spinner="dots"):
+            yield _with_parent_callbacks([])
+        return
+
+    handler = TokenStreamHandler(label, artifact_path, header)
+    with Live(handler, console=console, transient=True, refresh_per_second=8):
+        yield _with_parent_callbacks([handler])
+    handler.report()
@@ -0,0 +1,294 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# create_agent runs its own "model" and "tools" nodes; the LLM and tool spans
+# inside them already say more than the wrapper would
+AGENT_INTERNAL_NODES = frozenset({"model", "tools"})
+
+# Ollama reports durations in nanoseconds
+OLLAMA_DURATIONS = (
+    "total_duration",
+    "load_duration",
+    "prompt_eval_duration",
+    "eval_duration",
+)
+OLLAMA_COUNTS = ("prompt_eval_count", "eval_count")
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    parent: Optional[UUID] = None
+    end: Optional[float] = None
+    args: dict = field(default_factory=dict)
+
+
+class TraceRecorder(BaseCallbackHandler):
+    """Records a span per graph node, LLM call, tool call and file operation.
+
+    The trace is written in the Chrome trace-event format, so it opens as a
+    timeline in https://ui.perfetto.dev or chrome://tracing. Handlers run
+    inline on the event loop, so no locking is needed.
+    """
+
+    run_inline = True
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.spans: dict[Any, Span] = {}
+        # Every chain's parent, so spans under skipped chains find their node
+        self._parents: dict[UUID, Optional[UUID]] = {}
+        self._origin_wall = time.time()
+        self._origin_perf = time.perf_counter()
+
+    # Graph nodes
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs
+    ):
+        self._parents[run_id] = parent_run_id
+        name = kwargs.get("name")
+        if (
+            name
+            and name not in AGENT_INTERNAL_NODES
+            and (metadata or {}).get("langgraph_node") == name
+        ):
+            self.spans[run_id] = Span(name, "node", time.perf_counter(), parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        # Review nodes pause the run by raising an interrupt
+        if type(error).__name__ == "GraphInterrupt":
+            self._finish(run_id, interrupted=True)
+        else:
+            self._finish(run_id, error=repr(error))
+
+    # LLM calls
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs
+    ):
+        model = (metadata or {}).get("ls_model_name") or kwargs.get(
+            "invocation_params", {}
+        ).get("model", "llm")
+        self.spans[run_id] = Span(
+            model,
+            "llm",
+            time.perf_counter(),
+            parent_run_id,
+            args={"model": model, "messages": sum(len(m) for m in messages)},
+        )
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        span = self.spans.get(run_id)
+        if token and span is not None and "first_token_ms" not in span.args:
+            span.args["first_token_ms"] = round(
+                (time.perf_counter() - span.start) * 1000, 1
+            )
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        span = self.spans.get(run_id)
+        if span is None:
+            return
+        info = {}
+        for generations in response.generations:
+            for generation in generations:
+                info.update(generation.generation_info or {})
+
+        if info.get("cached"):
+            # Cached generation_info still holds the original request's timings
+            span.args["cached"] = True
+        else:
+            for key in OLLAMA_COUNTS:
+                if info.get(key) is not None:
+                    span.args[key] = info[key]
+            for key in OLLAMA_DURATIONS:
+                if info.get(key) is not None:
+                    span.args[key.replace("duration", "ms")] = round(info[key] / 1e6, 1)
+            if info.get("coalesced"):
+                span.args["coalesced"] = True
+            if info.get("done_reason"):
+                span.args["done_reason"] = info["done_reason"]
+        self._finish(run_id)
+        if span.args.get("total_ms"):
+            # Time spent before Ollama started on the request: scheduler slot,
+            # connection pool and HTTP
+            duration_ms = (span.end - span.start) * 1000
+            span.args["queued_ms"] = round(max(duration_ms - span.args["total_ms"], 0), 1)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=repr(error))
+
+    # Tool calls
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs
+    ):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self.spans[run_id] = Span(name, "tool", time.perf_counter(), parent_run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=repr(error))
+
+    # Recording
+
+    def _finish(self, run_id, **args) -> None:
+        span = self.spans.get(run_id)
+        if span is not None and span.end is None:
+            span.end = time.perf_counter()
+            span.args.update(args)
+
+    def add_span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        parent: Optional[UUID] = None,
+        **args,
+    ) -> None:
+        self.spans[object()] = Span(name, category, start, parent, end=end, args=args)
+
+    def _node_of(self, run_id: Optional[UUID]) -> Optional[Any]:
+        """The closest recorded ancestor, skipping chains that have no span."""
+        seen = set()
+        while run_id is not None and run_id not in seen:
+            if run_id in self.spans:
+                return run_id
+            seen.add(run_id)
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _lanes(self, spans: list[tuple[Any, Span]]) -> dict[Any, int]:
+        """Assigns timeline rows so that spans on one row nest properly.
+
+        A span goes on its parent's row while the parent is the innermost
+        open span there; concurrent siblings get the first free row.
+        """
+        lanes: dict[Any, int] = {}
+        stacks: list[list[tuple[Any, float]]] = []
+        for key, span in sorted(spans, key=lambda item: (item[1].start, -item[1].end)):
+            for stack in stacks:
+                while stack and stack[-1][1] <= span.start:
+                    stack.pop()
+            parent = self._node_of(span.parent)
+            lane = lanes.get(parent)
+            if lane is None or not stacks[lane] or stacks[lane][-1][0] != parent:
+                lane = next((i for i, stack in enumerate(stacks) if not stack), None)
+                if lane is None:
+                    stacks.append([])
+                    lane = len(stacks) - 1
+            stacks[lane].append((key, span.end))
+            lanes[key] = lane
+        return lanes
+
+    def events(self) -> list[dict]:
+        """The finished spans as Chrome trace events ("X" complete events)."""
+        now = time.perf_counter()
+        spans = []
+        for key, span in self.spans.items():
+            if span.end is None:
+                # Still open when the run stopped (e.g. cancelled)
+                span.end = now
+                span.args.setdefault("unfinished", True)
+            spans.append((key, span))
+
+        lanes = self._lanes(spans)
+        events = []
+        for key, span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((self._origin_wall + span.start - self._origin_perf) * 1e6),
+                    "dur": round((span.end - span.start) * 1e6),
+                    "pid": 1,
+                    "tid": lanes[key],
+                    "args": span.args,
+                }
+            )
+        return events
+
+    def summary(self) -> dict:
+        llm = [s for s in self.spans.values() if s.category == "llm"]
+        return {
+            "llm_calls": len(llm),
+            "cached": sum(1 for s in llm if s.args.get("cached")),
+            "prompt_tokens": sum(s.args.get("prompt_eval_count", 0) for s in llm),
+            "eval_tokens": sum(s.args.get("eval_count", 0) for s in llm),
+            "load_seconds": sum(s.args.get("load_ms", 0) for s in llm) / 1000,
+            "io_seconds": sum(
+                (s.end or s.start) - s.start for s in self.spans.values() if s.category == "io"
+            ),
+        }
+
+    def write(self, path: str) -> str:
+        """Writes the trace to path, appending to the trace of earlier sessions."""
+        trace = {"traceEvents": [], "displayTimeUnit": "ms", "otherData": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                trace = json.load(f)
+        else:
+            trace["traceEvents"].append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "args": {"name": f"dev-council run {self.run_id}"},
+                }
+            )
+
+        trace["traceEvents"].extend(self.events())
+        trace["otherData"]["run_id"] = self.run_id
+        trace["otherData"]["sessions"] = trace["otherData"].get("sessions", 0) + 1
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return path
+
+
+def _current_recorder() -> tuple[Optional[TraceRecorder], Optional[UUID]]:
+    """The run's recorder and the current node's run ID, from the graph config."""
+    try:
+        from langgraph.config import get_config
+
+        callbacks = get_config().get("callbacks")
+    except Exception:
+        return None, None
+    for handler in getattr(callbacks, "handlers", None) or []:
+        if isinstance(handler, TraceRecorder):
+            return handler, callbacks.parent_run_id
+    return None, None
+
+
+@contextmanager
+def trace_span(name: str, category: str = "io", **args):
+    """Records the block as a span under the current graph node.
+
+    Yields a dict the block can add span arguments to. Outside a traced
+    run this does nothing.
+    """
+    recorder, parent = _current_recorder()
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        if recorder is not None:
+            recorder.add_span(name, category, start, time.perf_counter(), parent, **args)
@@ -1,16 +1,110 @@
+import argparse
+import asyncio
 import os
 import sys
-from app.agents.manager import get_manager
+from app.core.config import settings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="dev-council")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache for this run (fresh results are still stored).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=settings.STREAM_TOKENS,
+        help="Render tokens live and write artifacts incrementally while generating.",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    serve = commands.add_parser(
+        "serve", help="Start the HTTP/SSE server instead of the interactive CLI."
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+
+    resume = commands.add_parser(
+        "resume", help="Continue an interrupted or failed run from its last checkpoint."
+    )
+    resume.add_argument("run_id", help="Run ID printed when the run started.")
+
+    batch = commands.add_parser(
+        "batch", help="Run every project request in a JSONL file without prompting."
+    )
+    batch.add_argument("file", help="JSONL file with one request per line.")
+    batch.add_argument("--workers", type=int, default=settings.BATCH_WORKERS)
+    batch.add_argument(
+        "--output-dir",
+        default="outputs/batch",
+        help="Parent folder for items without a project_path.",
+    )
+    batch.add_argument(
+        "--progress", help="Progress file (default: <file>.progress.jsonl)."
+    )
+    batch.add_argument("--report", help="Report file (default: <file>.report.json).")
+    batch.add_argument(
+        "--verbose", action="store_true", help="Show every run's console output."
+    )
+
+    return parser.parse_args(argv)
+
+
+def serve(host: str, port: int):
+    import uvicorn
+
+    uvicorn.run("app.server:app", host=host, port=port)
+
+
+async def run_cli(args):
+    from app.agents.manager import open_manager
+
+    if args.command == "batch":
+        from app.batch import run_batch
+
+        async with open_manager() as manager:
+            report = await run_batch(
+                manager,
+                args.file,
+                output_dir=args.output_dir,
+                workers=args.workers,
+                progress_path=args.progress,
+                report_path=args.report,
+                use_cache=not args.no_cache,
+                verbose=args.verbose,
+            )
+        if report["failed"]:
+            sys.exit(1)
+        return
+
+    if args.command == "resume":
+        async with open_manager() as manager:
+            await manager.aresume_request(
+                args.run_id, use_cache=not args.no_cache, stream=args.stream
+            )
+        return
+
+    # Open the manager first: its pre-flight reports missing models right
+    # away and warms up the first models while the request is typed
+    async with open_manager() as manager:
+        user_input = await asyncio.to_thread(input, "User request: ")
+        project_path = await asyncio.to_thread(input, "Project path: ")
+        await manager.aprocess_request(
+            user_input, project_path, use_cache=not args.no_cache, stream=args.stream
+        )
 
 
 def run():
-    manager = get_manager()
+    args = parse_args()
 
-    user_input = input("User request: ")
-    project_path = input("Project path: ")
+    if args.command == "serve":
+        serve(args.host, args.port)
+        return
 
     try:
-        manager.process_request(user_input, project_path)
+        asyncio.run(run_cli(args))
 
     except Exception as e:
         print(f"Error: {e}")
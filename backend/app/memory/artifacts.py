@@ -0,0 +1,123 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from app.core.console import console
+from app.memory.llm_cache import cache_bypassed
+from app.tools.save_file import artifact_path
+
+# Bump when a node changes how it builds prompts or outputs, to invalidate
+# every manifest entry written by older code
+ARTIFACT_VERSION = 1
+
+
+def input_hash(**inputs: Any) -> str:
+    """Stable hash of everything that determines an artifact."""
+    payload = json.dumps(
+        {"version": ARTIFACT_VERSION, **inputs}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactManifest:
+    """Input hashes and state outputs of the artifacts generated for a project.
+
+    Stored next to the artifacts as ``.manifest.json``. A node whose inputs
+    hash to the recorded value, and whose files still exist, is not run again.
+    """
+
+    def __init__(self, project_path: str):
+        self.project_path = project_path
+        self.path = artifact_path(".manifest.json", project_path)
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        self.reused = 0
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # A damaged manifest only costs regeneration
+                self.entries = {}
+
+    def lookup(self, name: str, digest: str) -> Optional[dict]:
+        """The recorded outputs of name, if its inputs and files are unchanged."""
+        with self._lock:
+            entry = self.entries.get(name)
+        if entry is None or entry["inputs"] != digest:
+            return None
+        for file_name in entry["files"]:
+            if not os.path.exists(artifact_path(file_name, self.project_path)):
+                return None
+        self.reused += 1
+        return entry["outputs"]
+
+    def record(self, name: str, digest: str, outputs: dict, files: list[str]) -> None:
+        with self._lock:
+            self.entries[name] = {
+                "inputs": digest,
+                "outputs": outputs,
+                "files": files,
+                "updated_at": time.time(),
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+_manifests: dict[str, ArtifactManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(project_path: str) -> ArtifactManifest:
+    """Returns the process-wide manifest of a project folder."""
+    key = os.path.abspath(project_path)
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = ArtifactManifest(project_path)
+        return _manifests[key]
+
+
+def tracked_artifact(
+    name: Union[str, Callable[[dict], str]],
+    inputs: Callable[[dict], dict],
+    files: Callable[[dict], list[str]],
+    always_run: Callable[[dict], bool] = lambda state: False,
+):
+    """Skips a graph node when the inputs of its artifact are unchanged.
+
+    The node's state update is recorded with a hash of ``inputs(state)`` and
+    returned as-is on a later call with the same hash, provided ``files``
+    still exist. ``always_run`` forces the node (e.g. for review revisions);
+    its result is still recorded, so an approved revision is what gets reused.
+    Runs that bypass the LLM cache also regenerate every artifact.
+    """
+
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(state):
+            artifact = name(state) if callable(name) else name
+            manifest = get_manifest(state.get("project_path", "outputs"))
+            digest = input_hash(**inputs(state))
+
+            if not always_run(state) and not cache_bypassed():
+                outputs = manifest.lookup(artifact, digest)
+                if outputs is not None:
+                    console.print(
+                        f"[bold green]✓ {artifact} unchanged; reusing saved output[/bold green]"
+                    )
+                    return outputs
+
+            outputs = await node(state)
+            manifest.record(artifact, digest, outputs, files(state))
+            return outputs
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,21 @@
-from langgraph.checkpoint.memory import InMemorySaver
+import os
+from contextlib import asynccontextmanager
 
-memory = InMemorySaver()
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.core.config import settings
+
+
+@asynccontextmanager
+async def open_checkpointer(path: str = settings.CHECKPOINT_PATH):
+    """Opens the SQLite checkpointer that persists every run, keyed by run ID.
+
+    The saver is bound to the running event loop, so it is opened per loop
+    rather than created at import time.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    async with AsyncSqliteSaver.from_conn_string(path) as checkpointer:
+        yield checkpointer
@@ -0,0 +1,145 @@
+import re
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+from app.memory.srs_index import estimate_tokens, tokenize
+
+# Hashed feature space for word unigrams and bigrams
+FEATURES = 2**14
+THINK = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+FENCE = re.compile(r"^\s*(```|~~~)")
+# "- item", "* item", "1. item", "2) item" and "**Label**: text" lines
+KEY_LINE = re.compile(r"^\s*([-*+]\s+|\d+[.)]\s+|\*\*[^*]+\*\*\s*:)")
+
+
+@dataclass
+class ProposalCluster:
+    representative: str
+    members: list[str]
+    text: str
+
+    @property
+    def votes(self) -> int:
+        return len(self.members)
+
+
+def vectorize(texts: list[str]) -> np.ndarray:
+    """L2-normalized TF-IDF vectors of hashed word unigrams and bigrams."""
+    counts = np.zeros((len(texts), FEATURES))
+    for row, text in enumerate(texts):
+        words = tokenize(text)
+        terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for term in terms:
+            counts[row, zlib.crc32(term.encode("utf-8")) % FEATURES] += 1
+
+    tf = np.zeros_like(counts)
+    np.log1p(counts, out=tf, where=counts > 0)
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    vectors = tf * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def cluster(vectors: np.ndarray, threshold: float) -> list[list[int]]:
+    """Groups rows whose average cosine similarity to a group reaches threshold.
+
+    Rows are taken in order and join the most similar existing group, so the
+    result does not depend on which proposer finished first.
+    """
+    similarity = vectors @ vectors.T
+    groups: list[list[int]] = []
+    for row in range(len(vectors)):
+        best, best_score = None, threshold
+        for group in groups:
+            score = similarity[row, group].mean()
+            if score >= best_score:
+                best, best_score = group, score
+        if best is None:
+            groups.append([row])
+        else:
+            best.append(row)
+    return groups
+
+
+def key_steps(text: str, budget_tokens: int) -> str:
+    """The labelled and list lines of a proposal (its approach and steps),
+    cut to budget_tokens. Prose, code blocks and reasoning are dropped."""
+    text = THINK.sub("", text)
+    lines, in_fence = [], False
+    for line in text.splitlines():
+        if FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if not in_fence and KEY_LINE.match(line):
+            lines.append(" ".join(line.split()))
+    if not lines:
+        # No list structure: fall back to the opening of the text
+        lines = [" ".join(text.split())]
+
+    kept, used = [], 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if used + tokens > budget_tokens:
+            if not kept:
+                kept.append(line[: budget_tokens * 4].rstrip() + " …")
+            break
+        kept.append(line)
+        used += tokens
+    return "\n".join(kept)
+
+
+def compact_proposals(
+    proposals: dict[str, str], budget_tokens: int, threshold: float
+) -> list[ProposalCluster]:
+    """Merges near-duplicate proposals and trims each kept one to its share
+    of budget_tokens; the clusters with the most votes come first."""
+    names = [name for name, text in proposals.items() if text.strip()]
+    if not names:
+        return []
+    vectors = vectorize([proposals[name] for name in names])
+    groups = cluster(vectors, threshold)
+
+    share = max(budget_tokens // len(groups), 1)
+    clusters = []
+    for group in groups:
+        # The member closest to the rest of its group speaks for it
+        similarity = vectors[group] @ vectors[group].T
+        representative = names[group[int(similarity.sum(axis=1).argmax())]]
+        clusters.append(
+            ProposalCluster(
+                representative,
+                [names[row] for row in group],
+                key_steps(proposals[representative], share),
+            )
+        )
+    clusters.sort(key=lambda c: -c.votes)
+    return clusters
+
+
+def format_proposals(proposals: dict[str, str]) -> str:
+    """The proposals section of the manager decision prompt.
+
+    With PROPOSAL_BUDGET_TOKENS > 0 near-duplicates are merged into one
+    proposal with a vote count and the text stays within the budget however
+    many LLMs propose; 0 sends every proposal in full.
+    """
+    if settings.PROPOSAL_BUDGET_TOKENS <= 0:
+        return "".join(
+            f"\n### Proposal from {llm_name}\n{proposal}\n"
+            for llm_name, proposal in proposals.items()
+        )
+
+    parts = []
+    for item in compact_proposals(
+        proposals, settings.PROPOSAL_BUDGET_TOKENS, settings.PROPOSAL_DEDUP_THRESHOLD
+    ):
+        title = f"Proposal from {item.representative}"
+        if item.votes > 1:
+            others = ", ".join(m for m in item.members if m != item.representative)
+            title += f" ({item.votes} votes, also proposed by {others})"
+        parts.append(f"\n### {title}\n{item.text}\n")
+    return "".join(parts)
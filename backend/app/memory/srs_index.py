@@ -0,0 +1,141 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import settings
+
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with shall should must can may".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for prompt budgeting."""
+    return len(text) // 4 + 1
+
+
+def tokenize(text: str) -> list[str]:
+    words = WORD.findall(text.lower())
+    # Crude plural folding so "requirements" matches "requirement"
+    return [
+        w[:-1] if len(w) > 4 and w.endswith("s") and not w.endswith("ss") else w
+        for w in words
+        if w not in STOPWORDS and len(w) > 1
+    ]
+
+
+@dataclass
+class Section:
+    position: int
+    title: str
+    text: str
+    tokens: int
+
+
+class SRSIndex:
+    """BM25 index over the sections of an SRS, split by markdown headings."""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, markdown: str):
+        self.sections = self._split(markdown)
+        self.term_counts = [Counter(self._terms(s)) for s in self.sections]
+        self.lengths = [sum(c.values()) for c in self.term_counts]
+        self.average_length = sum(self.lengths) / max(len(self.lengths), 1) or 1
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(self.sections)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    @staticmethod
+    def _split(markdown: str) -> list[Section]:
+        sections = []
+        trail: list[str] = []
+        title, lines = "", []
+
+        def flush():
+            text = "\n".join(lines).strip()
+            if text:
+                sections.append(
+                    Section(len(sections), title, text, estimate_tokens(text))
+                )
+
+        for line in markdown.splitlines():
+            match = HEADING.match(line)
+            if match:
+                flush()
+                level = len(match.group(1))
+                trail[level - 1 :] = [match.group(2)]
+                title, lines = " > ".join(trail), [line]
+            else:
+                lines.append(line)
+        flush()
+        return sections
+
+    @staticmethod
+    def _terms(section: Section) -> list[str]:
+        # Headings name what a section is about, so they count twice
+        return tokenize(section.title) * 2 + tokenize(section.text)
+
+    def score(self, query: str) -> list[float]:
+        terms = set(tokenize(query))
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    norm = self.K1 * (1 - self.B + self.B * length / self.average_length)
+                    score += self.idf[term] * tf * (self.K1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, query: str, budget_tokens: int) -> str:
+        """The highest-ranked sections that fit the budget, in document order."""
+        total = sum(s.tokens for s in self.sections)
+        if total <= budget_tokens:
+            return "\n\n".join(s.text for s in self.sections)
+
+        scores = self.score(query)
+        ranked = sorted(
+            self.sections, key=lambda s: (-scores[s.position], s.position)
+        )
+        chosen, used = [], 0
+        for section in ranked:
+            if scores[section.position] <= 0 and chosen:
+                break
+            if used + section.tokens > budget_tokens:
+                continue
+            chosen.append(section)
+            used += section.tokens
+
+        if not chosen:
+            # Even the best section is over budget: keep its beginning
+            return ranked[0].text[: budget_tokens * 4]
+
+        chosen.sort(key=lambda s: s.position)
+        return "\n\n".join(s.text for s in chosen)
+
+
+@lru_cache(maxsize=8)
+def get_srs_index(project_plan: str) -> SRSIndex:
+    """Builds the index once per SRS text; every milestone and proposer reuses it."""
+    return SRSIndex(project_plan)
+
+
+def select_srs_context(project_plan: str, milestone: str) -> str:
+    """The SRS sections relevant to a milestone, within SRS_CONTEXT_TOKENS."""
+    if settings.SRS_CONTEXT_TOKENS <= 0 or not project_plan:
+        return project_plan
+    return get_srs_index(project_plan).select(milestone, settings.SRS_CONTEXT_TOKENS)
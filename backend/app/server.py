@@ -0,0 +1,355 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from app.agents.manager import ManagerAgent, open_manager
+from app.core.config import settings
+from app.memory.llm_cache import cache_bypass
+from app.tools.save_file import artifact_path
+
+# Seconds between SSE keep-alive comments while a run is quiet
+SSE_KEEPALIVE = 15
+# Events kept per run to replay to new subscribers; tokens are never kept
+RUN_EVENT_HISTORY = 500
+
+
+class RunRequest(BaseModel):
+    input: str
+    # Relative to SERVER_OUTPUT_ROOT
+    project_path: str = ""
+    use_cache: bool = True
+
+
+class ResumeRequest(BaseModel):
+    use_cache: bool = True
+
+
+class ReviewAnswer(BaseModel):
+    interrupt_id: Optional[str] = None
+    action: Literal["approve", "edit"]
+    feedback: str = ""
+
+
+def resolve_project_path(project_path: str) -> str:
+    """project_path inside SERVER_OUTPUT_ROOT.
+
+    Raises ValueError for an absolute path or one that leaves the root,
+    including through a symlink.
+    """
+    if os.path.isabs(project_path):
+        raise ValueError("project_path must be relative to the output root")
+    root = os.path.realpath(settings.SERVER_OUTPUT_ROOT)
+    path = os.path.realpath(os.path.join(root, project_path))
+    if path != root and not path.startswith(root + os.sep):
+        raise ValueError("project_path must stay inside the output root")
+    return path
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+class Run:
+    """A graph run driven by the server and the events it has produced so far."""
+
+    def __init__(self, run_id: str, request: RunRequest):
+        self.run_id = run_id
+        self.request = request
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.pending_reviews: dict[str, dict] = {}
+        self.events: deque[dict] = deque(maxlen=RUN_EVENT_HISTORY)
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.finished_at: Optional[float] = None
+
+    def publish(self, event: str, data: dict) -> None:
+        message = {"event": event, "data": _jsonable(data)}
+        if event != "token":
+            # Tokens are only for live subscribers; the node update that
+            # follows carries the full text
+            self.events.append(message)
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Returns a queue that first replays past events, then receives new ones."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in self.events:
+            queue.put_nowait(message)
+        self.subscribers.add(queue)
+        return queue
+
+    def summary(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "error": self.error,
+            "input": self.request.input,
+            "project_path": self.request.project_path,
+            "pending_reviews": [
+                {"interrupt_id": interrupt_id, **review}
+                for interrupt_id, review in self.pending_reviews.items()
+            ],
+        }
+
+
+class RunManager:
+    """Runs many graph executions concurrently on one event loop.
+
+    A run waiting for review has no task at all: the review nodes interrupt
+    the graph, the checkpointer keeps its state, and an HTTP call resumes it.
+    """
+
+    def __init__(self, manager: Optional[ManagerAgent] = None):
+        # Set by the app lifespan, once the checkpointer is open on the server loop
+        self.manager = manager
+        self.runs: dict[str, Run] = {}
+
+    def evict(self) -> None:
+        """Forgets finished runs past SERVER_RUN_TTL, and the oldest beyond SERVER_MAX_RUNS."""
+        now = time.monotonic()
+        finished = sorted(
+            (run for run in self.runs.values() if run.finished_at is not None),
+            key=lambda run: run.finished_at,
+        )
+        excess = max(len(finished) - settings.SERVER_MAX_RUNS, 0)
+        for index, run in enumerate(finished):
+            if index < excess or now - run.finished_at > settings.SERVER_RUN_TTL:
+                del self.runs[run.run_id]
+
+    def start(self, request: RunRequest) -> Run:
+        self.evict()
+        run = Run(uuid.uuid4().hex, request)
+        self.runs[run.run_id] = run
+        graph_input = {"input": request.input, "project_path": request.project_path}
+        run.task = asyncio.create_task(self._drive(run, graph_input))
+        return run
+
+    async def restore(self, run_id: str, use_cache: bool = True) -> Run:
+        """Continues a run from its last checkpoint, e.g. after a failure or restart.
+
+        Raises LookupError when no checkpoint exists for run_id.
+        """
+        self.evict()
+        snapshot = await self.manager.app.aget_state(self.manager.run_config(run_id))
+        if not snapshot.values:
+            raise LookupError(run_id)
+
+        run = self.runs.get(run_id)
+        if run is None:
+            request = RunRequest(
+                input=snapshot.values.get("input", ""),
+                project_path=snapshot.values.get("project_path", "outputs"),
+                use_cache=use_cache,
+            )
+            run = Run(run_id, request)
+            self.runs[run_id] = run
+        run.request.use_cache = use_cache
+        run.error = None
+
+        if not snapshot.next:
+            run.status = "completed"
+            run.finished_at = time.monotonic()
+            return run
+        # A None input re-runs only unfinished nodes and re-raises pending reviews
+        run.task = asyncio.create_task(self._drive(run, None))
+        return run
+
+    def resume(self, run: Run, interrupt_id: str, answer: dict) -> None:
+        run.pending_reviews.pop(interrupt_id)
+        run.task = asyncio.create_task(
+            self._drive(run, Command(resume={interrupt_id: answer}))
+        )
+
+    async def _drive(self, run: Run, graph_input: Any) -> None:
+        recorder = self.manager.trace_recorder(run.run_id)
+        config = self.manager.run_config(run.run_id, recorder)
+        run.pending_reviews = {}
+        run.status = "running"
+        run.finished_at = None
+        run.publish("status", {"status": run.status})
+        interrupts: dict[str, dict] = {}
+
+        try:
+            with cache_bypass(not run.request.use_cache):
+                async for namespace, mode, data in self.manager.app.astream(
+                    graph_input,
+                    config,
+                    stream_mode=["updates", "messages"],
+                    subgraphs=True,
+                ):
+                    if mode == "messages":
+                        chunk, metadata = data
+                        if chunk.content:
+                            run.publish(
+                                "token",
+                                {
+                                    "node": metadata.get("langgraph_node"),
+                                    "namespace": list(namespace),
+                                    "text": chunk.content,
+                                },
+                            )
+                        continue
+
+                    for node, update in (data or {}).items():
+                        if node == "__interrupt__":
+                            # Subgraph interrupts also bubble up to the root
+                            if not namespace:
+                                for item in update:
+                                    interrupts[item.id] = item.value
+                            continue
+                        run.publish(
+                            "node",
+                            {
+                                "node": node,
+                                "namespace": list(namespace),
+                                "update": update,
+                            },
+                        )
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            run.finished_at = time.monotonic()
+            run.publish("failed", {"error": run.error})
+            return
+        finally:
+            await self.manager.save_trace(recorder)
+
+        if interrupts:
+            run.pending_reviews = interrupts
+            run.status = "waiting_for_review"
+            for interrupt_id, review in interrupts.items():
+                run.publish("review", {"interrupt_id": interrupt_id, **review})
+            return
+
+        run.status = "completed"
+        run.finished_at = time.monotonic()
+        run.publish("completed", {"status": run.status})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with open_manager() as manager:
+        runs.manager = manager
+        yield
+
+
+app = FastAPI(title="dev-council", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+runs = RunManager()
+
+
+def _get_run(run_id: str) -> Run:
+    run = runs.runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return run
+
+
+@app.post("/runs")
+async def start_run(request: RunRequest):
+    try:
+        project_path = resolve_project_path(request.project_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return runs.start(request.model_copy(update={"project_path": project_path})).summary()
+
+
+@app.get("/runs")
+async def list_runs():
+    return [run.summary() for run in runs.runs.values()]
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    return _get_run(run_id).summary()
+
+
+@app.get("/runs/{run_id}/events")
+async def run_events(run_id: str, request: Request):
+    """Server-Sent Events: status, node, token, review, completed and failed."""
+    run = _get_run(run_id)
+
+    async def stream():
+        queue = run.subscribe()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+                if message["event"] in ("completed", "failed"):
+                    break
+        finally:
+            run.subscribers.discard(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.post("/runs/{run_id}/resume")
+async def resume_run(run_id: str, options: ResumeRequest = ResumeRequest()):
+    """Continues a failed, interrupted or pre-restart run from its last checkpoint."""
+    run = runs.runs.get(run_id)
+    if run is not None and run.task is not None and not run.task.done():
+        raise HTTPException(status_code=409, detail="Run is still executing")
+    try:
+        run = await runs.restore(run_id, options.use_cache)
+    except LookupError:
+        raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return run.summary()
+
+
+@app.post("/runs/{run_id}/reviews")
+async def answer_review(run_id: str, answer: ReviewAnswer):
+    run = _get_run(run_id)
+    if run.task is not None and not run.task.done():
+        raise HTTPException(status_code=409, detail="Run is still executing")
+    if not run.pending_reviews:
+        raise HTTPException(status_code=409, detail="Run has no pending review")
+
+    interrupt_id = answer.interrupt_id
+    if interrupt_id is None:
+        if len(run.pending_reviews) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail="Several reviews are pending; interrupt_id is required",
+            )
+        interrupt_id = next(iter(run.pending_reviews))
+    if interrupt_id not in run.pending_reviews:
+        raise HTTPException(status_code=404, detail=f"Unknown review {interrupt_id}")
+    if answer.action == "edit" and not answer.feedback.strip():
+        raise HTTPException(status_code=400, detail="Feedback is required to edit")
+
+    runs.resume(
+        run, interrupt_id, {"action": answer.action, "feedback": answer.feedback}
+    )
+    return run.summary()
+
+
+@app.get("/runs/{run_id}/artifacts/{file_path:path}")
+async def get_artifact(run_id: str, file_path: str):
+    run = _get_run(run_id)
+    root = os.path.realpath(artifact_path("", run.request.project_path))
+    path = os.path.realpath(artifact_path(file_path, run.request.project_path))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Unknown artifact {file_path}")
+    return FileResponse(path)
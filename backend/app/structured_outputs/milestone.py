@@ -8,7 +8,8 @@ class Milestone(BaseModel):
     name: str = Field(..., description="Milestone name")
     description: str = Field(..., description="Milestone description")
     tasks: List[str] = Field(..., description="List of tasks")
-    isCompleted: bool = Field(..., description="Is completed")
+    llm: str = Field(..., description="LLM assigned to the milestone")
+    isCompleted: bool = Field(False, description="Is completed")
 
 
 class MilestoneOutput(BaseModel):
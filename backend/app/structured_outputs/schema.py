@@ -0,0 +1,18 @@
+from typing import Type
+
+from pydantic import BaseModel
+
+
+def json_schema_with_llms(model: Type[BaseModel], llm_names: list[str]) -> dict:
+    """The JSON schema of model with every ``llm`` field limited to llm_names.
+
+    Ollama decodes against the schema, so the model cannot assign work to an
+    LLM that is not in the council.
+    """
+    schema = model.model_json_schema()
+    definitions = [schema, *schema.get("$defs", {}).values()]
+    for definition in definitions:
+        field = definition.get("properties", {}).get("llm")
+        if field is not None and llm_names:
+            field["enum"] = list(llm_names)
+    return schema
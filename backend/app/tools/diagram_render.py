@@ -0,0 +1,386 @@
+import hashlib
+import math
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+from xml.sax.saxutils import escape
+
+from app.core.config import settings
+from app.tools.flowchart import Flowchart, parse_flowchart
+
+FONT_SIZE = 14
+CHAR_WIDTH = 7.6
+LINE_HEIGHT = 18
+NODE_PADDING = 16
+NODE_GAP = 40
+RANK_GAP = 70
+MARGIN = 20
+
+
+class DiagramRenderer(ABC):
+    """Turns Mermaid source into image bytes. Subclasses register in RENDERERS."""
+
+    name = ""
+    formats: tuple[str, ...] = ()
+
+    @abstractmethod
+    def render(self, code: str, fmt: str) -> bytes:
+        """The diagram in fmt, one of formats."""
+
+
+class LocalRenderer(DiagramRenderer):
+    """Offline renderer for flowcharts: a layered layout drawn as SVG.
+
+    PNG is rasterised from the SVG with PyMuPDF.
+    """
+
+    name = "local"
+    formats = ("svg", "png")
+
+    def render(self, code: str, fmt: str) -> bytes:
+        svg = render_svg(parse_flowchart(code))
+        if fmt == "svg":
+            return svg.encode("utf-8")
+        if fmt == "png":
+            import pymupdf
+
+            with pymupdf.open(stream=svg.encode("utf-8"), filetype="svg") as doc:
+                return doc[0].get_pixmap(matrix=pymupdf.Matrix(2, 2)).tobytes("png")
+        raise ValueError(f"Unsupported diagram format: {fmt}")
+
+
+class MermaidInkRenderer(DiagramRenderer):
+    """Full Mermaid support through the remote mermaid.ink service (needs network)."""
+
+    name = "mermaid_ink"
+    formats = ("svg", "png")
+
+    def render(self, code: str, fmt: str) -> bytes:
+        import mermaidian as mm
+
+        return mm.get_mermaid_diagram(fmt, code)
+
+
+RENDERERS: dict[str, type[DiagramRenderer]] = {
+    LocalRenderer.name: LocalRenderer,
+    MermaidInkRenderer.name: MermaidInkRenderer,
+}
+
+
+def get_diagram_renderer(name: Optional[str] = None) -> DiagramRenderer:
+    name = name or settings.MERMAID_RENDERER
+    if name not in RENDERERS:
+        raise ValueError(
+            f"Unknown Mermaid renderer {name!r}; choose one of {', '.join(RENDERERS)}"
+        )
+    return RENDERERS[name]()
+
+
+def render_cached(
+    renderer: DiagramRenderer, code: str, fmt: str, cache_dir: str
+) -> tuple[bytes, bool]:
+    """Renders through a content-hash cache; returns (image, cache_hit)."""
+    key = hashlib.sha256(f"{renderer.name}\x00{fmt}\x00{code}".encode("utf-8"))
+    path = os.path.join(cache_dir, f"{key.hexdigest()}.{fmt}")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read(), True
+
+    image = renderer.render(code, fmt)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(image)
+    os.replace(tmp_path, path)
+    return image, False
+
+
+# --- Layout ---------------------------------------------------------------
+
+
+def _node_size(label: str, shape: str) -> tuple[float, float]:
+    lines = label.split("\n")
+    width = max(len(line) for line in lines) * CHAR_WIDTH + 2 * NODE_PADDING
+    height = len(lines) * LINE_HEIGHT + NODE_PADDING
+    if shape in ("circle", "double_circle"):
+        width = height = max(width, height)
+    elif shape == "diamond":
+        width, height = width * 1.5, height * 1.6
+    elif shape in ("hexagon", "parallelogram", "asymmetric"):
+        width += 2 * NODE_PADDING
+    return max(width, 60), max(height, 36)
+
+
+def _ranks(chart: Flowchart) -> dict[str, int]:
+    """Longest-path layering; back edges of cycles are ignored."""
+    successors: dict[str, list[str]] = {node_id: [] for node_id in chart.nodes}
+    for edge in chart.edges:
+        successors[edge.source].append(edge.target)
+
+    forward: dict[str, list[str]] = {node_id: [] for node_id in chart.nodes}
+    state: dict[str, int] = {}
+    for root in chart.nodes:
+        if root in state:
+            continue
+        stack = [(root, iter(successors[root]))]
+        state[root] = 1
+        while stack:
+            node_id, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node_id] = 2
+                stack.pop()
+            elif state.get(child) != 1:
+                # state 1 means child is on the DFS stack: a back edge
+                forward[node_id].append(child)
+                if child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+
+    rank = {node_id: 0 for node_id in chart.nodes}
+    for node_id in _topological(forward):
+        for child in forward[node_id]:
+            rank[child] = max(rank[child], rank[node_id] + 1)
+    return rank
+
+
+def _topological(graph: dict[str, list[str]]) -> list[str]:
+    indegree = {node_id: 0 for node_id in graph}
+    for children in graph.values():
+        for child in children:
+            indegree[child] += 1
+    queue = [node_id for node_id, degree in indegree.items() if degree == 0]
+    result = []
+    while queue:
+        node_id = queue.pop(0)
+        result.append(node_id)
+        for child in graph[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+    return result
+
+
+def _order(chart: Flowchart, rank: dict[str, int]) -> list[list[str]]:
+    """Orders each layer by the barycenter of its neighbours to limit crossings."""
+    layers: list[list[str]] = [[] for _ in range(max(rank.values()) + 1)]
+    for node_id in chart.nodes:
+        layers[rank[node_id]].append(node_id)
+
+    neighbours: dict[str, set[str]] = {node_id: set() for node_id in chart.nodes}
+    for edge in chart.edges:
+        neighbours[edge.source].add(edge.target)
+        neighbours[edge.target].add(edge.source)
+
+    for sweep in range(4):
+        downward = sweep % 2 == 0
+        indices = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        for i in indices:
+            reference = layers[i - 1] if downward else layers[i + 1]
+            position = {node_id: index for index, node_id in enumerate(reference)}
+            keys = {}
+            for index, node_id in enumerate(layers[i]):
+                linked = [position[n] for n in neighbours[node_id] if n in position]
+                keys[node_id] = sum(linked) / len(linked) if linked else index
+            layers[i].sort(key=keys.get)
+    return layers
+
+
+def layout(chart: Flowchart) -> tuple[dict[str, tuple], float, float]:
+    """Returns node boxes {id: (center_x, center_y, width, height)} and canvas size."""
+    sizes = {
+        node_id: _node_size(node.label, node.shape)
+        for node_id, node in chart.nodes.items()
+    }
+    layers = _order(chart, _ranks(chart))
+    horizontal = chart.direction in ("LR", "RL")
+
+    # Along the flow: layer depth; across: position within the layer
+    def along(node_id):
+        return sizes[node_id][0] if horizontal else sizes[node_id][1]
+
+    def across(node_id):
+        return sizes[node_id][1] if horizontal else sizes[node_id][0]
+
+    layer_depths = [max(along(n) for n in layer) for layer in layers]
+    layer_spans = [
+        sum(across(n) for n in layer) + NODE_GAP * (len(layer) - 1) for layer in layers
+    ]
+    span = max(layer_spans)
+
+    boxes = {}
+    depth_offset = MARGIN
+    for layer, depth, layer_span in zip(layers, layer_depths, layer_spans):
+        cross = MARGIN + (span - layer_span) / 2
+        for node_id in layer:
+            a = depth_offset + depth / 2
+            c = cross + across(node_id) / 2
+            cross += across(node_id) + NODE_GAP
+            x, y = (a, c) if horizontal else (c, a)
+            boxes[node_id] = (x, y, *sizes[node_id])
+        depth_offset += depth + RANK_GAP
+
+    total_depth = depth_offset - RANK_GAP + MARGIN
+    total_span = span + 2 * MARGIN
+    width, height = (total_depth, total_span) if horizontal else (total_span, total_depth)
+
+    # BT and RL flow the other way
+    if chart.direction == "BT":
+        boxes = {k: (x, height - y, w, h) for k, (x, y, w, h) in boxes.items()}
+    elif chart.direction == "RL":
+        boxes = {k: (width - x, y, w, h) for k, (x, y, w, h) in boxes.items()}
+    return boxes, width, height
+
+
+# --- SVG ------------------------------------------------------------------
+
+
+def _clip(box, toward) -> tuple[float, float]:
+    """Point where the line from the box centre toward a point leaves the box."""
+    x, y, w, h = box
+    dx, dy = toward[0] - x, toward[1] - y
+    if dx == 0 and dy == 0:
+        return x, y
+    scale = min(
+        (w / 2) / abs(dx) if dx else math.inf,
+        (h / 2) / abs(dy) if dy else math.inf,
+    )
+    return x + dx * scale, y + dy * scale
+
+
+def _shape_svg(shape: str, x: float, y: float, w: float, h: float) -> str:
+    left, top, right, bottom = x - w / 2, y - h / 2, x + w / 2, y + h / 2
+    style = 'fill="#ECECFF" stroke="#9370DB" stroke-width="1.5"'
+
+    def polygon(points):
+        return f'<polygon points="{" ".join(f"{px:.1f},{py:.1f}" for px, py in points)}" {style}/>'
+
+    if shape in ("circle", "double_circle"):
+        svg = f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{w / 2:.1f}" {style}/>'
+        if shape == "double_circle":
+            svg += f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{w / 2 - 4:.1f}" {style}/>'
+        return svg
+    if shape == "diamond":
+        return polygon([(x, top), (right, y), (x, bottom), (left, y)])
+    if shape == "hexagon":
+        inset = NODE_PADDING
+        return polygon(
+            [(left + inset, top), (right - inset, top), (right, y),
+             (right - inset, bottom), (left + inset, bottom), (left, y)]
+        )
+    if shape == "parallelogram":
+        inset = NODE_PADDING
+        return polygon([(left + inset, top), (right, top), (right - inset, bottom), (left, bottom)])
+    if shape == "asymmetric":
+        return polygon([(left, top), (right, top), (right, bottom), (left, bottom), (left + NODE_PADDING, y)])
+
+    radius = {"round": 8, "stadium": h / 2, "cylinder": 12}.get(shape, 0)
+    svg = (
+        f'<rect x="{left:.1f}" y="{top:.1f}" width="{w:.1f}" height="{h:.1f}" '
+        f'rx="{radius:.1f}" {style}/>'
+    )
+    if shape == "subroutine":
+        svg += (
+            f'<line x1="{left + 8:.1f}" y1="{top:.1f}" x2="{left + 8:.1f}" y2="{bottom:.1f}" {style}/>'
+            f'<line x1="{right - 8:.1f}" y1="{top:.1f}" x2="{right - 8:.1f}" y2="{bottom:.1f}" {style}/>'
+        )
+    return svg
+
+
+def _text_svg(label: str, x: float, y: float) -> str:
+    lines = label.split("\n")
+    first = y - (len(lines) - 1) * LINE_HEIGHT / 2
+    spans = "".join(
+        f'<tspan x="{x:.1f}" y="{first + i * LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (
+        f'<text text-anchor="middle" dominant-baseline="central" '
+        f'font-family="Helvetica, Arial, sans-serif" font-size="{FONT_SIZE}" '
+        f'fill="#333">{spans}</text>'
+    )
+
+
+def _arrowhead_svg(tip, previous, color: str = "#333") -> str:
+    """Filled triangle at tip pointing away from previous (markers don't rasterise)."""
+    dx, dy = tip[0] - previous[0], tip[1] - previous[1]
+    length = math.hypot(dx, dy) or 1
+    ux, uy = dx / length, dy / length
+    base = (tip[0] - ux * 10, tip[1] - uy * 10)
+    points = [
+        tip,
+        (base[0] - uy * 4.5, base[1] + ux * 4.5),
+        (base[0] + uy * 4.5, base[1] - ux * 4.5),
+    ]
+    return f'<polygon points="{" ".join(f"{px:.1f},{py:.1f}" for px, py in points)}" fill="{color}"/>'
+
+
+def render_svg(chart: Flowchart) -> str:
+    boxes, width, height = layout(chart)
+    parts = []
+    horizontal = chart.direction in ("LR", "RL")
+    flow = -1 if chart.direction in ("BT", "RL") else 1
+
+    labels = []
+    for edge in chart.edges:
+        source, target = boxes[edge.source], boxes[edge.target]
+        axis = 0 if horizontal else 1
+        upstream = (target[axis] - source[axis]) * flow <= 0
+
+        if upstream:
+            # Loops back against the flow: bow out so it doesn't hide the forward edge
+            mx, my = (source[0] + target[0]) / 2, (source[1] + target[1]) / 2
+            bow = max(source[2], source[3], target[2], target[3]) * 0.75
+            control = (mx, my + bow) if horizontal else (mx + bow, my)
+        else:
+            control = None
+
+        start = _clip(source, control or target[:2])
+        end = _clip(target, control or source[:2])
+        if control:
+            path = (
+                f"M {start[0]:.1f} {start[1]:.1f} Q {control[0]:.1f} {control[1]:.1f} "
+                f"{end[0]:.1f} {end[1]:.1f}"
+            )
+            # The curve's apex; grow the canvas so it is not cut off
+            mid = (
+                (start[0] + 2 * control[0] + end[0]) / 4,
+                (start[1] + 2 * control[1] + end[1]) / 4,
+            )
+            width = max(width, mid[0] + MARGIN)
+            height = max(height, mid[1] + MARGIN)
+        else:
+            path = f"M {start[0]:.1f} {start[1]:.1f} L {end[0]:.1f} {end[1]:.1f}"
+            mid = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+
+        dash = ' stroke-dasharray="5 4"' if edge.style == "dotted" else ""
+        stroke = 3 if edge.style == "thick" else 1.5
+        parts.append(
+            f'<path d="{path}" fill="none" stroke="#333" stroke-width="{stroke}"{dash}/>'
+        )
+        if edge.arrow:
+            parts.append(_arrowhead_svg(end, control or start))
+
+        if edge.label:
+            lines = edge.label.split("\n")
+            w = max(len(line) for line in lines) * CHAR_WIDTH + 8
+            h = len(lines) * LINE_HEIGHT + 4
+            width = max(width, mid[0] + w / 2 + MARGIN)
+            height = max(height, mid[1] + h / 2 + MARGIN)
+            labels.append(
+                f'<rect x="{mid[0] - w / 2:.1f}" y="{mid[1] - h / 2:.1f}" width="{w:.1f}" '
+                f'height="{h:.1f}" fill="#E8E8E8"/>' + _text_svg(edge.label, *mid)
+            )
+
+    for node_id, node in chart.nodes.items():
+        x, y, w, h = boxes[node_id]
+        parts.append(_shape_svg(node.shape, x, y, w, h))
+        parts.append(_text_svg(node.label, x, y))
+
+    header = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" '
+        f'height="{height:.0f}" viewBox="0 0 {width:.0f} {height:.0f}">',
+        f'<rect width="{width:.0f}" height="{height:.0f}" fill="white"/>',
+    ]
+    # Edge labels go last so they stay readable over crossing lines
+    return "\n".join([*header, *parts, *labels, "</svg>"])
@@ -0,0 +1,373 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+DIRECTIONS = ("TD", "TB", "BT", "LR", "RL")
+
+# (open, close, shape) - longest delimiters first so "((" wins over "("
+SHAPES = [
+    ("(((", ")))", "double_circle"),
+    ("((", "))", "circle"),
+    ("([", "])", "stadium"),
+    ("[(", ")]", "cylinder"),
+    ("[[", "]]", "subroutine"),
+    ("[/", "/]", "parallelogram"),
+    ("[\\", "\\]", "parallelogram"),
+    ("{{", "}}", "hexagon"),
+    ("(", ")", "round"),
+    ("[", "]", "rect"),
+    ("{", "}", "diamond"),
+    (">", "]", "asymmetric"),
+]
+
+# Lines that style or annotate the chart; accepted but not drawn
+IGNORED_STATEMENTS = ("classDef", "class", "style", "linkStyle", "click", "direction")
+
+# Single dashes may join words ("A-1"); "--" and "-." start a link
+NODE_ID = re.compile(r"[A-Za-z0-9_]+(?:-[A-Za-z0-9_]+)*")
+# "-->", "---", "-.->", "==>", "--o", "<-->" ...
+LINK = re.compile(r"<?(?:-{2,}|={2,}|-\.+-)[>ox]?")
+# "-- text -->", "-. text .->", "== text ==>"
+LABELED_LINK = re.compile(
+    r"(?P<start><?(?:--|==|-\.))\s*(?P<label>[^\-=.>|\s][^|]*?)\s*"
+    r"(?P<end>-{2,}[>ox]?|={2,}[>ox]?|\.-+[>ox]?)"
+)
+PIPE_LABEL = re.compile(r"\|(?P<label>[^|]*)\|")
+
+
+class FlowchartSyntaxError(ValueError):
+    """A flowchart that cannot be parsed, with the 1-based position of the error."""
+
+    def __init__(self, message: str, line: int, column: int, source: str = ""):
+        self.message = message
+        self.line = line
+        self.column = column
+        self.source = source
+        super().__init__(f"line {line}, column {column}: {message}")
+
+    def pointer(self) -> str:
+        """The offending source line with a caret under the error column."""
+        return f"{self.source}\n{' ' * (self.column - 1)}^"
+
+
+@dataclass
+class Node:
+    id: str
+    label: str
+    shape: str = "rect"
+
+
+@dataclass
+class Edge:
+    source: str
+    target: str
+    label: str = ""
+    style: str = "solid"
+    arrow: bool = True
+
+
+@dataclass
+class Flowchart:
+    direction: str = "TD"
+    nodes: dict[str, Node] = field(default_factory=dict)
+    edges: list[Edge] = field(default_factory=list)
+
+
+def clean_label(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1]
+    return re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
+
+
+class _LineParser:
+    """Parses one statement line: node groups joined by links."""
+
+    def __init__(
+        self, chart: Flowchart, text: str, line_no: int, offset: int, source_line: str
+    ):
+        self.chart = chart
+        self.text = text
+        self.line_no = line_no
+        self.offset = offset
+        self.source_line = source_line
+        self.pos = 0
+
+    def error(self, message: str, pos: Optional[int] = None):
+        column = self.offset + (self.pos if pos is None else pos) + 1
+        raise FlowchartSyntaxError(message, self.line_no, column, self.source_line)
+
+    def skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos] in " \t":
+            self.pos += 1
+
+    def parse(self):
+        sources = self.node_group()
+        while True:
+            self.skip_spaces()
+            if self.pos >= len(self.text):
+                return
+            style, arrow, label = self.link()
+            targets = self.node_group()
+            for source in sources:
+                for target in targets:
+                    self.chart.edges.append(Edge(source, target, label, style, arrow))
+            sources = targets
+
+    def node_group(self) -> list[str]:
+        ids = [self.node()]
+        while True:
+            self.skip_spaces()
+            if not self.text.startswith("&", self.pos):
+                return ids
+            self.pos += 1
+            ids.append(self.node())
+
+    def node(self) -> str:
+        self.skip_spaces()
+        match = NODE_ID.match(self.text, self.pos)
+        if not match:
+            found = self.text[self.pos : self.pos + 1] or "end of line"
+            self.error(f"expected a node id, found {found!r}")
+        node_id = match.group()
+        self.pos = match.end()
+
+        for opener, closer, shape in SHAPES:
+            if not self.text.startswith(opener, self.pos):
+                continue
+            start = self.pos
+            end = self.find_close(closer, start + len(opener))
+            if end < 0:
+                self.error(f"unclosed {opener!r}: expected {closer!r}", start)
+            label = clean_label(self.text[start + len(opener) : end])
+            self.pos = end + len(closer)
+            self.chart.nodes[node_id] = Node(node_id, label or node_id, shape)
+            return node_id
+
+        if node_id not in self.chart.nodes:
+            self.chart.nodes[node_id] = Node(node_id, node_id)
+        return node_id
+
+    def find_close(self, closer: str, start: int) -> int:
+        """Index of closer after start, skipping quoted text."""
+        pos = start
+        while pos < len(self.text):
+            if self.text[pos] == '"':
+                quote_end = self.text.find('"', pos + 1)
+                if quote_end < 0:
+                    self.error("unterminated quoted label", pos)
+                pos = quote_end + 1
+                continue
+            if self.text.startswith(closer, pos):
+                return pos
+            pos += 1
+        return -1
+
+    def link(self) -> tuple[str, bool, str]:
+        labeled = LABELED_LINK.match(self.text, self.pos)
+        if labeled:
+            self.pos = labeled.end()
+            return (*self.link_kind(labeled.group("end")), labeled.group("label"))
+
+        match = LINK.match(self.text, self.pos)
+        if not match:
+            self.error(f"expected a link such as '-->', found {self.text[self.pos]!r}")
+        self.pos = match.end()
+        style, arrow = self.link_kind(match.group())
+
+        label = ""
+        self.skip_spaces()
+        piped = PIPE_LABEL.match(self.text, self.pos)
+        if piped:
+            label = clean_label(piped.group("label"))
+            self.pos = piped.end()
+        elif self.text.startswith("|", self.pos):
+            self.error("unclosed '|' link label")
+        return style, arrow, label
+
+    @staticmethod
+    def link_kind(link: str) -> tuple[str, bool]:
+        style = "dotted" if "." in link else "thick" if "=" in link else "solid"
+        return style, link[-1] in ">ox"
+
+
+def _split_statements(line: str):
+    """Yields (offset, statement) for the ';'-separated statements outside quotes."""
+    start = 0
+    quoted = False
+    for pos, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ";" and not quoted:
+            yield start, line[start:pos]
+            start = pos + 1
+    yield start, line[start:]
+
+
+def parse_flowchart(code: str) -> Flowchart:
+    """Parses the Mermaid flowchart subset the flow diagram agent is asked for.
+
+    Raises FlowchartSyntaxError pointing at the first problem.
+    """
+    chart = Flowchart()
+    header_seen = False
+    subgraph_depth = 0
+
+    for line_no, raw in enumerate(code.splitlines(), start=1):
+        line = raw.split("%%", 1)[0].rstrip()
+        if not line.strip():
+            continue
+
+        offset = 0
+        if not header_seen:
+            match = re.match(r"\s*(graph|flowchart)\b[ \t]*(\w+)?[ \t]*(;|$)", line)
+            if not match:
+                column = len(line) - len(line.lstrip()) + 1
+                raise FlowchartSyntaxError(
+                    "expected 'graph <direction>' header", line_no, column, raw
+                )
+            direction = (match.group(2) or "TD").upper()
+            if direction not in DIRECTIONS:
+                raise FlowchartSyntaxError(
+                    f"unknown direction {direction!r}",
+                    line_no,
+                    line.index(match.group(2)) + 1,
+                    raw,
+                )
+            chart.direction = "TD" if direction == "TB" else direction
+            header_seen = True
+            # Statements may follow the header on the same line: "graph LR; A-->B"
+            offset = match.end()
+            line = line[offset:]
+
+        for start, statement in _split_statements(line):
+            stripped = statement.strip()
+            indent = offset + start + len(statement) - len(statement.lstrip())
+            if not stripped:
+                continue
+
+            keyword = stripped.split(None, 1)[0]
+            if keyword == "subgraph":
+                subgraph_depth += 1
+                continue
+            if keyword == "end" and stripped == "end":
+                if subgraph_depth == 0:
+                    raise FlowchartSyntaxError(
+                        "'end' without a matching 'subgraph'", line_no, indent + 1, raw
+                    )
+                subgraph_depth -= 1
+                continue
+            if keyword in IGNORED_STATEMENTS:
+                continue
+
+            _LineParser(chart, stripped, line_no, indent, raw).parse()
+
+    if not header_seen:
+        raise FlowchartSyntaxError("empty diagram: expected 'graph <direction>'", 1, 1)
+    if subgraph_depth:
+        lines = code.splitlines()
+        raise FlowchartSyntaxError(
+            "'subgraph' without a matching 'end'", len(lines), 1, lines[-1]
+        )
+    if not chart.nodes:
+        raise FlowchartSyntaxError("diagram has no nodes", 1, 1)
+    return chart
+
+
+# Arrow typos models make, mapped to the Mermaid link they meant
+ARROW_FIXES = [
+    (re.compile(r"[—–]+\s*>"), "-->"),
+    (re.compile(r"(?<![-=.<])->"), "-->"),
+    (re.compile(r"(?<![-=.<])=>"), "==>"),
+    (re.compile(r"--\s+>"), "-->"),
+    (re.compile(r"\.->"), ".->"),
+]
+CLOSERS = {opener: closer for opener, closer, _ in SHAPES}
+LIST_MARKER = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+(?=\w)")
+
+
+def _looks_like_prose(line: str) -> bool:
+    """A line with no link or shape syntax, e.g. "Here is the diagram:"."""
+    stripped = line.strip()
+    if re.search(r"--|==|-\.|[\[\](){}|]", stripped):
+        return False
+    return len(stripped.split()) > 1 or stripped.endswith((":", "."))
+
+
+def _fix_line(line: str, error: FlowchartSyntaxError) -> Optional[str]:
+    """One targeted fix for the error reported on this line, or None."""
+    fixed = LIST_MARKER.sub(r"\1", line)
+    for pattern, replacement in ARROW_FIXES:
+        fixed = pattern.sub(replacement, fixed)
+    if fixed != line:
+        return fixed
+
+    match = re.match(r"unclosed '(.+?)': expected '(.+?)'", error.message)
+    if match:
+        # Close the label before the next link, or at the end of the line
+        start = error.column - 1 + len(match.group(1))
+        link = re.compile(r"\s*(?:<?(?:-{2,}|={2,}|-\.+-)[>ox]?|&)").search(line, start)
+        end = link.start() if link else len(line.rstrip())
+        return line[:end] + match.group(2) + line[end:]
+
+    if error.message == "unclosed '|' link label":
+        end = re.search(r"\s+\w+\s*[\[({>]|\s+\w+\s*$", line[error.column :])
+        insert = error.column + end.start() if end else len(line.rstrip())
+        return line[:insert] + "|" + line[insert:]
+
+    if error.message == "unterminated quoted label":
+        return line[: error.column - 1] + line[error.column :]
+
+    if _looks_like_prose(line):
+        return ""
+    return None
+
+
+def repair_flowchart(code: str, max_fixes: int = 20) -> tuple[str, list[str], Optional[FlowchartSyntaxError]]:
+    """Applies local fixes until the flowchart parses.
+
+    Returns (code, fixes applied, remaining error or None).
+    """
+    fixes = []
+    code = re.sub(r"```(?:mermaid)?", "", code, flags=re.IGNORECASE).strip("\n")
+    lines = code.splitlines()
+
+    # Drop prose before the header; add a header if the model forgot it
+    header = next(
+        (i for i, line in enumerate(lines) if re.match(r"\s*(graph|flowchart)\b", line)),
+        None,
+    )
+    if header is None:
+        lines.insert(0, "graph TD")
+        fixes.append("added missing 'graph TD' header")
+    elif header > 0:
+        del lines[:header]
+        fixes.append(f"removed {header} line(s) of text before the header")
+
+    for _ in range(max_fixes):
+        try:
+            parse_flowchart("\n".join(lines))
+            return "\n".join(lines), fixes, None
+        except FlowchartSyntaxError as error:
+            index = error.line - 1
+            if not 0 <= index < len(lines):
+                return "\n".join(lines), fixes, error
+            if index == 0 and "direction" in error.message:
+                lines[0] = re.sub(r"^(\s*(?:graph|flowchart))\b.*", r"\1 TD", lines[0])
+                fixes.append(f"line {error.line}: {error.message}; used TD")
+                continue
+            fixed = _fix_line(lines[index], error)
+            if fixed is None:
+                return "\n".join(lines), fixes, error
+            if fixed:
+                lines[index] = fixed
+                fixes.append(f"line {error.line}: {error.message}")
+            else:
+                del lines[index]
+                fixes.append(f"line {error.line}: removed stray text")
+
+    try:
+        parse_flowchart("\n".join(lines))
+        return "\n".join(lines), fixes, None
+    except FlowchartSyntaxError as error:
+        return "\n".join(lines), fixes, error
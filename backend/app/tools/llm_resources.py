@@ -1,6 +1,12 @@
 import os
+import re
+from functools import lru_cache
+from typing import Optional
+
 from langchain_core.tools import tool
 
+LLM_NAME = re.compile(r"\b[A-Z][A-Z0-9_]*_LLM\b")
+
 
 @tool
 def list_llms(query: str = "") -> str:
@@ -13,13 +19,41 @@ def list_llms(query: str = "") -> str:
     return str(result)
 
 
-def get_available_llms() -> list[dict]:
+def get_available_llms(unique_models: bool = False) -> list[dict]:
     """Returns a list of available LLMs with their env var name and model.
     Used internally for dynamic graph node creation.
+    With unique_models, only the first name mapped to each model is kept.
     Example: [{"name": "QWEN_LLM", "model": "qwen2.5:1.5b"}, ...]
     """
     llms = []
+    seen_models = set()
     for key, value in os.environ.items():
         if key.endswith("_LLM"):
+            if unique_models and value in seen_models:
+                continue
+            seen_models.add(value)
             llms.append({"name": key, "model": value})
     return llms
+
+
+@lru_cache(maxsize=1)
+def get_llm_roster() -> tuple[tuple[str, str], ...]:
+    """The council's (name, model) pairs, read once per process.
+    Inlined into agent prompts instead of a list_llms tool call."""
+    return tuple((llm["name"], llm["model"]) for llm in get_available_llms())
+
+
+def format_llm_roster() -> str:
+    return "\n".join(f"- {name} ({model})" for name, model in get_llm_roster())
+
+
+def check_llm_names(text: str) -> Optional[str]:
+    """Why text does not assign work to roster LLMs only, or None if it does."""
+    known = {name for name, _ in get_llm_roster()}
+    named = set(LLM_NAME.findall(text))
+    unknown = sorted(named - known)
+    if unknown:
+        return f"unknown LLMs {', '.join(unknown)}"
+    if not named & known:
+        return "no LLM assigned"
+    return None
@@ -1,7 +1,10 @@
 import re
-import mermaidian as mm
 import os
 
+from app.core.config import settings
+from app.core.tracing import trace_span
+from app.tools.diagram_render import get_diagram_renderer, render_cached
+
 
 def clean_mermaid_code(code: str) -> str:
     code = code.strip()
@@ -17,15 +20,26 @@ def clean_mermaid_code(code: str) -> str:
 
 
 def generate_flow_diagram(mermaid_code: str, project_path: str) -> str:
-    mermaid_code = clean_mermaid_code(mermaid_code)
     if hasattr(mermaid_code, "content"):
         mermaid_code = mermaid_code.content
+    mermaid_code = clean_mermaid_code(mermaid_code)
 
-    image_bytes = mm.get_mermaid_diagram("png", mermaid_code)
-
-    os.makedirs(f"{project_path}/project", exist_ok=True)
-    mm.save_diagram_as_image(
-        path=f"{project_path}/project/flow_diagram.png", diagram=image_bytes
-    )
-
-    return f"File saved to {project_path}/project/flow_diagram.png"
+    output_dir = f"{project_path}/project"
+    # Rendered images keyed by renderer, format and source; reused across runs
+    cache_dir = os.path.join(output_dir, ".diagram_cache")
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(os.path.join(output_dir, "flow_diagram.mmd"), "w", encoding="utf-8") as f:
+        f.write(mermaid_code.strip() + "\n")
+
+    renderer = get_diagram_renderer()
+    saved = []
+    for fmt in settings.MERMAID_FORMATS:
+        with trace_span(f"render_diagram.{fmt}", renderer=renderer.name) as span:
+            image, span["cache_hit"] = render_cached(renderer, mermaid_code, fmt, cache_dir)
+            path = os.path.join(output_dir, f"flow_diagram.{fmt}")
+            with open(path, "wb") as f:
+                f.write(image)
+        saved.append(path)
+
+    return f"File saved to {', '.join(saved)}"
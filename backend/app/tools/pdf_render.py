@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from markdown_pdf import MarkdownPdf, Section
+
+from app.core.config import settings
+from app.core.console import console
+from app.core.tracing import trace_span
+from app.tools.save_file import artifact_path
+
+
+def _render(markdown: str, tmp_path: str) -> str:
+    """Worker process: renders markdown into a PDF at tmp_path."""
+    pdf = MarkdownPdf()
+    pdf.add_section(Section(markdown))
+    pdf.save(tmp_path)
+    return tmp_path
+
+
+def _hash_path(pdf_path: str) -> str:
+    """Hidden sidecar holding the hash of the markdown the PDF was rendered from."""
+    directory, name = os.path.split(pdf_path)
+    return os.path.join(directory, f".{name}.sha256")
+
+
+class PdfRenderer:
+    """Renders artifact PDFs in a background process pool.
+
+    Renders are keyed by PDF path: content that matches the existing PDF is
+    skipped, and when a path is re-rendered before an older render finishes,
+    only the newest content is moved into place.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Reentrant: a render that is already done runs its callback in submit()
+        self._lock = threading.RLock()
+        self._latest: dict[str, str] = {}
+        self._pending: dict[str, Future] = {}
+        self.rendered = 0
+        self.skipped = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, markdown: str, pdf_path: str) -> Future:
+        """Queues a render of markdown into pdf_path and returns its future."""
+        digest = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            pending = self._pending.get(pdf_path)
+            if self._latest.get(pdf_path) == digest and pending and not pending.done():
+                return pending
+            self._latest[pdf_path] = digest
+
+            if os.path.exists(pdf_path) and self._read_hash(pdf_path) == digest:
+                self.skipped += 1
+                if pdf_path not in self._pending:
+                    # Otherwise kept so the older render in flight is discarded
+                    del self._latest[pdf_path]
+                future: Future = Future()
+                future.set_result(pdf_path)
+                return future
+
+            os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+            tmp_path = f"{pdf_path}.{uuid.uuid4().hex}.tmp"
+            render = self._get_executor().submit(_render, markdown, tmp_path)
+
+            future = Future()
+            # Registered first: a render that is already done finishes right here
+            self._pending[pdf_path] = future
+            render.add_done_callback(
+                lambda done: self._finish(done, future, pdf_path, tmp_path, digest)
+            )
+            return future
+
+    def _finish(
+        self, render: Future, future: Future, pdf_path: str, tmp_path: str, digest: str
+    ) -> None:
+        error = render.exception()
+        with self._lock:
+            if error is None and self._latest.get(pdf_path) == digest:
+                os.replace(tmp_path, pdf_path)
+                with open(_hash_path(pdf_path), "w", encoding="utf-8") as f:
+                    f.write(digest)
+                self.rendered += 1
+            elif os.path.exists(tmp_path):
+                # Failed, or superseded by a newer render of the same path
+                os.remove(tmp_path)
+            # A long-running server renders many paths; forget finished ones.
+            # A failure is kept until the path is rendered again, for wait()
+            if error is None and self._pending.get(pdf_path) is future:
+                del self._pending[pdf_path]
+                del self._latest[pdf_path]
+
+        if error is None:
+            future.set_result(pdf_path)
+        else:
+            future.set_exception(error)
+
+    @staticmethod
+    def _read_hash(pdf_path: str) -> Optional[str]:
+        try:
+            with open(_hash_path(pdf_path), "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    async def wait(self, pdf_path: str) -> bool:
+        """Waits for the latest render of pdf_path; False if it failed."""
+        with self._lock:
+            future = self._pending.get(pdf_path)
+        if future is None:
+            return True
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as e:
+            console.print(f"[bold yellow]⚠ PDF generation skipped: {e}[/bold yellow]")
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        """Finishes queued renders and stops the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {"rendered": self.rendered, "skipped": self.skipped}
+
+
+_renderer: Optional[PdfRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PdfRenderer:
+    """Returns the process-wide PDF renderer."""
+    global _renderer
+
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PdfRenderer(max(1, settings.PDF_WORKERS))
+    return _renderer
+
+
+def render_pdf(markdown: str, pdf_file_name: str, base_path: str = "outputs") -> Future:
+    """Renders markdown into an artifact PDF in the background (off the event loop)."""
+    return get_pdf_renderer().submit(markdown, artifact_path(pdf_file_name, base_path))
+
+
+async def wait_for_pdf(pdf_file_name: str, base_path: str = "outputs") -> bool:
+    """Waits for a pending render of one artifact PDF, e.g. before a review."""
+    with trace_span("wait_for_pdf", file=pdf_file_name) as span:
+        span["ok"] = await get_pdf_renderer().wait(artifact_path(pdf_file_name, base_path))
+    return span["ok"]
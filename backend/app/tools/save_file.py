@@ -4,7 +4,8 @@ from langchain_core.tools import tool
 from langchain_core.messages import BaseMessage
 from pydantic import BaseModel
 from typing import Union, Any
-from markdown_pdf import MarkdownPdf, Section
+
+from app.core.tracing import trace_span
 
 
 def _serialize_content(obj: Any) -> str:
@@ -30,6 +31,11 @@ def _serialize_content(obj: Any) -> str:
         return str(obj)
 
 
+def artifact_path(file_name: str, base_path: str = "outputs") -> str:
+    """Returns the on-disk path of a project artifact (relative to base_path)."""
+    return os.path.join(f"{base_path}/project", file_name)
+
+
 def save_file(file_name: str, content: Any, base_path: str = "outputs") -> str:
     """
     Useful for saving files. Supports string, dict, Pydantic model, or LangChain message content.
@@ -38,38 +44,12 @@ def save_file(file_name: str, content: Any, base_path: str = "outputs") -> str:
         content (Any): The content to save to the file.
         base_path (str): The base directory for saving files. Defaults to "outputs".
     """
-    file_path = os.path.join(f"{base_path}/project", file_name)
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    content_str = _serialize_content(content)
+    file_path = artifact_path(file_name, base_path)
+    with trace_span("save_file", file=file_name):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        content_str = _serialize_content(content)
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content_str)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(content_str)
     return f"File saved to {file_path}"
 
-
-def markdown_to_pdf(
-    markdown_file_name: str, pdf_file_name: str, base_path: str = "outputs"
-) -> str:
-    """
-    Convert a markdown file to PDF using markdown-pdf (Windows-compatible).
-    Args:
-        markdown_file_name (str): Path to the markdown file (e.g., "project_plan.md")
-        pdf_file_name (str): Output PDF file name (e.g., "project_plan.pdf")
-        base_path (str): The base directory for files. Defaults to "outputs".
-    Returns:
-        str: Success message with PDF file path
-    """
-    os.makedirs(f"{base_path}/project", exist_ok=True)
-
-    md_path = os.path.join(f"{base_path}/project", markdown_file_name)
-    pdf_path = os.path.join(f"{base_path}/project", pdf_file_name)
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-
-    with open(md_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    pdf = MarkdownPdf()
-    pdf.add_section(Section(md_content))
-    pdf.save(pdf_path)
-
-    return f"PDF saved to {pdf_path}"
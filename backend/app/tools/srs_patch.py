@@ -0,0 +1,180 @@
+"""Section-level SRS revisions.
+
+Instead of regenerating the whole SRS for a piece of review feedback, the
+model returns only the sections it changes, each starting with its heading.
+The patch is merged into the current document locally:
+
+- a section whose heading matches an existing one replaces that section,
+- a section with a new heading is inserted after the previous patch section
+  (or at the end of the document),
+- a body of "(unchanged)" only marks a position for the sections after it,
+  so its heading must exist,
+- a body of "(removed)" deletes the section and its subsections.
+
+Sections are "leaf" sections: a heading and the text up to the next heading
+of any level, so a change to a subsection leaves its siblings untouched.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from app.memory.srs_index import HEADING
+
+FENCE = re.compile(r"^\s*(```|~~~)")
+NUMBERING = re.compile(r"^(section\s+)?(\d+(\.\d+)*\.?|[ivx]+\.|[a-z]\))\s+", re.IGNORECASE)
+UNCHANGED = re.compile(
+    r"^\W*(unchanged|no changes?|same as before|keep as is|\.\.\.|…)\W*$", re.IGNORECASE
+)
+REMOVED = re.compile(r"^\W*(removed?|deleted?|delete this section)\W*$", re.IGNORECASE)
+
+
+class SRSPatchError(ValueError):
+    """The model's revision could not be merged into the SRS."""
+
+
+@dataclass
+class SRSSection:
+    level: int  # 0 for text before the first heading
+    heading: str  # the heading line as written, "" for the preamble
+    title: str
+    body: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return heading_key(self.title)
+
+    def text(self) -> str:
+        lines = ([self.heading] if self.heading else []) + self.body
+        return "\n".join(lines).strip("\n")
+
+
+def heading_key(title: str) -> str:
+    """Heading text without numbering, case or punctuation, for matching."""
+    title = NUMBERING.sub("", title.strip().strip("*_").strip())
+    return " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+
+
+def split_sections(markdown: str) -> list[SRSSection]:
+    """Splits markdown at every heading outside code fences."""
+    sections = [SRSSection(0, "", "")]
+    in_fence = False
+    for line in markdown.splitlines():
+        if FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING.match(line)
+        if match:
+            sections.append(SRSSection(len(match.group(1)), line.rstrip(), match.group(2)))
+        else:
+            sections[-1].body.append(line)
+    if not sections[0].text():
+        sections.pop(0)
+    return sections
+
+
+def _unwrap(text: str) -> str:
+    """The revision itself, when the model wrapped it in a markdown code block."""
+    if any(s.level for s in split_sections(text)):
+        return text
+    match = re.search(r"```(?:markdown|md)?[ \t]*\n(.*?)\n?```", text, re.DOTALL | re.IGNORECASE)
+    return match.group(1) if match else text
+
+
+def _marker(section: SRSSection):
+    body = "\n".join(section.body).strip()
+    if not body or UNCHANGED.match(body):
+        return "unchanged"
+    if REMOVED.match(body):
+        return "removed"
+    return None
+
+
+def apply_srs_patch(document: str, patch: str) -> tuple[str, list[str]]:
+    """Merges a section patch into document; returns (merged, changes).
+
+    Raises SRSPatchError when the patch has no sections, names a heading
+    ambiguously or an unknown one without content, or would leave the
+    document without content.
+    """
+    sections = split_sections(document)
+    patch_sections = [s for s in split_sections(_unwrap(patch)) if s.level > 0]
+    if not patch_sections:
+        raise SRSPatchError("the revision contains no markdown sections")
+
+    def subtree_end(position: int) -> int:
+        # New sections after a matched one go after its subsections
+        level = sections[position].level
+        end = position
+        while end + 1 < len(sections) and sections[end + 1].level > level:
+            end += 1
+        return end
+
+    index: dict[str, list[int]] = {}
+    for position, section in enumerate(sections):
+        if section.level:
+            index.setdefault(section.key, []).append(position)
+
+    # Sections are edited in place; inserts are collected per anchor position
+    # (-1 = end of document) so positions stay valid while merging
+    merged: list = list(sections)
+    inserts: dict[int, list[SRSSection]] = {}
+    changes: list[str] = []
+    anchor = None  # where the next new section goes
+
+    for number, section in enumerate(patch_sections):
+        positions = index.get(section.key, [])
+        if len(positions) > 1:
+            exact = [p for p in positions if sections[p].heading.strip() == section.heading.strip()]
+            if len(exact) != 1:
+                raise SRSPatchError(f"heading {section.title!r} matches several sections")
+            positions = exact
+
+        marker = _marker(section)
+        if positions:
+            position = positions[0]
+            original = sections[position]
+            if merged[position] is None:
+                raise SRSPatchError(f"section {original.title!r} was removed with its parent")
+            if marker == "removed":
+                # Subsections go with their section
+                for removed in range(position, subtree_end(position) + 1):
+                    merged[removed] = None
+                changes.append(f"removed {original.title}")
+            elif marker is None and "\n".join(section.body).strip() != "\n".join(
+                original.body
+            ).strip():
+                # Keep the original heading line so numbering and levels stay stable
+                merged[position] = SRSSection(
+                    original.level, original.heading, original.title, section.body
+                )
+                changes.append(f"revised {original.title}")
+            anchor = inserts.setdefault(subtree_end(position), [])
+        else:
+            if marker == "removed":
+                raise SRSPatchError(f"cannot remove unknown section {section.title!r}")
+            following = patch_sections[number + 1 : number + 2]
+            if marker == "unchanged" and not (
+                # A new heading whose new subsections follow it
+                "\n".join(section.body).strip() == ""
+                and following
+                and following[0].level > section.level
+            ):
+                raise SRSPatchError(f"unknown section {section.title!r} has no content")
+            if anchor is None:
+                anchor = inserts.setdefault(-1, [])
+            anchor.append(section)
+            changes.append(f"added {section.title}")
+
+    if not changes:
+        raise SRSPatchError("the revision does not change any section")
+
+    result = []
+    for position, section in enumerate(merged):
+        if section is not None:
+            result.append(section.text())
+        result.extend(s.text() for s in inserts.get(position, []))
+    result.extend(s.text() for s in inserts.get(-1, []))
+
+    text = "\n\n".join(part for part in result if part).strip() + "\n"
+    if not any(s.level and _marker(s) is None for s in split_sections(text)):
+        raise SRSPatchError("the revised document has no content left")
+    return text, changes
@@ -0,0 +1,277 @@
+"""An Ollama-compatible stand-in server for benchmarks.
+
+Each model has a latency profile (load time, prefill and generation token
+rates, parallel slots) and canned outputs chosen by the system prompt, so
+full graph runs can be timed without GPUs. Every request is recorded with
+its timestamps for concurrency and overhead analysis.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Approximate characters per token, for prompt and output token counts
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class ModelProfile:
+    load_seconds: float = 0.5
+    prefill_tokens_per_second: float = 2000.0
+    tokens_per_second: float = 50.0
+    parallel: int = 4
+    context_length: int = 32768
+    size_bytes: int = 4 * 1024**3
+
+
+@dataclass
+class RequestRecord:
+    model: str
+    received: float
+    started: float
+    finished: float
+    loaded: bool
+    prompt_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class FakeOllamaConfig:
+    profiles: dict[str, ModelProfile] = field(default_factory=dict)
+    # (substring of the system prompt, canned reply); the first match wins
+    outputs: list[tuple[str, str]] = field(default_factory=list)
+    # Replies for requests with a JSON schema ``format``, matched the same way
+    structured_outputs: list[tuple[str, dict]] = field(default_factory=list)
+    default_output: str = "OK"
+    # How many models fit in (simulated) VRAM at once
+    resident_models: int = 1
+
+
+class FakeOllama:
+    """Simulated model residency, parallel slots and timing, shared by handlers."""
+
+    def __init__(self, config: FakeOllamaConfig):
+        self.config = config
+        self.records: list[RequestRecord] = []
+        self._lock = threading.Lock()
+        self._resident: OrderedDict[str, None] = OrderedDict()
+        self._slots: dict[str, threading.Semaphore] = {}
+        self._loading = threading.Lock()
+
+    def profile(self, model: str) -> ModelProfile:
+        return self.config.profiles.get(model) or ModelProfile()
+
+    def reply_for(self, messages: list[dict], structured: bool = False) -> str:
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        if structured:
+            for needle, reply in self.config.structured_outputs:
+                if needle in system:
+                    return json.dumps(reply)
+        for needle, reply in self.config.outputs:
+            if needle in system:
+                return reply
+        return self.config.default_output
+
+    def _ensure_loaded(self, model: str) -> bool:
+        """Loads model (evicting the least recently used); True if it had to load."""
+        with self._loading:
+            with self._lock:
+                if model in self._resident:
+                    self._resident.move_to_end(model)
+                    return False
+            time.sleep(self.profile(model).load_seconds)
+            with self._lock:
+                self._resident[model] = None
+                while len(self._resident) > max(1, self.config.resident_models):
+                    self._resident.popitem(last=False)
+            return True
+
+    def slot(self, model: str) -> threading.Semaphore:
+        with self._lock:
+            if model not in self._slots:
+                self._slots[model] = threading.Semaphore(self.profile(model).parallel)
+            return self._slots[model]
+
+    def record(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._resident.clear()
+
+
+def _handler(state: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _chunk(self, payload: dict):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.startswith("/api/tags"):
+                models = [
+                    {"name": name, "model": name, "size": profile.size_bytes}
+                    for name, profile in state.config.profiles.items()
+                ]
+                self._json({"models": models})
+            elif self.path.startswith("/api/ps"):
+                with state._lock:
+                    resident = list(state._resident)
+                models = [
+                    {"name": name, "model": name, "size": state.profile(name).size_bytes}
+                    for name in resident
+                ]
+                self._json({"models": models})
+            elif self.path.startswith("/api/version"):
+                self._json({"version": "0.0.0-fake"})
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.startswith("/api/show"):
+                profile = state.profile(request.get("model", ""))
+                self._json(
+                    {"model_info": {"fake.context_length": profile.context_length}}
+                )
+            elif self.path.startswith("/api/generate"):
+                # Only empty prompts, which load the model
+                self._load(request)
+            elif self.path.startswith("/api/chat"):
+                try:
+                    self._chat(request)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request
+                    self.close_connection = True
+            else:
+                self._json({"error": "not found"}, 404)
+
+        def _load(self, request: dict):
+            received = time.perf_counter()
+            model = request.get("model", "")
+            if model not in state.config.profiles:
+                self._json({"error": f"model '{model}' not found"}, 404)
+                return
+            with state.slot(model):
+                started = time.perf_counter()
+                loaded = state._ensure_loaded(model)
+                finished = time.perf_counter()
+            self._json(
+                {
+                    "model": model,
+                    "response": "",
+                    "done": True,
+                    "done_reason": "load",
+                    "total_duration": int((finished - started) * 1e9),
+                    "load_duration": int((finished - started) * 1e9),
+                }
+            )
+            state.record(RequestRecord(model, received, started, finished, loaded, 0, 0))
+
+        def _chat(self, request: dict):
+            received = time.perf_counter()
+            model = request.get("model", "")
+            profile = state.profile(model)
+            messages = request.get("messages", [])
+            reply = state.reply_for(messages, isinstance(request.get("format"), dict))
+            prompt_tokens = sum(len(m.get("content", "")) for m in messages) // CHARS_PER_TOKEN + 1
+            words = reply.split(" ")
+
+            with state.slot(model):
+                started = time.perf_counter()
+                loaded = state._ensure_loaded(model)
+                load_done = time.perf_counter()
+                time.sleep(prompt_tokens / profile.prefill_tokens_per_second)
+                prefill_done = time.perf_counter()
+
+                stream = request.get("stream", True)
+                if stream:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+
+                output_tokens = 0
+                for i, word in enumerate(words):
+                    piece = word if i == len(words) - 1 else word + " "
+                    tokens = max(1, len(piece) // CHARS_PER_TOKEN)
+                    output_tokens += tokens
+                    time.sleep(tokens / profile.tokens_per_second)
+                    if stream:
+                        self._chunk(
+                            {
+                                "model": model,
+                                "message": {"role": "assistant", "content": piece},
+                                "done": False,
+                            }
+                        )
+                finished = time.perf_counter()
+
+            final = {
+                "model": model,
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((finished - started) * 1e9),
+                "load_duration": int((load_done - started) * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int((prefill_done - load_done) * 1e9),
+                "eval_count": output_tokens,
+                "eval_duration": int((finished - prefill_done) * 1e9),
+            }
+            if stream:
+                self._chunk({**final, "message": {"role": "assistant", "content": ""}})
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self._json({**final, "message": {"role": "assistant", "content": reply}})
+
+            state.record(
+                RequestRecord(
+                    model, received, started, finished, loaded, prompt_tokens, output_tokens
+                )
+            )
+
+    return Handler
+
+
+class FakeOllamaServer:
+    """Runs a FakeOllama on a background thread: ``with FakeOllamaServer(cfg) as s``."""
+
+    def __init__(self, config: FakeOllamaConfig, host: str = "127.0.0.1", port: int = 0):
+        self.state = FakeOllama(config)
+        self._server = ThreadingHTTPServer((host, port), _handler(self.state))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,296 @@
+"""Times full ManagerAgent runs against the fake Ollama server.
+
+    python -m benchmarks.run --scenario default --runs 3
+    python -m benchmarks.run --scenario default --save-baseline
+    python -m benchmarks.run --list
+
+Reviews are auto-approved. Each run reports wall-clock, per-node latency,
+the concurrency achieved at the (fake) model server and the overhead: wall
+time during which no model was working. Results are compared against the
+saved baseline for the scenario; a regression exits with status 1.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from benchmarks.fake_ollama import FakeOllamaServer, RequestRecord
+from benchmarks.scenarios import SCENARIOS, fake_ollama_config
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Metrics checked against the baseline, and an absolute slack for noise
+GATED_METRICS = ("wall_seconds", "overhead_seconds")
+ABSOLUTE_SLACK_SECONDS = 0.1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.run")
+    parser.add_argument("--scenario", default="default", choices=sorted(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=10.0,
+        help="Divide the simulated model latencies by this factor.",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown against the baseline (0.2 = 20%%).",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the app's console output.")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit.")
+    return parser.parse_args(argv)
+
+
+def busy_intervals(records: list[RequestRecord]) -> list[tuple[float, float]]:
+    """Merged intervals during which at least one request was being served."""
+    merged: list[list[float]] = []
+    for record in sorted(records, key=lambda r: r.started):
+        if merged and record.started <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], record.finished)
+        else:
+            merged.append([record.started, record.finished])
+    return [(start, end) for start, end in merged]
+
+
+def max_concurrency(records: list[RequestRecord]) -> int:
+    events = [(r.started, 1) for r in records] + [(r.finished, -1) for r in records]
+    current = peak = 0
+    for _, delta in sorted(events):
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def node_timer():
+    """A callback handler timing every LangGraph node run."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class NodeTimer(BaseCallbackHandler):
+        run_inline = True
+
+        def __init__(self):
+            self.started: dict = {}
+            self.durations: dict[str, list[float]] = defaultdict(list)
+
+        def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+            name = kwargs.get("name")
+            # "model" and "tools" are the inner nodes of create_agent agents
+            if name in ("model", "tools"):
+                return
+            if name and metadata and metadata.get("langgraph_node") == name:
+                self.started[run_id] = (name, time.perf_counter())
+
+        def _finish(self, run_id):
+            if run_id in self.started:
+                name, start = self.started.pop(run_id)
+                self.durations[name].append(time.perf_counter() - start)
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._finish(run_id)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            # Review nodes end in an interrupt, which surfaces as an error
+            self._finish(run_id)
+
+    return NodeTimer()
+
+
+async def run_once(project_path: str) -> dict:
+    from langgraph.types import Command
+
+    from app.agents.manager import open_manager
+
+    timer = node_timer()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    async with open_manager() as manager:
+        config = {**manager.run_config(uuid.uuid4().hex), "callbacks": [timer]}
+        graph_input = {"input": "Build a collaborative todo app", "project_path": project_path}
+        reviews_answered = 0
+        while True:
+            result = await manager.app.ainvoke(graph_input, config)
+            reviews = result.get("__interrupt__", [])
+            if not reviews:
+                break
+            reviews_answered += len(reviews)
+            graph_input = Command(resume={r.id: {"action": "approve"} for r in reviews})
+    wall = time.perf_counter() - start
+
+    return {
+        "start": start,
+        "wall_seconds": wall,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "reviews": reviews_answered,
+        "nodes": {name: sum(times) for name, times in timer.durations.items()},
+    }
+
+
+def summarize(run: dict, records: list[RequestRecord]) -> dict:
+    intervals = busy_intervals(records)
+    busy = sum(end - start for start, end in intervals)
+    served = sum(r.finished - r.started for r in records)
+    return {
+        "wall_seconds": run["wall_seconds"],
+        "llm_busy_seconds": busy,
+        "overhead_seconds": max(run["wall_seconds"] - busy, 0.0),
+        "cpu_seconds": run["cpu_seconds"],
+        "llm_requests": len(records),
+        "model_loads": sum(r.loaded for r in records),
+        "max_concurrency": max_concurrency(records),
+        "avg_concurrency": served / busy if busy else 0.0,
+        "queue_seconds": sum(r.started - r.received for r in records),
+    }
+
+
+def median_metrics(samples: list[dict]) -> dict:
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def compare(metrics: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for key in GATED_METRICS:
+        previous = baseline["metrics"].get(key)
+        if previous is None:
+            continue
+        limit = previous * (1 + tolerance) + ABSOLUTE_SLACK_SECONDS
+        if metrics[key] > limit:
+            regressions.append(
+                f"{key}: {metrics[key]:.3f}s > {limit:.3f}s (baseline {previous:.3f}s)"
+            )
+    return regressions
+
+
+def print_report(scenario: str, metrics: dict, nodes: dict, baseline) -> None:
+    from rich.table import Table
+
+    from app.core.console import console
+
+    table = Table(title=f"Benchmark: {scenario} (median)")
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_column("Baseline", justify="right")
+    for key, value in metrics.items():
+        previous = baseline["metrics"].get(key) if baseline else None
+        fmt = "{:.3f}" if key.endswith("seconds") or key.startswith("avg") else "{:g}"
+        table.add_row(key, fmt.format(value), "" if previous is None else fmt.format(previous))
+    console.print(table)
+
+    node_table = Table(title="Per-node latency (seconds per run, median)")
+    node_table.add_column("Node")
+    node_table.add_column("Seconds", justify="right")
+    for name, seconds in sorted(nodes.items(), key=lambda item: -item[1]):
+        node_table.add_row(name, f"{seconds:.3f}")
+    console.print(node_table)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:16} {scenario['description']}")
+        return 0
+
+    scenario = SCENARIOS[args.scenario]
+    workdir = tempfile.mkdtemp(prefix="dev-council-bench-")
+
+    with ExitStack() as stack:
+        servers = [
+            stack.enter_context(
+                FakeOllamaServer(fake_ollama_config(args.scenario, args.speedup))
+            )
+            for _ in range(scenario.get("hosts", 1))
+        ]
+        # Settings are read at import time, so configure before importing app
+        os.environ.update(scenario["env"])
+        os.environ["OLLAMA_URL"] = servers[0].url
+        os.environ["OLLAMA_URLS"] = ",".join(server.url for server in servers)
+        os.environ["CHECKPOINT_PATH"] = os.path.join(workdir, "checkpoints.sqlite3")
+
+        from app.core.console import console
+
+        samples, node_samples = [], []
+        for index in range(args.runs):
+            for server in servers:
+                server.state.reset()
+            console.quiet = not args.verbose
+            try:
+                run = asyncio.run(run_once(os.path.join(workdir, f"run_{index}")))
+            finally:
+                console.quiet = False
+            records = [
+                r
+                for server in servers
+                for r in server.state.records
+                if r.started >= run["start"]
+            ]
+            samples.append(summarize(run, records))
+            node_samples.append(run["nodes"])
+            console.print(
+                f"[dim]run {index + 1}/{args.runs}: {samples[-1]['wall_seconds']:.2f}s[/dim]"
+            )
+
+    metrics = median_metrics(samples)
+    nodes = {
+        name: statistics.median(s.get(name, 0.0) for s in node_samples)
+        for name in {name for s in node_samples for name in s}
+    }
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.scenario}.json")
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(args.scenario, metrics, nodes, baseline)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "scenario": args.scenario,
+                    "speedup": args.speedup,
+                    "runs": args.runs,
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "metrics": metrics,
+                    "nodes": nodes,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline for {args.scenario}; run with --save-baseline to create one.")
+        return 0
+    if baseline.get("speedup") != args.speedup:
+        print(
+            f"Baseline was recorded with --speedup {baseline.get('speedup')}; "
+            "results are not comparable."
+        )
+        return 0
+
+    regressions = compare(metrics, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Benchmark scenarios: model latency profiles, canned outputs and settings."""
+
+from benchmarks.fake_ollama import FakeOllamaConfig, ModelProfile
+
+SMALL_MODEL = "qwen2.5:1.5b"
+REASONING_MODEL = "deepseek-r1:14b"
+LARGE_MODEL = "mistral-small:24b"
+
+SRS = """# Software Requirements Specification: Todo App
+
+## 1. Introduction
+### 1.1 Purpose
+This document specifies a collaborative todo application with offline support.
+### 1.2 Scope
+Web client, REST API and a PostgreSQL database.
+
+## 2. Functional Requirements
+### 2.1 Authentication
+Users sign up and log in with email and password. Sessions use JWT access tokens.
+### 2.2 Task Management
+Users create, edit, complete and delete tasks with due dates and priorities.
+### 2.3 Sharing
+Lists can be shared with other users with read or write access.
+### 2.4 Notifications
+Email reminders are sent before a task is due.
+
+## 3. Non-functional Requirements
+### 3.1 Performance
+API responses under 200 ms at the 95th percentile.
+### 3.2 Security
+All traffic uses TLS; passwords are hashed with bcrypt.
+
+## 4. Subtasks
+| Subtask | Assigned LLM |
+|---|---|
+| Authentication | GPT_LLM |
+| Task API | QWEN_LLM |
+| Sharing | DEEPSEEK_LLM |
+| Notifications | MISTRAL_LLM |
+| Web client | GPT_LLM |
+"""
+
+MILESTONES = """| Milestone | Description | LLM |
+|---|---|---|
+| [ ] Authentication | Sign up, login and JWT sessions | GPT_LLM |
+| [ ] Task Management | Task CRUD with due dates and priorities | QWEN_LLM |
+| [ ] Sharing & Notifications | Shared lists and email reminders | DEEPSEEK_LLM |
+"""
+
+FLOW_DIAGRAM = """graph TD
+    U([User]) --> L[Login]
+    L --> V{Valid?}
+    V -- Yes --> D[Dashboard]
+    V -- No --> L
+    D --> T[Tasks] & S[Sharing]
+    T --> API[[REST API]]
+    S --> API
+    API --> DB[(PostgreSQL)]
+"""
+
+TECH_STACK = """| Category | Technology |
+|---|---|
+| Frontend | React, TypeScript |
+| Backend | FastAPI |
+| Database | PostgreSQL |
+| Deployment | Docker |
+"""
+
+PROPOSAL = """- **Approach**: Build the feature as a FastAPI router backed by PostgreSQL, with a React view on top.
+- **Steps**:
+1. Define the SQLAlchemy models and migrations.
+2. Implement the API endpoints with validation.
+3. Add the React screens and API client.
+4. Write integration tests.
+"""
+
+DECISION = """- **Chosen LLM**: GPT_LLM
+- **Reason**: The most complete and specific plan.
+- **Final Approach**: FastAPI router with SQLAlchemy models, React screens and integration tests.
+"""
+
+SRS_PLAN = {
+    "project_overview": "A collaborative todo application with offline support: "
+    "web client, REST API and a PostgreSQL database.",
+    "user_requirements": "- Users sign up and log in with email and password (JWT sessions).\n"
+    "- Users create, edit, complete and delete tasks with due dates and priorities.\n"
+    "- Lists can be shared with read or write access.\n"
+    "- API responses under 200 ms at the 95th percentile.",
+    "subtasks": [
+        {
+            "task": task,
+            "brief": brief,
+            "llm": llm,
+            "output": "Working, tested code",
+            "reason": "Suited to the task",
+        }
+        for task, brief, llm in [
+            ("Authentication", "Sign up, login and JWT sessions", "GPT_LLM"),
+            ("Task API", "Task CRUD endpoints", "QWEN_LLM"),
+            ("Sharing", "Shared lists and permissions", "DEEPSEEK_LLM"),
+            ("Notifications", "Email reminders", "MISTRAL_LLM"),
+            ("Web client", "React screens", "GPT_LLM"),
+        ]
+    ],
+    "technology_stack": ["React", "FastAPI", "PostgreSQL", "Docker"],
+}
+
+MILESTONE_PLAN = {
+    "milestones": [
+        {
+            "name": "Authentication",
+            "description": "Sign up, login and JWT sessions",
+            "tasks": ["User model", "Login endpoint", "JWT middleware"],
+            "llm": "GPT_LLM",
+        },
+        {
+            "name": "Task Management",
+            "description": "Task CRUD with due dates and priorities",
+            "tasks": ["Task model", "CRUD endpoints"],
+            "llm": "QWEN_LLM",
+        },
+        {
+            "name": "Sharing & Notifications",
+            "description": "Shared lists and email reminders",
+            "tasks": ["List permissions", "Reminder job"],
+            "llm": "DEEPSEEK_LLM",
+        },
+    ]
+}
+
+STRUCTURED_OUTPUTS = [
+    ("Milestone Manager", MILESTONE_PLAN),
+    ("Project Lead", SRS_PLAN),
+]
+
+OUTPUTS = [
+    # The milestone prompt mentions the Project Lead, so it is matched first
+    ("Milestone Manager", MILESTONES),
+    ("Project Lead", SRS),
+    ("Mermaid", FLOW_DIAGRAM),
+    ("technology stack", TECH_STACK),
+    ("Manager AI", DECISION),
+    ("senior software engineer", PROPOSAL),
+]
+
+
+def _profiles(speedup: float) -> dict[str, ModelProfile]:
+    """Rough single-GPU numbers, divided by speedup to keep runs short."""
+
+    def scaled(load_seconds, prefill, rate):
+        return ModelProfile(
+            load_seconds=load_seconds / speedup,
+            prefill_tokens_per_second=prefill * speedup,
+            tokens_per_second=rate * speedup,
+        )
+
+    return {
+        SMALL_MODEL: scaled(2.0, 4000, 120),
+        REASONING_MODEL: scaled(6.0, 1500, 35),
+        LARGE_MODEL: scaled(9.0, 1000, 25),
+    }
+
+
+BASE_ENV = {
+    "GPT_LLM": SMALL_MODEL,
+    "QWEN_LLM": SMALL_MODEL,
+    "DEEPSEEK_LLM": REASONING_MODEL,
+    "MISTRAL_LLM": LARGE_MODEL,
+    "LLM_CACHE_ENABLED": "false",
+    "STREAM_TOKENS": "false",
+    "MERMAID_RENDERER": "local",
+}
+
+SCENARIOS = {
+    "default": {
+        "description": "One milestone through proposals and consensus",
+        "env": {**BASE_ENV, "MILESTONE_MODE": "first"},
+        "resident_models": 1,
+    },
+    "all_milestones": {
+        "description": "Every milestone, two at a time",
+        "env": {**BASE_ENV, "MILESTONE_MODE": "all", "MILESTONE_CONCURRENCY": "2"},
+        "resident_models": 1,
+    },
+    "roomy_gpu": {
+        "description": "Every milestone with all three models resident",
+        "env": {
+            **BASE_ENV,
+            "MILESTONE_MODE": "all",
+            "MAX_RESIDENT_MODELS": "3",
+        },
+        "resident_models": 3,
+    },
+    "quorum": {
+        "description": "roomy_gpu, deciding on the first 3 of 4 proposals",
+        "env": {
+            **BASE_ENV,
+            "MILESTONE_MODE": "all",
+            "MAX_RESIDENT_MODELS": "3",
+            "PROPOSAL_QUORUM": "3",
+        },
+        "resident_models": 3,
+    },
+    "two_hosts": {
+        "description": "Every milestone spread over two Ollama hosts",
+        "env": {**BASE_ENV, "MILESTONE_MODE": "all", "MILESTONE_CONCURRENCY": "2"},
+        "resident_models": 1,
+        "hosts": 2,
+    },
+}
+
+
+def fake_ollama_config(scenario: str, speedup: float) -> FakeOllamaConfig:
+    return FakeOllamaConfig(
+        profiles=_profiles(speedup),
+        outputs=OUTPUTS,
+        structured_outputs=STRUCTURED_OUTPUTS,
+        resident_models=SCENARIOS[scenario]["resident_models"],
+    )
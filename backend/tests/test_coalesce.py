@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.core.coalesce import SingleFlight
+
+
+def test_run_shares_one_call():
+    async def main():
+        flight = SingleFlight()
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.run("key", call) for _ in range(3)))
+        assert results == [1, 1, 1]
+        assert flight.stats() == {"in_flight": 0, "coalesced": 2}
+
+    asyncio.run(main())
+
+
+def test_stream_fans_out_every_item_to_late_joiners():
+    async def main():
+        flight = SingleFlight()
+        started = 0
+        release = asyncio.Event()
+
+        async def items():
+            nonlocal started
+            started += 1
+            yield "a"
+            await release.wait()
+            yield "b"
+
+        async def consume():
+            return [item async for item in flight.stream("key", items)]
+
+        first = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(first, second) == [["a", "b"], ["a", "b"]]
+        assert started == 1
+        assert flight.stats() == {"in_flight": 0, "coalesced": 1}
+
+    asyncio.run(main())
+
+
+def test_stream_error_reaches_every_waiter():
+    async def main():
+        flight = SingleFlight()
+
+        async def items():
+            yield "a"
+            await asyncio.sleep(0)
+            raise ConnectionError("host down")
+
+        async def consume():
+            received = []
+            with pytest.raises(ConnectionError):
+                async for item in flight.stream("key", items):
+                    received.append(item)
+            return received
+
+        assert await asyncio.gather(consume(), consume()) == [["a"], ["a"]]
+
+    asyncio.run(main())
+
+
+def test_stream_is_cancelled_only_when_nobody_waits():
+    async def main():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def items():
+            try:
+                for item in range(3):
+                    await asyncio.sleep(0.01)
+                    yield item
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def first_item():
+            async for item in flight.stream("key", items):
+                return item
+
+        async def consume():
+            return [item async for item in flight.stream("key", items)]
+
+        assert await asyncio.gather(first_item(), consume()) == [0, [0, 1, 2]]
+        assert not cancelled.is_set()
+
+        assert await first_item() == 0
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert not flight.stream_in_flight("key")
+
+    asyncio.run(main())
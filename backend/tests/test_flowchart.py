@@ -0,0 +1,112 @@
+import pytest
+
+from app.tools.flowchart import FlowchartSyntaxError, parse_flowchart, repair_flowchart
+
+
+def test_parses_nodes_shapes_and_edges():
+    chart = parse_flowchart(
+        "graph LR\n"
+        "    A[Start] --> B{Valid?}\n"
+        "    B -->|yes| C((Done))\n"
+        "    B -. retry .-> A\n"
+    )
+    assert chart.direction == "LR"
+    assert {node.id: node.shape for node in chart.nodes.values()} == {
+        "A": "rect",
+        "B": "diamond",
+        "C": "circle",
+    }
+    assert chart.nodes["A"].label == "Start"
+    assert [(e.source, e.target, e.label, e.style) for e in chart.edges] == [
+        ("A", "B", "", "solid"),
+        ("B", "C", "yes", "solid"),
+        ("B", "A", "retry", "dotted"),
+    ]
+
+
+def test_node_ids_may_contain_dashes():
+    chart = parse_flowchart("graph TD\n    A-1[Start] --> B-2\n    B-2-->C\n    C-.->D")
+    assert chart.nodes["A-1"].label == "Start"
+    assert [(e.source, e.target) for e in chart.edges] == [
+        ("A-1", "B-2"),
+        ("B-2", "C"),
+        ("C", "D"),
+    ]
+
+
+def test_node_groups_and_statements_on_the_header_line():
+    chart = parse_flowchart('graph TB; A & B --> C["Done; ok"]')
+    assert chart.direction == "TD"
+    assert chart.nodes["C"].label == "Done; ok"
+    assert [(e.source, e.target) for e in chart.edges] == [("A", "C"), ("B", "C")]
+
+
+def test_subgraphs_and_styling_are_accepted():
+    chart = parse_flowchart(
+        "flowchart TD\n"
+        "    subgraph api\n"
+        "        A --> B\n"
+        "    end\n"
+        "    classDef hot fill:#f00\n"
+        "    class A hot\n"
+    )
+    assert set(chart.nodes) == {"A", "B"}
+
+
+@pytest.mark.parametrize(
+    "code, message, line, column",
+    [
+        ("A --> B", "expected 'graph <direction>' header", 1, 1),
+        ("graph XY\nA --> B", "unknown direction 'XY'", 1, 7),
+        ("graph TD\n    A[Start --> B", "unclosed '[': expected ']'", 2, 6),
+        ("graph TD\n    A -> B", "expected a link such as '-->', found '-'", 2, 7),
+        ("graph TD\n    A -->|yes B", "unclosed '|' link label", 2, 10),
+        ("graph TD\n    subgraph x\n    A", "'subgraph' without a matching 'end'", 3, 1),
+    ],
+)
+def test_errors_point_at_the_problem(code, message, line, column):
+    with pytest.raises(FlowchartSyntaxError) as error:
+        parse_flowchart(code)
+    assert (error.value.message, error.value.line, error.value.column) == (
+        message,
+        line,
+        column,
+    )
+
+
+def test_error_pointer_marks_the_column():
+    with pytest.raises(FlowchartSyntaxError) as error:
+        parse_flowchart("graph TD\n    A[Start --> B")
+    assert error.value.pointer() == "    A[Start --> B\n     ^"
+
+
+@pytest.mark.parametrize(
+    "code, repaired",
+    [
+        ("```mermaid\nHere is the diagram:\ngraph TD\n  A-1->B\n```", "graph TD\n  A-1-->B"),
+        ("A --> B", "graph TD\nA --> B"),
+        ("graph XY\n  A --> B", "graph TD\n  A --> B"),
+        ("graph TD\n  A[Start --> B", "graph TD\n  A[Start] --> B"),
+        ("graph TD\n  A -->|yes B", "graph TD\n  A -->|yes| B"),
+        ("graph TD\n  A ==> B\n  - B — > C", "graph TD\n  A ==> B\n  B --> C"),
+        ("graph TD\n  A --> B\n  That is the whole flow.", "graph TD\n  A --> B"),
+    ],
+)
+def test_repair_fixes_common_model_mistakes(code, repaired):
+    code, fixes, error = repair_flowchart(code)
+    assert error is None
+    assert fixes
+    assert code == repaired
+    parse_flowchart(code)
+
+
+def test_repair_leaves_valid_diagrams_alone():
+    code = "graph LR\n  A-1[Start] --> B"
+    assert repair_flowchart(code) == (code, [], None)
+
+
+def test_repair_reports_what_it_cannot_fix():
+    code, fixes, error = repair_flowchart("graph TD\n  A --> ???")
+    assert code == "graph TD\n  A --> ???"
+    assert fixes == []
+    assert (error.line, error.column) == (2, 9)
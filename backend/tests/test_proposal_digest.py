@@ -0,0 +1,90 @@
+import numpy as np
+
+from app.core.config import settings
+from app.memory.proposal_digest import (
+    cluster,
+    compact_proposals,
+    format_proposals,
+    key_steps,
+    vectorize,
+)
+
+REST = """**Approach**: Build a REST API with FastAPI and PostgreSQL.
+1. Define the todo model and migrations
+2. Add CRUD endpoints for todos
+3. Write integration tests for the endpoints
+"""
+REST_AGAIN = """**Approach**: Build a REST API with FastAPI and PostgreSQL.
+1. Define the todo model and its migrations
+2. Add CRUD endpoints for todos
+3. Write integration tests
+"""
+GRAPHQL = """**Approach**: Serve a GraphQL schema from Node with MongoDB.
+- Design the schema and resolvers
+- Subscribe clients to live updates
+"""
+
+
+def test_vectors_are_normalized_and_rank_similar_texts_higher():
+    vectors = vectorize([REST, REST_AGAIN, GRAPHQL, ""])
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1)
+    assert not vectors[3].any()
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+
+def test_cluster_groups_rows_above_the_threshold():
+    vectors = vectorize([REST, GRAPHQL, REST_AGAIN])
+    assert cluster(vectors, 0.4) == [[0, 2], [1]]
+    assert cluster(vectors, 1.01) == [[0], [1], [2]]
+
+
+def test_key_steps_keeps_labelled_and_list_lines():
+    text = (
+        "<think>Let me consider the options.</think>\n"
+        "Some introduction.\n"
+        "**Approach**: REST\n"
+        "```\n- not a step\n```\n"
+        "1. Model\n"
+        "- Endpoints\n"
+    )
+    assert key_steps(text, 100) == "**Approach**: REST\n1. Model\n- Endpoints"
+
+
+def test_key_steps_stays_within_the_budget():
+    text = "\n".join(f"- step {i} " + "word " * 10 for i in range(20))
+    steps = key_steps(text, 40)
+    assert len(steps) // 4 <= 40
+    assert steps.startswith("- step 0")
+    # A single line over budget is cut rather than dropped
+    assert key_steps("- " + "word " * 100, 5).endswith(" …")
+
+
+def test_key_steps_falls_back_to_the_text_without_lists():
+    assert key_steps("Just   use a\nspreadsheet.", 100) == "Just use a spreadsheet."
+
+
+def test_compact_proposals_merges_duplicates_with_votes():
+    clusters = compact_proposals(
+        {"gpt": REST, "mistral": GRAPHQL, "qwen": REST_AGAIN, "empty": "  "}, 800, 0.4
+    )
+    assert [(c.votes, sorted(c.members)) for c in clusters] == [
+        (2, ["gpt", "qwen"]),
+        (1, ["mistral"]),
+    ]
+    assert clusters[0].representative in ("gpt", "qwen")
+    assert compact_proposals({"gpt": ""}, 800, 0.4) == []
+
+
+def test_format_proposals(monkeypatch):
+    proposals = {"gpt": REST, "qwen": REST_AGAIN, "mistral": GRAPHQL}
+
+    monkeypatch.setattr(settings, "PROPOSAL_BUDGET_TOKENS", 0)
+    full = format_proposals(proposals)
+    assert full.count("### Proposal from") == 3
+    assert REST in full
+
+    monkeypatch.setattr(settings, "PROPOSAL_BUDGET_TOKENS", 800)
+    monkeypatch.setattr(settings, "PROPOSAL_DEDUP_THRESHOLD", 0.4)
+    compact = format_proposals(proposals)
+    assert compact.count("### Proposal from") == 2
+    assert "(2 votes, also proposed by " in compact
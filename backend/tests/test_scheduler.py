@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from app.core.scheduler import ModelScheduler
+
+
+class Requests:
+    """Requests that hold their scheduler slot until released."""
+
+    def __init__(self, scheduler: ModelScheduler):
+        self.scheduler = scheduler
+        self.started: list[str] = []
+        self.tasks: list[asyncio.Task] = []
+        self.releases: list[asyncio.Event] = []
+
+    def submit(self, model: str) -> int:
+        release = asyncio.Event()
+
+        async def request():
+            async with self.scheduler.slot(model):
+                self.started.append(model)
+                await release.wait()
+
+        self.tasks.append(asyncio.create_task(request()))
+        self.releases.append(release)
+        return len(self.tasks) - 1
+
+    async def release(self, *ids: int):
+        for index in ids:
+            self.releases[index].set()
+        await settle()
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_parallel_requests_per_model_are_limited():
+    async def main():
+        requests = Requests(ModelScheduler(max_parallel_per_model=2))
+        first = [requests.submit("qwen") for _ in range(3)]
+        await settle()
+        assert requests.started == ["qwen", "qwen"]
+        await requests.release(first[0])
+        assert requests.started == ["qwen"] * 3
+        await requests.release(*first[1:])
+        assert requests.scheduler.stats() == {"model_loads": 1, "resident": ["qwen"]}
+
+    asyncio.run(main())
+
+
+def test_model_with_the_largest_backlog_is_loaded_next():
+    async def main():
+        requests = Requests(ModelScheduler())
+        busy = requests.submit("qwen")
+        await settle()
+        mistral = requests.submit("mistral")
+        deepseek = [requests.submit("deepseek") for _ in range(2)]
+        await settle()
+        assert requests.started == ["qwen"]
+
+        await requests.release(busy)
+        assert requests.started == ["qwen", "deepseek", "deepseek"]
+        await requests.release(*deepseek)
+        assert requests.started[-1] == "mistral"
+        await requests.release(mistral)
+        assert [e["evicted"] for e in requests.scheduler.load_events] == [
+            [],
+            ["qwen"],
+            ["deepseek"],
+        ]
+
+    asyncio.run(main())
+
+
+def test_busy_model_drains_its_queue_before_swapping():
+    async def main():
+        requests = Requests(ModelScheduler(max_parallel_per_model=1))
+        first = requests.submit("qwen")
+        await settle()
+        queued = requests.submit("qwen")
+        other = requests.submit("mistral")
+        await settle()
+        # qwen stays busy: it finishes what is queued but admits nothing new
+        late = requests.submit("qwen")
+        await requests.release(first)
+        assert requests.started == ["qwen", "qwen"]
+
+        await requests.release(queued)
+        assert requests.started == ["qwen", "qwen", "mistral"]
+        await requests.release(other)
+        assert requests.started[-1] == "qwen"
+        await requests.release(late)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("budget_gb, resident", [(20, 2), (10, 1)])
+def test_vram_budget_limits_resident_models(budget_gb, resident):
+    sizes = {"qwen": 4 * 1024**3, "mistral": 14 * 1024**3}
+
+    async def load_sizes():
+        return sizes
+
+    async def main():
+        requests = Requests(
+            ModelScheduler(
+                max_resident_models=3,
+                vram_budget_bytes=budget_gb * 1024**3,
+                size_loader=load_sizes,
+            )
+        )
+        ids = [requests.submit("qwen"), requests.submit("mistral")]
+        await settle()
+        assert len(requests.scheduler.resident) == resident
+        assert len(requests.started) == resident
+        await requests.release(*ids)
+        assert sorted(requests.started) == ["mistral", "qwen"]
+
+    asyncio.run(main())
+
+
+def test_cancelled_request_gives_up_its_place():
+    async def main():
+        requests = Requests(ModelScheduler())
+        busy = requests.submit("qwen")
+        await settle()
+        waiting = requests.submit("mistral")
+        await settle()
+        requests.tasks[waiting].cancel()
+        await settle()
+        assert not requests.scheduler.waiting["mistral"]
+
+        await requests.release(busy)
+        assert requests.scheduler.active["qwen"] == 0
+        assert requests.scheduler.stats()["model_loads"] == 1
+
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+import pytest
+
+from app.tools.srs_patch import SRSPatchError, apply_srs_patch, heading_key, split_sections
+
+SRS = """# Todo App SRS
+
+Intro text.
+
+## 1. Overview
+
+A todo app.
+
+## 2. Requirements
+
+### 2.1 Functional
+
+- Add todos
+
+### 2.2 Non-functional
+
+- Fast
+
+## 3. Constraints
+
+None.
+"""
+
+
+def test_split_sections_ignores_headings_in_code_fences():
+    sections = split_sections("Preamble\n# A\n```\n# not a heading\n```\n## B\ntext")
+    assert [(s.level, s.title) for s in sections] == [(0, ""), (1, "A"), (2, "B")]
+
+
+def test_heading_key_ignores_numbering_case_and_punctuation():
+    assert heading_key("2.1 Functional Requirements:") == "functional requirements"
+    assert heading_key("**Section 3. Constraints**") == "constraints"
+
+
+def test_revised_section_keeps_its_heading_and_siblings():
+    merged, changes = apply_srs_patch(SRS, "### Functional\n\n- Add todos\n- Share lists")
+    assert changes == ["revised 2.1 Functional"]
+    assert "### 2.1 Functional\n\n- Add todos\n- Share lists" in merged
+    assert "### 2.2 Non-functional\n\n- Fast" in merged
+    assert "## 1. Overview" in merged
+
+
+def test_new_section_goes_after_the_previous_patch_section_and_its_subsections():
+    merged, changes = apply_srs_patch(
+        SRS, "## 2. Requirements\n(unchanged)\n\n## 2.5 Security\n\nUse HTTPS."
+    )
+    assert changes == ["added 2.5 Security"]
+    assert merged.index("### 2.2 Non-functional") < merged.index("## 2.5 Security")
+    assert merged.index("## 2.5 Security") < merged.index("## 3. Constraints")
+
+
+def test_new_section_without_anchor_goes_at_the_end():
+    merged, _ = apply_srs_patch(SRS, "## Glossary\n\nTodo: a task.")
+    assert merged.rstrip().endswith("## Glossary\n\nTodo: a task.")
+
+
+def test_removed_section():
+    merged, changes = apply_srs_patch(SRS, "## Constraints\n(removed)")
+    assert changes == ["removed 3. Constraints"]
+    assert "Constraints" not in merged
+
+
+def test_patch_wrapped_in_a_code_block():
+    merged, changes = apply_srs_patch(
+        SRS, "Here is the change:\n```markdown\n## Overview\nA shared todo app.\n```"
+    )
+    assert changes == ["revised 1. Overview"]
+    assert "## 1. Overview\nA shared todo app." in merged
+
+
+@pytest.mark.parametrize(
+    "patch, message",
+    [
+        ("Just make it better.", "no markdown sections"),
+        ("## Overview\n\nA todo app.", "does not change any section"),
+        ("## Appendix\n(removed)", "cannot remove unknown section"),
+    ],
+)
+def test_rejected_patches(patch, message):
+    with pytest.raises(SRSPatchError, match=message):
+        apply_srs_patch(SRS, patch)
+
+
+def test_ambiguous_heading_is_rejected():
+    document = "## Notes\na\n\n# Part 2\n\n## Notes\nb\n"
+    with pytest.raises(SRSPatchError, match="matches several sections"):
+        apply_srs_patch(document, "### Notes\nc")
+
+
+def test_removing_every_section_is_rejected():
+    with pytest.raises(SRSPatchError, match="no content left"):
+        apply_srs_patch("## Only\ntext\n", "## Only\n(removed)")
+
+
+def test_removed_section_takes_its_subsections():
+    merged, changes = apply_srs_patch(SRS, "## Requirements\n(removed)")
+    assert changes == ["removed 2. Requirements"]
+    assert "Functional" not in merged and "Non-functional" not in merged
+    assert merged.index("A todo app.") < merged.index("## 3. Constraints")
+
+
+def test_subsection_of_a_removed_section_cannot_be_revised():
+    with pytest.raises(SRSPatchError, match="removed with its parent"):
+        apply_srs_patch(SRS, "## Requirements\n(removed)\n\n### Functional\n- Share lists")
+
+
+@pytest.mark.parametrize("body", ["(unchanged)", ""])
+def test_unknown_section_without_content_is_rejected(body):
+    with pytest.raises(SRSPatchError, match="has no content"):
+        apply_srs_patch(SRS, f"## 1. Introduction\n{body}\n\n## Glossary\n\nTodo: a task.")
+
+
+def test_new_section_may_start_with_new_subsections():
+    merged, changes = apply_srs_patch(
+        SRS, "## Constraints\n(unchanged)\n\n## 4. Security\n\n### 4.1 Auth\n\nUse OAuth."
+    )
+    assert changes == ["added 4. Security", "added 4.1 Auth"]
+    assert merged.rstrip().endswith("## 4. Security\n\n### 4.1 Auth\n\nUse OAuth.")